@@ -1,9 +1,11 @@
-from fastapi import APIRouter
-from app.api.routes import auth, bridge, linking, consent, data_transfer
+from fastapi import APIRouter, Depends
+from app.api.routes import auth, bridge, linking, consent, data_transfer, events
+from app.deps.rate_limit import rate_limit
 
-api_router = APIRouter()
+api_router = APIRouter(dependencies=[Depends(rate_limit)])
 api_router.include_router(auth.router)
 api_router.include_router(bridge.router)
 api_router.include_router(linking.router)
 api_router.include_router(consent.router)
 api_router.include_router(data_transfer.router)
+api_router.include_router(events.router)
@@ -1,40 +1,72 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+import math
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Request, Response
 
 from app.api.schemas import SessionRequest, SessionResponse
-from app.services.auth_service import validate_client_credentials, issue_access_token
+from app.core.config import get_settings
+from app.core.metrics import token_issuance
+from app.services.auth_service import validate_client_credentials, issue_access_token, jwks
+from app.services.client_service import check_auth_failures, check_issuance_rate, record_auth_failure
 from app.deps.headers import require_gateway_headers
+from app.utils.responses import model_response
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+settings = get_settings()
+
+def _source(request: Request) -> str:
+    """The caller's address: the last ``X-Forwarded-For`` hop when the peer is
+    one of ``TRUSTED_PROXIES``, otherwise the peer itself."""
+    peer = request.client.host if request.client else "unknown"
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded and peer in settings.trusted_proxies:
+        return forwarded.rsplit(",", 1)[-1].strip() or peer
+    return peer
+
+def _rate_limited(detail: str, retry_after: float) -> HTTPException:
+    token_issuance.inc(("rate_limited",))
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(math.ceil(retry_after))}
+    )
+
 @router.post("/session", response_model=SessionResponse)
-def create_session(body: SessionRequest, headers=Depends(require_gateway_headers)):
-    if not validate_client_credentials(body.clientId, body.clientSecret):
+async def create_session(body: SessionRequest, request: Request, headers=Depends(require_gateway_headers)):
+    source = _source(request)
+    retry_after = check_auth_failures(body.clientId, source)
+    if retry_after:
+        raise _rate_limited("Too many failed authentication attempts", retry_after)
+
+    if not await validate_client_credentials(body.clientId, body.clientSecret):
+        record_auth_failure(body.clientId, source)
+        token_issuance.inc(("invalid_credentials",))
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid client credentials"
         )
 
+    # charged only after the secret is verified, so nobody can drain another client's budget
+    retry_after = check_issuance_rate(body.clientId)
+    if retry_after:
+        raise _rate_limited("Too many token requests for this client", retry_after)
+
     if body.grantType != "client_credentials":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Only client_credentials grant type is supported"
         )
     
-    token_data = issue_access_token(body.clientId, headers["cm_id"])
-    return SessionResponse(**token_data)
+    token_data = await issue_access_token(body.clientId, headers["cm_id"])
+    token_issuance.inc(("issued",))
+    return model_response(SessionResponse, token_data)
 
 @router.get("/certs")
-def get_certs():
-    """Placeholder for public certificates endpoint"""
-    return {
-        "keys": [
-            {
-                "kty": "RSA",
-                "use": "sig",
-                "kid": "demo-key-1",
-                "alg": "RS256",
-                "n": "placeholder",
-                "e": "AQAB"
-            }
-        ]
-    }
\ No newline at end of file
+async def get_certs(if_none_match: Optional[str] = Header(default=None)):
+    """JWKS of the public keys that may have signed live access tokens"""
+    body, etag = jwks()
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.jwks_max_age_seconds}"}
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
\ No newline at end of file
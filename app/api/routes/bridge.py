@@ -1,52 +1,100 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from app.deps.headers import require_gateway_headers
 from app.deps.auth import get_current_token
 from app.api.schemas import (
     BridgeRegisterRequest, BridgeRegisterResponse,
     BridgeUrlUpdateRequest, BridgeUrlUpdateResponse,
-    BridgeService
+    BridgeService, BridgeServiceCreateRequest, BridgeServiceUpdateRequest
 )
+from app.services.bridge_directory import SERVICE_FIELDS
 from app.services.bridge_service import (
     register_bridge, update_bridge_url,
-    get_services_by_bridge, get_service_by_id
+    get_bridge_services, get_service_by_id,
+    add_services, update_service, deactivate_service
 )
+from app.utils.responses import model_response, project
 
 router = APIRouter(prefix="/bridge", tags=["bridge"])
 
+def _service_not_found() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service not found")
+
 @router.post("/register", response_model=BridgeRegisterResponse)
-def register_bridge_endpoint(body: BridgeRegisterRequest,
+async def register_bridge_endpoint(body: BridgeRegisterRequest,
                              token=Depends(get_current_token),
                              headers=Depends(require_gateway_headers)):
     # token is validated: proceed to register bridge
-    data = register_bridge(body.bridgeId, body.entityType, body.name)
-    return BridgeRegisterResponse(
-        bridgeId=data["bridgeId"],
-        entityType=data["entityType"],
-        name=data["name"]
-    )
+    data = await register_bridge(body.bridgeId, body.entityType, body.name)
+    return model_response(BridgeRegisterResponse, {
+        "bridgeId": data["bridgeId"],
+        "entityType": data["entityType"],
+        "name": data["name"]
+    })
 
 @router.patch("/url", response_model=BridgeUrlUpdateResponse)
-def update_url_endpoint(body: BridgeUrlUpdateRequest,
+async def update_url_endpoint(body: BridgeUrlUpdateRequest,
                         token=Depends(get_current_token),
                         headers=Depends(require_gateway_headers)):
-    updated = update_bridge_url(body.bridgeId, str(body.webhookUrl))
+    updated = await update_bridge_url(body.bridgeId, str(body.webhookUrl))
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Bridge not found")
-    return BridgeUrlUpdateResponse(bridgeId=updated["bridgeId"], webhookUrl=updated["webhookUrl"])
+    return model_response(BridgeUrlUpdateResponse, updated)
 
 @router.get("/{bridge_id}/services", response_model=list[BridgeService])
-def list_services_endpoint(bridge_id: str,
+async def list_services_endpoint(bridge_id: str,
+                           if_none_match: Optional[str] = Header(default=None),
                            token=Depends(get_current_token),
                            headers=Depends(require_gateway_headers)):
-    return [BridgeService(**svc) for svc in get_services_by_bridge(bridge_id)]
+    # served from the bridge's published snapshot, serialized once per change
+    snapshot = await get_bridge_services(bridge_id)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Bridge not found")
+    etag = {"ETag": snapshot.etag}
+    if if_none_match and snapshot.etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag)
+    return Response(snapshot.body, media_type="application/json", headers=etag)
+
+@router.post("/{bridge_id}/services", response_model=BridgeService)
+async def add_service_endpoint(bridge_id: str, body: BridgeServiceCreateRequest,
+                         token=Depends(get_current_token),
+                         headers=Depends(require_gateway_headers)):
+    try:
+        added = await add_services(bridge_id, [body.dict()])
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if added is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Bridge not found")
+    return model_response(BridgeService, project(added, SERVICE_FIELDS)[0])
 
 @router.get("/service/{service_id}", response_model=BridgeService)
-def get_service_endpoint(service_id: str,
+async def get_service_endpoint(service_id: str,
                          token=Depends(get_current_token),
                          headers=Depends(require_gateway_headers)):
-    svc = get_service_by_id(service_id)
+    svc = await get_service_by_id(service_id)
     if not svc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail="Service not found")
-    return BridgeService(**svc)
\ No newline at end of file
+        raise _service_not_found()
+    return model_response(BridgeService, project([svc], SERVICE_FIELDS)[0])
+
+@router.patch("/service/{service_id}", response_model=BridgeService)
+async def update_service_endpoint(service_id: str, body: BridgeServiceUpdateRequest,
+                            token=Depends(get_current_token),
+                            headers=Depends(require_gateway_headers)):
+    svc = await update_service(service_id, body.dict(exclude_none=True))
+    if not svc:
+        raise _service_not_found()
+    return model_response(BridgeService, project([svc], SERVICE_FIELDS)[0])
+
+@router.delete("/service/{service_id}", response_model=BridgeService)
+async def deactivate_service_endpoint(service_id: str,
+                                token=Depends(get_current_token),
+                                headers=Depends(require_gateway_headers)):
+    # services are deactivated rather than removed, so their ids stay reserved
+    svc = await deactivate_service(service_id)
+    if not svc:
+        raise _service_not_found()
+    return model_response(BridgeService, project([svc], SERVICE_FIELDS)[0])
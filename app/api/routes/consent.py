@@ -1,43 +1,93 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from app.deps.headers import require_gateway_headers
 from app.deps.auth import get_current_token
+from app.deps.rate_limit import enforce_hip_rate
 from app.api.schemas import (
     ConsentInitRequest, ConsentInitResponse,
     ConsentStatusResponse,
     ConsentFetchRequest, ConsentFetchResponse,
-    ConsentNotifyRequest
+    ConsentNotifyRequest,
+    ConsentInitBatchRequest, ConsentStatusBatchRequest, BatchResponse,
+    ConsentSearchResponse
 )
 from app.services.consent_service import (
     init_consent, get_consent_status,
-    fetch_consent, notify_consent
+    fetch_consent, notify_consent,
+    init_consents, get_consent_statuses,
+    search_consents
 )
+from app.utils.responses import model_response
+from app.utils.batch import batch_results, check_batch_size, item_error, validate_batch_items
 
 router = APIRouter(prefix="/consent", tags=["consent"])
 
 @router.post("/init", response_model=ConsentInitResponse)
-def init_consent_endpoint(body: ConsentInitRequest,
+async def init_consent_endpoint(body: ConsentInitRequest,
                           token=Depends(get_current_token),
                           headers=Depends(require_gateway_headers)):
-    return ConsentInitResponse(**init_consent(body.patientId, body.hipId, body.purpose.dict()))
+    await enforce_hip_rate([body.hipId])
+    return model_response(ConsentInitResponse, await init_consent(body.patientId, body.hipId, body.purpose.dict()))
+
+@router.post("/init:batch", response_model=BatchResponse)
+async def init_consent_batch_endpoint(body: ConsentInitBatchRequest,
+                                token=Depends(get_current_token),
+                                headers=Depends(require_gateway_headers)):
+    valid, errors = validate_batch_items(ConsentInitRequest, body.requests)
+    await enforce_hip_rate(item.hipId for _, item in valid)
+    created = await init_consents([(item.patientId, item.hipId, item.purpose.dict()) for _, item in valid])
+    responses = {index: result for (index, _), result in zip(valid, created)}
+    return model_response(BatchResponse, batch_results(len(body.requests), responses, errors))
+
+@router.post("/status:batch", response_model=BatchResponse)
+async def get_status_batch_endpoint(body: ConsentStatusBatchRequest,
+                              token=Depends(get_current_token),
+                              headers=Depends(require_gateway_headers)):
+    check_batch_size(body.consentRequestIds)
+    responses, errors = {}, {}
+    for index, consent in enumerate(await get_consent_statuses(body.consentRequestIds)):
+        if consent:
+            responses[index] = consent
+        else:
+            errors[index] = item_error("NOT_FOUND", "Consent request not found")
+    return model_response(BatchResponse, batch_results(len(body.consentRequestIds), responses, errors))
+
+@router.get("/search", response_model=ConsentSearchResponse)
+async def search_consents_endpoint(patientId: Optional[str] = None,
+                             hipId: Optional[str] = None,
+                             consentStatus: Optional[str] = Query(default=None, alias="status"),
+                             orderBy: Literal["requestedAt", "grantedAt"] = "requestedAt",
+                             order: Literal["asc", "desc"] = "asc",
+                             limit: int = Query(default=50, ge=1, le=500),
+                             cursor: Optional[str] = None,
+                             token=Depends(get_current_token),
+                             headers=Depends(require_gateway_headers)):
+    try:
+        page = await search_consents(patientId, hipId, consentStatus, orderBy,
+                                     order == "desc", limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return model_response(ConsentSearchResponse, page)
 
 @router.get("/status/{consentRequestId}", response_model=ConsentStatusResponse)
-def get_status_endpoint(consentRequestId: str,
+async def get_status_endpoint(consentRequestId: str,
                         token=Depends(get_current_token),
                         headers=Depends(require_gateway_headers)):
-    consent = get_consent_status(consentRequestId)
+    consent = await get_consent_status(consentRequestId)
     if not consent:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Consent request not found")
-    return ConsentStatusResponse(**consent)
+    return model_response(ConsentStatusResponse, consent)
 
 @router.post("/fetch", response_model=ConsentFetchResponse)
-def fetch_consent_endpoint(body: ConsentFetchRequest,
+async def fetch_consent_endpoint(body: ConsentFetchRequest,
                            token=Depends(get_current_token),
                            headers=Depends(require_gateway_headers)):
-    consent = fetch_consent(body.consentRequestId)
+    consent = await fetch_consent(body.consentRequestId)
     if not consent:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Consent not found")
-    return ConsentFetchResponse(**consent)
+    return model_response(ConsentFetchResponse, consent)
 
 @router.post("/notify")
-def notify_consent_endpoint(body: ConsentNotifyRequest):
-    return notify_consent(body.consentRequestId, body.status)
\ No newline at end of file
+async def notify_consent_endpoint(body: ConsentNotifyRequest):
+    return await notify_consent(body.consentRequestId, body.status)
\ No newline at end of file
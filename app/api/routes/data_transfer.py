@@ -1,47 +1,159 @@
-from fastapi import APIRouter, Depends, HTTPException, status 
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status 
+from fastapi.responses import StreamingResponse
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+
 from app.deps.headers import require_gateway_headers
 from app.deps.auth import get_current_token
+from app.deps.rate_limit import enforce_hip_rate
 from app.api.schemas import (
     SendHealthInfoRequest, SendHealthInfoResponse,
     RequestHealthInfoRequest, RequestHealthInfoResponse,
     DataFlowNotifyRequest, DataFlowNotifyResponse,
+    RequestHealthInfoBatchRequest, BatchResponse
 )
 from app.services.data_service import (
     send_health_info, request_health_info,
-    get_data_request_status, notify_data_flow
+    get_data_request_status, notify_data_flow,
+    health_info_blob_writer, send_health_info_blob,
+    request_health_info_many, read_health_info
 )
+from app.utils.base64_stream import Base64StreamDecoder
+from app.utils.batch import batch_results, validate_batch_items
+from app.utils.json_stream import JsonFieldSpooler
+from app.utils.responses import model_response
+
 router = APIRouter(prefix="/data", tags=["data-transfer"])
 
+# request chunks are small; spool them in batches to keep thread hops few
+_SPOOL_BATCH_BYTES = 1 << 18
+_READ_CHUNK_BYTES = 1 << 20
+
+def _transfer_queue_full(exc: OverflowError) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc),
+                         headers={"Retry-After": "1"})
+
 @router.post("/health-info", response_model=SendHealthInfoResponse)
-def send_health_info_endpoint(body: SendHealthInfoRequest,
+async def send_health_info_endpoint(body: SendHealthInfoRequest,
                               token=Depends(get_current_token),
                               headers=Depends(require_gateway_headers)):
-    return SendHealthInfoResponse(
-        **send_health_info(body.txnId, body.patientId, body.hipId,
-                           body.careContextId, body.healthInfo.dict(), 
-                           body.metadata.dict())
+    await enforce_hip_rate([body.hipId])
+    try:
+        received = await send_health_info(body.txnId, body.patientId, body.hipId,
+                                          body.careContextId, body.healthInfo.dict(),
+                                          body.metadata.dict())
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return model_response(SendHealthInfoResponse, received)
+
+@router.post("/health-info/stream", response_model=SendHealthInfoResponse)
+async def stream_health_info_endpoint(request: Request,
+                                      token=Depends(get_current_token),
+                                      headers=Depends(require_gateway_headers)):
+    # Same contract as /health-info, but encryptedData is decoded and spooled
+    # to the blob store while the body streams in instead of being parsed into memory.
+    # Decoding, hashing and file writes run in a worker thread, off the event loop.
+    writer = health_info_blob_writer()
+    try:
+        decoder = Base64StreamDecoder(writer.write)
+        spooler = JsonFieldSpooler("encryptedData", decoder.feed)
+        try:
+            pending, buffered = [], 0
+            async for chunk in request.stream():
+                pending.append(chunk)
+                buffered += len(chunk)
+                if buffered >= _SPOOL_BATCH_BYTES:
+                    await asyncio.to_thread(spooler.feed, b"".join(pending))
+                    pending, buffered = [], 0
+            if pending:
+                await asyncio.to_thread(spooler.feed, b"".join(pending))
+            parsed = json.loads(spooler.close())
+            if not isinstance(parsed, dict):
+                raise ValueError("expected a JSON object")
+            body = SendHealthInfoRequest(**parsed)
+            decoder.close()
+        except ValidationError as exc:
+            raise RequestValidationError(exc.errors())
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Malformed health-info body: {exc}")
+        if not spooler.found:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail="healthInfo.encryptedData must be a string")
+        await enforce_hip_rate([body.hipId])
+        blob_ref = await asyncio.to_thread(writer.commit)
+    finally:
+        # a no-op after commit; otherwise drops the spool file on every error path
+        writer.discard()
+
+    return model_response(SendHealthInfoResponse,
+        await send_health_info_blob(body.txnId, body.patientId, body.hipId,
+                                body.careContextId, blob_ref, writer.size,
+                                body.healthInfo.keyMaterial, body.metadata.dict())
     )
 
+@router.get("/health-info/{data_id}/content")
+async def health_info_content_endpoint(data_id: str,
+                                       if_none_match: Optional[str] = Header(default=None),
+                                       token=Depends(get_current_token)):
+    # The decoded encryptedData, sent in slices of the segment's mmap; pages
+    # are only read as each slice is written out. The blobRef is a content hash.
+    found = await read_health_info(data_id)
+    if found is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Health data not found")
+    record, view = found
+    headers = {"ETag": f'"{record["healthInfo"]["blobRef"]}"',
+               "X-Key-Material": record["healthInfo"]["keyMaterial"]}
+    if if_none_match and headers["ETag"] in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    chunks = (view[offset:offset + _READ_CHUNK_BYTES] for offset in range(0, len(view), _READ_CHUNK_BYTES))
+    return StreamingResponse(chunks, media_type="application/octet-stream",
+                             headers={**headers, "Content-Length": str(len(view))})
+
 @router.post("/request-info", response_model=RequestHealthInfoResponse)
-def request_health_info_endpoint(body: RequestHealthInfoRequest,
+async def request_health_info_endpoint(body: RequestHealthInfoRequest,
                                  token=Depends(get_current_token),
                                  headers=Depends(require_gateway_headers)):
-    return RequestHealthInfoResponse(
-        **request_health_info(body.patientId, body.hipId,
-                              body.careContextId, body.dataTypes)
-    )
+    await enforce_hip_rate([body.hipId])
+    try:
+        requested = await request_health_info(body.patientId, body.hipId,
+                                              body.careContextId, body.dataTypes)
+    except OverflowError as exc:
+        raise _transfer_queue_full(exc)
+    return model_response(RequestHealthInfoResponse, requested)
+
+@router.post("/request-info:batch", response_model=BatchResponse)
+async def request_health_info_batch_endpoint(body: RequestHealthInfoBatchRequest,
+                                       token=Depends(get_current_token),
+                                       headers=Depends(require_gateway_headers)):
+    valid, errors = validate_batch_items(RequestHealthInfoRequest, body.requests)
+    await enforce_hip_rate(item.hipId for _, item in valid)
+    try:
+        created = await request_health_info_many([
+            (item.patientId, item.hipId, item.careContextId, item.dataTypes) for _, item in valid
+        ])
+    except OverflowError as exc:
+        raise _transfer_queue_full(exc)
+    responses = {index: result for (index, _), result in zip(valid, created)}
+    return model_response(BatchResponse, batch_results(len(body.requests), responses, errors))
 
 @router.get("/request/{request_id}")
-def get_request_status_endpoint(request_id: str,
+async def get_request_status_endpoint(request_id: str,
                                 token: dict = Depends(get_current_token)):
-    request_status = get_data_request_status(request_id)
+    request_status = await get_data_request_status(request_id)
     if not request_status:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Request not found")
     return request_status
 
 @router.post("/notify", response_model=DataFlowNotifyResponse)
-def data_flow_notify_endpoint(body: DataFlowNotifyRequest):
-    return DataFlowNotifyResponse(
-        **notify_data_flow(body.txnId, body.status, body.hipId)
+async def data_flow_notify_endpoint(body: DataFlowNotifyRequest):
+    await enforce_hip_rate([body.hipId])
+    return model_response(DataFlowNotifyResponse,
+        await notify_data_flow(body.txnId, body.status, body.hipId)
     )
\ No newline at end of file
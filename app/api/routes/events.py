@@ -0,0 +1,70 @@
+import json
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import get_settings
+from app.deps.auth import get_current_token
+from app.services.bridge_service import authorized_hips
+from app.services.event_bus import Subscription, SubscriptionLagged, event_bus
+
+settings = get_settings()
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+def _frame(event: dict) -> bytes:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+
+async def _stream(request: Request, subscription: Subscription, last_event_id: Optional[str]):
+    # registered here, inside the try, so a response that is never iterated
+    # (client gone before the body starts) leaves no subscription behind
+    try:
+        try:
+            event_bus.attach(subscription, last_event_id)
+        except OverflowError:
+            return
+        # tells EventSource how long to wait before reconnecting
+        yield b"retry: 1000\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await subscription.get(settings.events_heartbeat_seconds)
+            except SubscriptionLagged:
+                # the client reconnects with Last-Event-ID and catches up from history
+                return
+            # comment lines keep proxies from closing an idle connection
+            yield _frame(event) if event else b": keep-alive\n\n"
+    finally:
+        event_bus.unsubscribe(subscription)
+
+@router.get("/stream")
+async def stream_events_endpoint(request: Request,
+                           consentRequestId: Optional[str] = None,
+                           requestId: Optional[str] = None,
+                           txnId: Optional[str] = None,
+                           patientId: Optional[str] = None,
+                           hipId: Optional[str] = None,
+                           types: List[str] = Query(default=[], alias="type"),
+                           last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+                           token=Depends(get_current_token)):
+    """Server-Sent Events of consent, link and data-flow state changes
+    matching every given filter, instead of polling the status routes. Only
+    events of HIPs the caller's bridge serves are streamed."""
+    hip_ids = await authorized_hips(token["clientId"])
+    if hipId and hipId not in hip_ids:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"Not authorized for HIP {hipId}")
+    try:
+        subscription = event_bus.prepare({
+            "consentRequestId": consentRequestId,
+            "requestId": requestId,
+            "txnId": txnId,
+            "patientId": patientId,
+            "hipId": hipId
+        }, types, hip_ids)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    except OverflowError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc),
+                            headers={"Retry-After": "5"})
+    return StreamingResponse(_stream(request, subscription, last_event_id), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -1,51 +1,124 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from app.deps.headers import require_gateway_headers
 from app.deps.auth import get_current_token
+from app.deps.rate_limit import enforce_hip_rate
 from app.api.schemas import (
     LinkTokenRequest, LinkTokenResponse,
     LinkCareContextRequest, LinkCareContextResponse,
     DiscoverPatientRequest, DiscoverPatientResponse,
-    LinkInitRequest, LinkInitResponse,
+    LinkInitRequest, LinkInitResponse, LinkInitBatchRequest,
     LinkConfirmRequest, LinkConfirmResponse,
-    LinkNotifyRequest
+    LinkNotifyRequest, PatientCareContextsResponse,
+    BatchResponse
 )
 from app.services.linking_service import (
     generate_link_token, link_care_contexts,
-    discover_patient, init_link, confirm_link, notify_link
+    discover_patient, init_link, confirm_link, notify_link,
+    get_patient_care_contexts, LinkTransactionExists
 )
+from app.utils.batch import batch_results, item_error, validate_batch_items
+from app.utils.responses import model_response
 
 router = APIRouter(prefix="/link", tags=["linking"])
 
+def _txn_not_found() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Link transaction not found")
+
 @router.post("/token/generate", response_model=LinkTokenResponse)
-def generate_token(body: LinkTokenRequest,
+async def generate_token(body: LinkTokenRequest,
                     token=Depends(get_current_token),
                     headers=Depends(require_gateway_headers)):
-    return LinkTokenResponse(**generate_link_token(body.patientId, body.hipId))
+    await enforce_hip_rate([body.hipId])
+    return model_response(LinkTokenResponse, await generate_link_token(body.patientId, body.hipId))
 
 @router.post("/carecontext", response_model=LinkCareContextResponse)
-def link_carecontext(body: LinkCareContextRequest,
+async def link_carecontext(body: LinkCareContextRequest,
                      token=Depends(get_current_token),
                      headers=Depends(require_gateway_headers)):
-    return LinkCareContextResponse(**link_care_contexts(body.patientId, [cc.dict() for cc in body.careContexts]))
+    try:
+        pending = await link_care_contexts(body.patientId, body.txnId, [cc.dict() for cc in body.careContexts])
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if not pending:
+        raise _txn_not_found()
+    return model_response(LinkCareContextResponse, pending)
 
 @router.post("/discover", response_model=DiscoverPatientResponse)
-def discover(body: DiscoverPatientRequest,
+async def discover(body: DiscoverPatientRequest,
              token=Depends(get_current_token),
              headers=Depends(require_gateway_headers)):
-    return DiscoverPatientResponse(**discover_patient(body.mobile, body.name))
+    try:
+        patient = await discover_patient(body.mobile, body.name)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if not patient:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="No matching patient")
+    return model_response(DiscoverPatientResponse, patient)
 
 @router.post("/init", response_model=LinkInitResponse)
-def init(body: LinkInitRequest,
+async def init(body: LinkInitRequest,
                        token=Depends(get_current_token),
                        headers=Depends(require_gateway_headers)):
-    return LinkInitResponse(**init_link(body.patientId, body.txnId))
+    await enforce_hip_rate([body.hipId])
+    try:
+        initiated = await init_link(body.patientId, body.txnId, body.hipId, [cc.dict() for cc in body.careContexts])
+    except LinkTransactionExists as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    except OverflowError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc),
+                            headers={"Retry-After": "1"})
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return model_response(LinkInitResponse, initiated)
+
+@router.post("/init:batch", response_model=BatchResponse)
+async def init_batch(body: LinkInitBatchRequest,
+                     token=Depends(get_current_token),
+                     headers=Depends(require_gateway_headers)):
+    valid, errors = validate_batch_items(LinkInitRequest, body.requests)
+    await enforce_hip_rate(item.hipId for _, item in valid)
+    responses = {}
+    # one transaction per item, so a taken txnId or bad item fails only itself
+    for index, item in valid:
+        try:
+            responses[index] = await init_link(item.patientId, item.txnId, item.hipId,
+                                               [cc.dict() for cc in item.careContexts])
+        except LinkTransactionExists as exc:
+            errors[index] = item_error("CONFLICT", str(exc))
+        except OverflowError as exc:
+            errors[index] = item_error("UNAVAILABLE", str(exc))
+        except ValueError as exc:
+            errors[index] = item_error("INVALID_REQUEST", str(exc))
+    return model_response(BatchResponse, batch_results(len(body.requests), responses, errors))
 
 @router.post("/confirm", response_model=LinkConfirmResponse)
-def confirm(body: LinkConfirmRequest,
+async def confirm(body: LinkConfirmRequest,
                           token=Depends(get_current_token),
                           headers=Depends(require_gateway_headers)):
-    return LinkConfirmResponse(**confirm_link(body.patientId, body.txnId, body.otp))
+    try:
+        confirmed = await confirm_link(body.patientId, body.txnId, body.otp)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if not confirmed:
+        raise _txn_not_found()
+    return model_response(LinkConfirmResponse, confirmed)
+
+@router.get("/patients/{patient_id}/care-contexts", response_model=PatientCareContextsResponse)
+async def patient_care_contexts(patient_id: str,
+                                hipId: Optional[str] = None,
+                                token=Depends(get_current_token),
+                                headers=Depends(require_gateway_headers)):
+    return model_response(PatientCareContextsResponse, {
+        "patientId": patient_id,
+        "careContexts": await get_patient_care_contexts(patient_id, hipId)
+    })
 
 @router.post("/notify")
-def notify(body: LinkNotifyRequest):
-    return notify_link(body.txnId, body.status)
\ No newline at end of file
+async def notify(body: LinkNotifyRequest):
+    try:
+        return await notify_link(body.txnId, body.status)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
\ No newline at end of file
@@ -2,26 +2,30 @@ from .auth import SessionRequest, SessionResponse
 from .bridge import (  # noqa: F401
     BridgeRegisterRequest, BridgeRegisterResponse,
     BridgeUrlUpdateRequest, BridgeUrlUpdateResponse,
-    BridgeService
+    BridgeService, BridgeServiceCreateRequest, BridgeServiceUpdateRequest
 )
 from .linking import (  # noqa: F401
     LinkTokenRequest, LinkTokenResponse,
     LinkCareContextRequest, LinkCareContextResponse, CareContext,
     DiscoverPatientRequest, DiscoverPatientResponse,
-    LinkInitRequest, LinkInitResponse,
+    LinkInitRequest, LinkInitResponse, LinkInitBatchRequest,
     LinkConfirmRequest, LinkConfirmResponse,
-    LinkNotifyRequest
+    LinkNotifyRequest, LinkedCareContext, PatientCareContextsResponse
 )
 from .consent import (  # noqa: F401
     ConsentInitRequest, ConsentInitResponse,
     ConsentStatusResponse,
     ConsentFetchRequest, ConsentFetchResponse,
-    ConsentNotifyRequest, ConsentPurpose
+    ConsentNotifyRequest, ConsentPurpose,
+    ConsentInitBatchRequest, ConsentStatusBatchRequest,
+    ConsentSummary, ConsentSearchResponse
 )
 
 from .data_transfer import (  # noqa: F401
     SendHealthInfoRequest, SendHealthInfoResponse,
     RequestHealthInfoRequest, RequestHealthInfoResponse,
     DataFlowNotifyRequest, DataFlowNotifyResponse,
-    EncryptedHealthInfo, HealthInfoMetadata
-)
\ No newline at end of file
+    EncryptedHealthInfo, HealthInfoMetadata,
+    RequestHealthInfoBatchRequest
+)
+from .batch import BatchItemError, BatchItemResult, BatchResponse  # noqa: F401
\ No newline at end of file
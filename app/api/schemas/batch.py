@@ -0,0 +1,15 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+
+class BatchItemError(BaseModel):
+    code: str
+    message: str
+    details: Optional[Dict[str, Any]] = None
+
+class BatchItemResult(BaseModel):
+    index: int
+    response: Optional[Dict[str, Any]] = None
+    error: Optional[BatchItemError] = None
+
+class BatchResponse(BaseModel):
+    results: List[BatchItemResult]
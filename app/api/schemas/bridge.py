@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Optional
 from pydantic import BaseModel, HttpUrl
 
 class BridgeRegisterRequest(BaseModel):
@@ -23,4 +23,14 @@ class BridgeService(BaseModel):
     id: str
     name: str
     active: bool = True
-    version: str = "v1"
\ No newline at end of file
+    version: str = "v1"
+
+class BridgeServiceCreateRequest(BaseModel):
+    id: str
+    name: str
+    version: str = "v1"
+
+class BridgeServiceUpdateRequest(BaseModel):
+    name: Optional[str] = None
+    version: Optional[str] = None
+    active: Optional[bool] = None
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -31,4 +31,24 @@ class ConsentFetchResponse(BaseModel):
 
 class ConsentNotifyRequest(BaseModel):
     consentRequestId: str
-    status: str
\ No newline at end of file
+    status: str
+
+class ConsentInitBatchRequest(BaseModel):
+    # Items are validated one by one so a bad item only fails itself
+    requests: List[Any]
+
+class ConsentStatusBatchRequest(BaseModel):
+    consentRequestIds: List[str]
+
+class ConsentSummary(BaseModel):
+    consentRequestId: str
+    patientId: str
+    hipId: str
+    status: str
+    purpose: Optional[dict] = None
+    requestedAt: Optional[str] = None
+    grantedAt: Optional[str] = None
+
+class ConsentSearchResponse(BaseModel):
+    consents: List[ConsentSummary]
+    nextCursor: Optional[str] = None
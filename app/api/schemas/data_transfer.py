@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Any, Optional, List
 from pydantic import BaseModel
 
 class HealthInfoMetadata(BaseModel):
@@ -20,6 +20,7 @@ class SendHealthInfoRequest(BaseModel):
 class SendHealthInfoResponse(BaseModel):
     status: str = "RECEIVED"
     txnId: str
+    dataId: str
 
 class RequestHealthInfoRequest(BaseModel):
     patientId: str
@@ -37,4 +38,8 @@ class DataFlowNotifyRequest(BaseModel):
     hipId: str
 
 class DataFlowNotifyResponse(BaseModel):
-    status: str  = "ACKNOWLEDGED" # "NOTIFIED", "FAILED", etc.
\ No newline at end of file
+    status: str  = "ACKNOWLEDGED" # "NOTIFIED", "FAILED", etc.
+
+class RequestHealthInfoBatchRequest(BaseModel):
+    # Items are validated one by one so a bad item only fails itself
+    requests: List[Any]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 from pydantic import BaseModel
 
 class LinkTokenRequest(BaseModel):
@@ -15,10 +15,13 @@ class CareContext(BaseModel):
 
 class LinkCareContextRequest(BaseModel):
     patientId: str
+    txnId: str
     careContexts: List[CareContext]
 
 class LinkCareContextResponse(BaseModel):
     status: str = "PENDING"
+    txnId: str
+    pending: int = 0
 
 class DiscoverPatientRequest(BaseModel):
     mobile: str
@@ -31,6 +34,12 @@ class DiscoverPatientResponse(BaseModel):
 class LinkInitRequest(BaseModel):
     patientId: str
     txnId: str
+    hipId: str
+    careContexts: List[CareContext] = []
+
+class LinkInitBatchRequest(BaseModel):
+    # Items are validated one by one so a bad item only fails itself
+    requests: List[Any]
 
 class LinkInitResponse(BaseModel):
     status: str = "INITIATED"
@@ -44,6 +53,15 @@ class LinkConfirmRequest(BaseModel):
 class LinkConfirmResponse(BaseModel):
     status: str = "CONFIRMED"
     txnId: str
+    linked: int = 0
+
+class LinkedCareContext(CareContext):
+    hipId: Optional[str] = None
+    linkedAt: str
+
+class PatientCareContextsResponse(BaseModel):
+    patientId: str
+    careContexts: List[LinkedCareContext]
 
 class LinkNotifyRequest(BaseModel):
     txnId: str
@@ -0,0 +1,273 @@
+import json
+import random
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+from app.core.config import get_settings
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
+settings = get_settings()
+
+# Raw values captured on the request path; formatting happens on the writer thread:
+# (time, method, route, path, status, duration, request id, cm id, client, bytes sent, sample rate)
+_Entry = Tuple[float, str, str, str, int, float, Optional[str], Optional[str], Optional[str], int, float]
+
+
+class SamplingRules:
+    """Per-route and per-status sample rates.
+
+    ``spec`` is a comma-separated list of ``key=rate`` where ``key`` is a route
+    template (``/api/consent/status/{consentRequestId}``), a status code or
+    class (``404``, ``5xx``), or both joined by ``@``. The most specific rule
+    wins: route@status, route@class, route, status, class, then ``default``.
+    Resolved rates are memoized per (route, status).
+    """
+
+    def __init__(self, spec: str = "", default: float = 1.0):
+        self.default = default
+        self._rules: Dict[str, float] = {}
+        for rule in filter(None, (part.strip() for part in spec.split(","))):
+            key, _, rate = rule.rpartition("=")
+            if not key:
+                raise ValueError(f"Access-log sample rule needs key=rate: {rule!r}")
+            self._rules[key.strip()] = min(max(float(rate), 0.0), 1.0)
+        self._resolved: Dict[Tuple[str, int], float] = {}
+
+    def rate(self, route: str, status: int) -> float:
+        rate = self._resolved.get((route, status))
+        if rate is None:
+            code, klass = str(status), f"{status // 100}xx"
+            for key in (f"{route}@{code}", f"{route}@{klass}", route, code, klass):
+                if key in self._rules:
+                    rate = self._rules[key]
+                    break
+            else:
+                rate = self.default
+            self._resolved[(route, status)] = rate
+        return rate
+
+
+def _open_sink(target: str):
+    if target in ("", "stdout", "-"):
+        return _StreamSink(sys.stdout.buffer)
+    parts = urlsplit(target)
+    if parts.scheme in ("tcp", "udp"):
+        return _SocketSink(parts.scheme, parts.hostname, parts.port)
+    return _StreamSink(open(parts.path if parts.scheme == "file" else target, "ab"))
+
+
+class _StreamSink:
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, lines: List[bytes]) -> None:
+        self._stream.write(b"".join(lines))
+        self._stream.flush()
+
+    def close(self) -> None:
+        if self._stream is not sys.stdout.buffer:
+            self._stream.close()
+
+
+class _SocketSink:
+    """Newline-delimited JSON over TCP (one send per batch, reconnecting after
+    errors) or UDP (one datagram per line)."""
+
+    def __init__(self, scheme: str, host: str, port: int):
+        self._scheme = scheme
+        self._address = (host, port)
+        self._sock: Optional[socket.socket] = None
+
+    def write(self, lines: List[bytes]) -> None:
+        if self._scheme == "udp":
+            if self._sock is None:
+                self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            for line in lines:
+                self._sock.sendto(line, self._address)
+            return
+        if self._sock is None:
+            self._sock = socket.create_connection(self._address, timeout=5)
+        try:
+            self._sock.sendall(b"".join(lines))
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class AccessLog:
+    """Bounded, non-blocking access-log pipeline.
+
+    ``record`` only appends a tuple of raw values to a deque; when
+    ``max_queue`` entries are already waiting the entry is dropped and
+    counted instead of blocking the request. A writer thread wakes every
+    ``flush_interval`` seconds, formats whatever is queued as JSON lines and
+    hands the sink batches of up to ``batch_size``.
+    """
+
+    def __init__(self, sink: str = "stdout", max_queue: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 0.2):
+        self.sink = sink
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueued = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.written = 0
+        self.write_errors = 0
+        self._queue: Deque[_Entry] = deque()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, entry: _Entry) -> bool:
+        # len/append are atomic under the GIL; the bound may be overshot by a
+        # few entries when threads race, which is harmless
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return False
+        self._queue.append(entry)
+        self.enqueued += 1
+        return True
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="access-log", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        sink = _open_sink(self.sink)
+        try:
+            while not self._stopping.wait(self.flush_interval):
+                self.flush(sink)
+            self.flush(sink)
+        finally:
+            sink.close()
+
+    def flush(self, sink) -> int:
+        """Write out everything queued so far; returns how many entries were written."""
+        written = 0
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(_format(self._queue.popleft()))
+            try:
+                sink.write(batch)
+            except Exception as exc:  # a failing sink must not kill the writer
+                self.write_errors += 1
+                self.dropped += len(batch)
+                logger.warning(f"Access-log sink {self.sink} failed, dropped {len(batch)} entries: {exc}")
+                continue
+            written += len(batch)
+        self.written += written
+        return written
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": len(self._queue),
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "written": self.written,
+            "write_errors": self.write_errors,
+        }
+
+
+def _format(entry: _Entry) -> bytes:
+    ts, method, route, path, status, duration, request_id, cm_id, client, size, rate = entry
+    record = {
+        "ts": datetime.fromtimestamp(ts, timezone.utc).isoformat(),
+        "method": method,
+        "route": route,
+        "path": path,
+        "status": status,
+        "durationMs": round(duration * 1e3, 3),
+        "requestId": request_id,
+        "cmId": cm_id,
+        "client": client,
+        "bytes": size,
+        "sampleRate": rate,
+    }
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+
+access_log = AccessLog(
+    sink=settings.access_log_sink,
+    max_queue=settings.access_log_queue_size,
+    batch_size=settings.access_log_batch_size,
+    flush_interval=settings.access_log_flush_seconds,
+)
+
+
+class AccessLogMiddleware:
+    """Pure ASGI middleware recording one structured entry per sampled request.
+
+    Entries are correlated by the ``REQUEST-ID`` header and carry the rate
+    they were sampled at, so counts can be re-weighted downstream.
+    """
+
+    def __init__(self, app, log: AccessLog = access_log, rules: Optional[SamplingRules] = None):
+        self.app = app
+        self.log = log
+        self.rules = rules or SamplingRules(settings.access_log_sample_rules, settings.access_log_sample_rate)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        size = 0
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            rate = self.rules.rate(route, status_code)
+            if rate >= 1.0 or random.random() < rate:
+                request_id = cm_id = None
+                for name, value in scope["headers"]:
+                    if name == b"request-id":
+                        request_id = value.decode("latin-1")
+                    elif name == b"x-cm-id":
+                        cm_id = value.decode("latin-1")
+                client = scope.get("client")
+                self.log.record((time.time(), scope["method"], route, scope["path"], status_code, duration,
+                                 request_id, cm_id, client[0] if client else None, size, rate))
+            else:
+                self.log.sampled_out += 1
@@ -10,11 +10,95 @@ class Settings:
         self.app_env: Literal["local", "dev", "prod"] = os.getenv("APP_ENV", "local")
         self.app_host: str = os.getenv("APP_HOST", "0.0.0.0")
         self.app_port: int = int(os.getenv("APP_PORT", "8000"))
+        self.workers: int = int(os.getenv("WORKERS", "1"))
         self.log_level: str = os.getenv("LOG_LEVEL", "INFO")
         self.cm_id: str = os.getenv("CM_ID", "sbx")
         self.jwt_secret: str = os.getenv("JWT_SECRET", "secret")
         self.jwt_alg: str = os.getenv("JWT_ALG", "HS256")
         self.jwt_expiry_seconds: int = int(os.getenv("JWT_EXPIRY_SECONDS", "900"))
+        self.jwt_keys_dir: str = os.getenv("JWT_KEYS_DIR", "")
+        self.jwt_key_rotation_seconds: int = int(os.getenv("JWT_KEY_ROTATION_SECONDS", "0"))
+        self.jwks_max_age_seconds: int = int(os.getenv("JWKS_MAX_AGE_SECONDS", "300"))
+        self.token_cache_size: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+        self.clients_file: str = os.getenv("CLIENTS_FILE", "")
+        self.clients_reload_seconds: float = float(os.getenv("CLIENTS_RELOAD_SECONDS", "0"))
+        self.client_secret_hash_iterations: int = int(os.getenv("CLIENT_SECRET_HASH_ITERATIONS", "200000"))
+        self.client_auth_cache_size: int = int(os.getenv("CLIENT_AUTH_CACHE_SIZE", "10000"))
+        self.client_auth_cache_ttl_seconds: int = int(os.getenv("CLIENT_AUTH_CACHE_TTL_SECONDS", "60"))
+        self.client_token_rate_per_second: float = float(os.getenv("CLIENT_TOKEN_RATE_PER_SECOND", "10"))
+        self.client_token_burst: int = int(os.getenv("CLIENT_TOKEN_BURST", "50"))
+        self.client_auth_failure_rate_per_second: float = float(os.getenv("CLIENT_AUTH_FAILURE_RATE_PER_SECOND", "1"))
+        self.client_auth_failure_burst: int = int(os.getenv("CLIENT_AUTH_FAILURE_BURST", "20"))
+        self.trusted_proxies: frozenset = frozenset(
+            address.strip() for address in os.getenv("TRUSTED_PROXIES", "").split(",") if address.strip())
+        self.patient_index_file: str = os.getenv("PATIENT_INDEX_FILE", "")
+        self.patient_index_reload_seconds: float = float(os.getenv("PATIENT_INDEX_RELOAD_SECONDS", "0"))
+        self.discovery_name_threshold: float = float(os.getenv("DISCOVERY_NAME_THRESHOLD", "0.75"))
+        self.storage_backend: Literal["memory", "sqlite", "redis"] = os.getenv("STORAGE_BACKEND", "memory")
+        self.sqlite_path: str = os.getenv("SQLITE_PATH", "abdm_gateway.db")
+        self.sqlite_pool_size: int = int(os.getenv("SQLITE_POOL_SIZE", "4"))
+        self.redis_url: str = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+        self.redis_prefix: str = os.getenv("REDIS_PREFIX", "abdm")
+        self.redis_pool_size: int = int(os.getenv("REDIS_POOL_SIZE", "32"))
+        self.bridge_directory_ttl_seconds: float = float(os.getenv("BRIDGE_DIRECTORY_TTL_SECONDS", "5"))
+        self.link_token_ttl_seconds: int = int(os.getenv("LINK_TOKEN_TTL_SECONDS", "300"))
+        self.link_txn_ttl_seconds: int = int(os.getenv("LINK_TXN_TTL_SECONDS", "3600"))
+        self.link_otp_ttl_seconds: int = int(os.getenv("LINK_OTP_TTL_SECONDS", "300"))
+        self.link_otp_max_attempts: int = int(os.getenv("LINK_OTP_MAX_ATTEMPTS", "5"))
+        self.link_otp_secret: str = os.getenv("LINK_OTP_SECRET", "")
+        self.link_fixed_otp: str = os.getenv("LINK_FIXED_OTP", "")
+        self.link_max_care_contexts: int = int(os.getenv("LINK_MAX_CARE_CONTEXTS", "1000"))
+        self.consent_request_ttl_seconds: int = int(os.getenv("CONSENT_REQUEST_TTL_SECONDS", "86400"))
+        self.data_request_ttl_seconds: int = int(os.getenv("DATA_REQUEST_TTL_SECONDS", "86400"))
+        self.health_data_ttl_seconds: int = int(os.getenv("HEALTH_DATA_TTL_SECONDS", "86400"))
+        self.reaper_interval_seconds: float = float(os.getenv("REAPER_INTERVAL_SECONDS", "5"))
+        self.reaper_batch_size: int = int(os.getenv("REAPER_BATCH_SIZE", "500"))
+        self.webhook_queue_size: int = int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000"))
+        self.webhook_batch_size: int = int(os.getenv("WEBHOOK_BATCH_SIZE", "20"))
+        self.webhook_concurrency: int = int(os.getenv("WEBHOOK_CONCURRENCY", "16"))
+        self.webhook_max_attempts: int = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "5"))
+        self.webhook_timeout_seconds: float = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "5"))
+        self.webhook_idle_seconds: float = float(os.getenv("WEBHOOK_IDLE_SECONDS", "300"))
+        self.events_backend: Literal["memory", "redis"] = os.getenv("EVENTS_BACKEND", "memory")
+        self.events_queue_size: int = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+        self.events_history_size: int = int(os.getenv("EVENTS_HISTORY_SIZE", "1000"))
+        self.events_max_subscribers: int = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", "10000"))
+        self.events_heartbeat_seconds: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+        self.data_transfer_workers: int = int(os.getenv("DATA_TRANSFER_WORKERS", "32"))
+        self.data_transfer_per_hip_concurrency: int = int(os.getenv("DATA_TRANSFER_PER_HIP_CONCURRENCY", "4"))
+        self.data_transfer_max_queue: int = int(os.getenv("DATA_TRANSFER_MAX_QUEUE", "10000"))
+        self.data_transfer_max_attempts: int = int(os.getenv("DATA_TRANSFER_MAX_ATTEMPTS", "3"))
+        self.data_transfer_timeout_seconds: float = float(os.getenv("DATA_TRANSFER_TIMEOUT_SECONDS", "10"))
+        self.data_transfer_claim_seconds: float = float(os.getenv("DATA_TRANSFER_CLAIM_SECONDS", "300"))
+        self.blob_store_path: str = os.getenv("BLOB_STORE_PATH", "blobs")
+        self.blob_segment_max_bytes: int = int(os.getenv("BLOB_SEGMENT_MAX_BYTES", str(64 << 20)))
+        self.blob_retire_interval_seconds: float = float(os.getenv("BLOB_RETIRE_INTERVAL_SECONDS", "300"))
+        self.batch_max_items: int = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+        self.idempotency_enabled: bool = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() == "true"
+        self.idempotency_ttl_seconds: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "300"))
+        self.idempotency_max_entries: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+        self.idempotency_shared: bool = os.getenv("IDEMPOTENCY_SHARED", "true").lower() == "true"
+        self.rate_limit_backend: Literal["memory", "redis"] = os.getenv("RATE_LIMIT_BACKEND", "memory")
+        self.rate_limit_client_per_second: float = float(os.getenv("RATE_LIMIT_CLIENT_PER_SECOND", "0"))
+        self.rate_limit_client_burst: int = int(os.getenv("RATE_LIMIT_CLIENT_BURST", "200"))
+        self.rate_limit_cm_per_second: float = float(os.getenv("RATE_LIMIT_CM_PER_SECOND", "0"))
+        self.rate_limit_cm_burst: int = int(os.getenv("RATE_LIMIT_CM_BURST", "2000"))
+        self.rate_limit_hip_per_second: float = float(os.getenv("RATE_LIMIT_HIP_PER_SECOND", "0"))
+        self.rate_limit_hip_burst: int = int(os.getenv("RATE_LIMIT_HIP_BURST", "100"))
+        self.admission_max_concurrency: int = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "512"))
+        self.admission_max_queue: int = int(os.getenv("ADMISSION_MAX_QUEUE", "1024"))
+        self.admission_queue_timeout_seconds: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "1"))
+        self.gateway_middleware: bool = os.getenv("GATEWAY_MIDDLEWARE", "true").lower() == "true"
+        self.fast_responses: bool = os.getenv("FAST_RESPONSES", "true").lower() == "true"
+        self.access_log_enabled: bool = os.getenv("ACCESS_LOG_ENABLED", "false").lower() == "true"
+        self.access_log_sink: str = os.getenv("ACCESS_LOG_SINK", "stdout")
+        self.access_log_sample_rate: float = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1"))
+        self.access_log_sample_rules: str = os.getenv("ACCESS_LOG_SAMPLE_RULES", "/health=0,/metrics=0,4xx=1,5xx=1")
+        self.access_log_queue_size: int = int(os.getenv("ACCESS_LOG_QUEUE_SIZE", "10000"))
+        self.access_log_batch_size: int = int(os.getenv("ACCESS_LOG_BATCH_SIZE", "500"))
+        self.access_log_flush_seconds: float = float(os.getenv("ACCESS_LOG_FLUSH_SECONDS", "0.2"))
+        self.metrics_enabled: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+        self.metrics_store_count_seconds: float = float(os.getenv("METRICS_STORE_COUNT_SECONDS", "30"))
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
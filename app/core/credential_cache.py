@@ -0,0 +1,65 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+
+class CredentialCache:
+    """Bounded LRU of recently verified (client id, secret digest) pairs.
+
+    Secrets are digested with a per-process random HMAC key, so the cache holds
+    nothing usable outside this process. Entries expire after ``ttl`` seconds and
+    are dropped for a client as soon as its secret is rotated in this process;
+    ``ttl`` bounds how long other workers may keep accepting a rotated secret.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._hmac_key = os.urandom(32)
+        self._entries: "OrderedDict[Tuple[str, bytes], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, client_id: str, secret: str) -> Tuple[str, bytes]:
+        return client_id, hmac.new(self._hmac_key, secret.encode(), hashlib.sha256).digest()
+
+    def contains(self, key: Tuple[str, bytes]) -> bool:
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is None or expires_at <= time.monotonic():
+                if expires_at is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True
+
+    def add(self, key: Tuple[str, bytes]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = time.monotonic() + self.ttl
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, client_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == client_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
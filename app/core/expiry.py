@@ -0,0 +1,145 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from loguru import logger
+
+from app.storage import Repository, all_repositories
+
+
+class ExpiryRegistry:
+    """Min-heap of record deadlines across repositories.
+
+    Re-registering or cancelling a key only updates ``_deadlines``; the stale
+    heap entry is skipped when it surfaces (lazy deletion), so both stay O(log n).
+    Repositories with ``native_expiry`` keep their deadlines in the shared
+    store instead, so the heap only tracks process-local records.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str, str]] = []
+        self._deadlines: Dict[Tuple[str, str], float] = {}
+        self._repos: Dict[str, Repository] = {}
+        self._live: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.reclaimed = 0
+        self.reclaim_rate = 0.0
+
+    async def register(self, repo: Repository, key: str, ttl_seconds: float) -> None:
+        if repo.native_expiry:
+            await repo.expire(key, ttl_seconds)
+            return
+        expires_at = time.time() + ttl_seconds
+        with self._lock:
+            self._repos[repo.name] = repo
+            if (repo.name, key) not in self._deadlines:
+                self._live[repo.name] = self._live.get(repo.name, 0) + 1
+            self._deadlines[(repo.name, key)] = expires_at
+            heapq.heappush(self._heap, (expires_at, next(self._seq), repo.name, key))
+
+    async def register_many(self, repo: Repository, keys: Iterable[str], ttl_seconds: float) -> None:
+        if repo.native_expiry:
+            await repo.expire_many(keys, ttl_seconds)
+            return
+        for key in keys:
+            await self.register(repo, key, ttl_seconds)
+
+    async def cancel(self, repo: Repository, key: str) -> None:
+        if repo.native_expiry:
+            await repo.persist(key)
+            return
+        with self._lock:
+            if self._deadlines.pop((repo.name, key), None) is not None:
+                self._live[repo.name] -= 1
+
+    def _pop_expired(self, now: float, limit: int) -> List[Tuple[str, str]]:
+        expired = []
+        with self._lock:
+            while self._heap and len(expired) < limit and self._heap[0][0] <= now:
+                expires_at, _, name, key = heapq.heappop(self._heap)
+                if self._deadlines.get((name, key)) != expires_at:
+                    continue
+                del self._deadlines[(name, key)]
+                self._live[name] -= 1
+                expired.append((name, key))
+        return expired
+
+    def _restore(self, keys: List[Tuple[str, str]]) -> None:
+        now = time.time()
+        with self._lock:
+            for name, key in keys:
+                if (name, key) in self._deadlines:
+                    continue  # re-registered meanwhile
+                self._live[name] = self._live.get(name, 0) + 1
+                self._deadlines[(name, key)] = now
+                heapq.heappush(self._heap, (now, next(self._seq), name, key))
+
+    async def reap(self, batch_size: int = 500) -> int:
+        """Delete at most ``batch_size`` expired records; returns how many."""
+        expired = self._pop_expired(time.time(), batch_size)
+        for done, (name, key) in enumerate(expired):
+            try:
+                await self._repos[name].delete(key)
+            except Exception:
+                # popped but not deleted: keep them due for the next sweep
+                self._restore(expired[done:])
+                with self._lock:
+                    self.reclaimed += done
+                raise
+        reaped = len(expired)
+        for repo in all_repositories().values():
+            if repo.native_expiry and reaped < batch_size:
+                reaped += await repo.reap_expired(time.time(), batch_size - reaped)
+        with self._lock:
+            self.reclaimed += reaped
+        return reaped
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "live": len(self._deadlines),
+                "liveByRepository": dict(self._live),
+                "reclaimed": self.reclaimed,
+                "reclaimRate": round(self.reclaim_rate, 2),
+            }
+
+
+expiry_registry = ExpiryRegistry()
+
+# longest pause between failing reaper sweeps, in seconds
+_MAX_BACKOFF = 60.0
+
+async def run_reaper(interval_seconds: float, batch_size: int) -> None:
+    """Reap expired records forever in bounded batches, yielding to the event
+    loop between batches so a large backlog never stalls request handling.
+    A failing sweep (a busy database, a dropped connection) is logged and
+    retried after an exponentially longer pause, up to ``_MAX_BACKOFF``."""
+    last_sweep = time.monotonic()
+    failures = 0
+    while True:
+        reclaimed = 0
+        try:
+            while True:
+                count = await expiry_registry.reap(batch_size)
+                reclaimed += count
+                if count < batch_size:
+                    break
+                await asyncio.sleep(0)
+        except Exception as exc:
+            failures += 1
+            delay = min(interval_seconds * 2 ** failures, _MAX_BACKOFF)
+            logger.exception(f"Reaper sweep failed ({failures} in a row), retrying in {delay:.0f}s: {exc}")
+            await asyncio.sleep(delay)
+            continue
+        failures = 0
+        now = time.monotonic()
+        # records reclaimed per second since the previous sweep
+        expiry_registry.reclaim_rate = reclaimed / max(now - last_sweep, 1e-9)
+        last_sweep = now
+        if reclaimed:
+            logger.debug(f"Reaped {reclaimed} expired records: {expiry_registry.stats()}")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,252 @@
+import asyncio
+import base64
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.expiry import expiry_registry
+from app.core.gateway import gateway_context
+from app.core.security import verify_access_token
+from app.storage import Repository, get_repository
+
+settings = get_settings()
+
+_IDEMPOTENT_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class CachedResponse:
+    __slots__ = ("body_digest", "status", "headers", "body", "expires_at")
+
+    def __init__(self, body_digest: bytes, status: int, headers: List[Tuple[bytes, bytes]],
+                 body: bytes, expires_at: float):
+        self.body_digest = body_digest
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.expires_at = expires_at
+
+
+class ReplayCache:
+    """Bounded LRU of completed responses keyed by (client, REQUEST-ID), expiring after ``ttl``.
+
+    With a ``store`` (the shared storage backend) every response is also
+    written there, so a retry that lands on another worker is replayed too;
+    the LRU then serves repeats without a round trip.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 300, store: Optional[Repository] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.replays = 0
+        self.coalesced = 0
+        self._store = store
+        self._entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    async def lookup(self, key: Tuple[str, str]) -> Optional[CachedResponse]:
+        """``get``, falling back to the shared store when there is one."""
+        entry = self.get(key)
+        if entry is not None or self._store is None:
+            return entry
+        record = await self._store.get(_store_key(key))
+        if record is None or record["expiresAt"] <= time.time():
+            return None
+        entry = CachedResponse(base64.b64decode(record["bodyDigest"]), record["status"],
+                               [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]],
+                               base64.b64decode(record["body"]), record["expiresAt"])
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: Tuple[str, str], body_digest: bytes, status: int,
+            headers: List[Tuple[bytes, bytes]], body: bytes) -> CachedResponse:
+        entry = CachedResponse(body_digest, status, headers, body, time.time() + self.ttl)
+        self._remember(key, entry)
+        return entry
+
+    async def store(self, key: Tuple[str, str], body_digest: bytes, status: int,
+                    headers: List[Tuple[bytes, bytes]], body: bytes) -> CachedResponse:
+        """``put``, also writing the response to the shared store when there is one."""
+        entry = self.put(key, body_digest, status, headers, body)
+        if self._store is not None:
+            store_key = _store_key(key)
+            await self._store.put(store_key, {
+                "bodyDigest": base64.b64encode(body_digest).decode(),
+                "status": status,
+                "headers": [(name.decode("latin-1"), value.decode("latin-1")) for name, value in headers],
+                "body": base64.b64encode(body).decode(),
+                "expiresAt": entry.expires_at
+            })
+            await expiry_registry.register(self._store, store_key, self.ttl)
+        return entry
+
+    def _remember(self, key: Tuple[str, str], entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "replays": self.replays, "coalesced": self.coalesced}
+
+
+def _store_key(key: Tuple[str, str]) -> str:
+    client, request = key
+    return client + "\x1f" + request
+
+
+# The memory backend is per process anyway; shared backends let every worker replay.
+_shared = settings.idempotency_shared and settings.storage_backend != "memory"
+replay_cache = ReplayCache(
+    maxsize=settings.idempotency_max_entries,
+    ttl=settings.idempotency_ttl_seconds,
+    store=get_repository("idempotency") if _shared else None,
+)
+
+
+class IdempotencyMiddleware:
+    """Replays the stored response when a client retries a mutating request with
+    the same REQUEST-ID, and coalesces concurrent duplicates onto one execution.
+
+    Clients are identified by the JWT ``clientId`` when a valid bearer token is
+    sent, otherwise by ``X-CM-ID``. A REQUEST-ID reused with a different body
+    is rejected with 409. Only 2xx responses up to ``max_body_bytes`` are stored;
+    anything else is left for the client to retry normally. Duplicates are
+    coalesced within a worker; on a shared backend another worker replays a
+    response once it is stored.
+    """
+
+    def __init__(self, app, cache: ReplayCache = replay_cache, max_body_bytes: int = 65536):
+        self.app = app
+        self.cache = cache
+        self.max_body_bytes = max_body_bytes
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in _IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        request_id = headers.get(b"request-id")
+        if not request_id:
+            # require_gateway_headers rejects these where the header is mandatory
+            await self.app(scope, receive, send)
+            return
+
+        key = (self._client(scope, headers), scope["method"] + " " + scope["path"] + " " + request_id.decode("latin-1"))
+        while True:
+            cached = await self.cache.lookup(key)
+            if cached is not None:
+                await self._replay(cached, receive, send)
+                return
+            pending = self._in_flight.get(key)
+            if pending is None:
+                break
+            self.cache.coalesced += 1
+            cached = await asyncio.shield(pending)
+            if cached is not None:
+                await self._replay(cached, receive, send)
+                return
+            # the original attempt failed or was not cacheable: run this one
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        entry = None
+        try:
+            entry = await self._execute(key, scope, receive, send)
+        finally:
+            del self._in_flight[key]
+            future.set_result(entry)
+
+    @staticmethod
+    def _client(scope, headers: Dict[bytes, bytes]) -> str:
+        context = gateway_context(scope)
+        if context is not None:
+            if context.claims is not None:
+                return "client:" + str(context.claims.get("clientId"))
+            return "cm:" + (context.cm_id or "")
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                return "client:" + str(verify_access_token(token).get("clientId"))
+            except Exception:
+                pass
+        return "cm:" + headers.get(b"x-cm-id", b"").decode("latin-1")
+
+    async def _execute(self, key, scope, receive, send) -> Optional[CachedResponse]:
+        body_hash = hashlib.sha256()
+        status = 0
+        response_headers: List[Tuple[bytes, bytes]] = []
+        chunks: List[bytes] = []
+        size = 0
+        cacheable = True
+
+        async def hashing_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                body_hash.update(message.get("body", b""))
+            return message
+
+        async def capturing_send(message):
+            nonlocal status, response_headers, size, cacheable
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = list(message.get("headers", []))
+                cacheable = 200 <= status < 300
+            elif message["type"] == "http.response.body" and cacheable:
+                size += len(message.get("body", b""))
+                if size > self.max_body_bytes:
+                    cacheable = False
+                    chunks.clear()
+                else:
+                    chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, hashing_receive, capturing_send)
+        if not cacheable or not status:
+            return None
+        return await self.cache.store(key, body_hash.digest(), status, response_headers, b"".join(chunks))
+
+    async def _replay(self, cached: CachedResponse, receive, send) -> None:
+        body_hash = hashlib.sha256()
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                return
+            body_hash.update(message.get("body", b""))
+            more_body = message.get("more_body", False)
+
+        if body_hash.digest() != cached.body_digest:
+            body = b'{"detail":"REQUEST-ID was already used with a different request body"}'
+            await send({"type": "http.response.start", "status": 409, "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        self.cache.replays += 1
+        await send({"type": "http.response.start", "status": cached.status,
+                    "headers": cached.headers + [(b"idempotent-replay", b"true")]})
+        await send({"type": "http.response.body", "body": cached.body})
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+from loguru import logger
+
+# cryptography (and PyJWT's EC/RSA support, which needs it) is imported only
+# for RS*/ES* keys, so HS* deployments do not have to install it.
+
+
+def _generate_private_key(alg: str):
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+    if alg.startswith("ES"):
+        curve = {"ES256": ec.SECP256R1, "ES384": ec.SECP384R1, "ES512": ec.SECP521R1}[alg]
+        return ec.generate_private_key(curve())
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+class KeyRing:
+    """Signing and verification keys for access tokens.
+
+    HS* algorithms sign with the shared secret. For RS*/ES* the newest key
+    signs (its ``kid`` goes in the token header) and every key that may still
+    have live tokens is published in the JWKS. Parsed public keys are cached by
+    ``kid``; an unknown ``kid`` triggers at most one reload of ``keys_dir`` per
+    ``reload_seconds``, which is how workers pick up a key rotated elsewhere.
+    Without ``keys_dir`` keys are generated in memory and live as long as the
+    process, so only that process can verify its tokens.
+    """
+
+    def __init__(self, alg: str, secret: str = "", keys_dir: str = "", rotation_seconds: float = 0,
+                 token_ttl_seconds: float = 900, reload_seconds: float = 30):
+        self.alg = alg.upper()
+        self.symmetric = self.alg.startswith("HS")
+        self._secret = secret
+        self._keys_dir = keys_dir
+        self._rotation_seconds = rotation_seconds
+        self._token_ttl_seconds = token_ttl_seconds
+        self._reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        # kid -> (created_at, private key, public key)
+        self._keys: Dict[str, Tuple[float, Any, Any]] = {}
+        self._active: Optional[str] = None
+        self._last_reload = 0.0
+        self._jwks: Optional[Tuple[bytes, str]] = None
+        if not self.symmetric:
+            if keys_dir:
+                os.makedirs(keys_dir, exist_ok=True)
+                self._reload()
+            if self._active is None:
+                self.rotate()
+
+    def _install(self, kid: str, created_at: float, private_key) -> None:
+        self._keys[kid] = (created_at, private_key, private_key.public_key())
+        if self._active is None or created_at >= self._keys[self._active][0]:
+            self._active = kid
+        self._jwks = None
+
+    def _reload(self) -> None:
+        from cryptography.hazmat.primitives import serialization
+        self._last_reload = time.monotonic()
+        retired_before = self._retired_before(time.time())
+        for filename in os.listdir(self._keys_dir):
+            kid, ext = os.path.splitext(filename)
+            if ext != ".pem" or kid in self._keys:
+                continue
+            path = os.path.join(self._keys_dir, filename)
+            try:
+                created_at = os.path.getmtime(path)
+                if created_at < retired_before:
+                    self._remove_pem(kid)
+                    continue
+                with open(path, "rb") as f:
+                    private_key = serialization.load_pem_private_key(f.read(), password=None)
+            except FileNotFoundError:
+                # pruned by another worker since the listing
+                continue
+            self._install(kid, created_at, private_key)
+        self._prune()
+
+    def _retired_before(self, now: float) -> float:
+        # A key is retired once a newer key has been signing for longer than a
+        # token lives: nothing it signed can still be valid.
+        return max((created_at for created_at, _, _ in self._keys.values()
+                    if now - created_at > self._token_ttl_seconds), default=0.0)
+
+    def _remove_pem(self, kid: str) -> None:
+        if self._keys_dir:
+            try:
+                os.remove(os.path.join(self._keys_dir, f"{kid}.pem"))
+            except FileNotFoundError:
+                pass
+
+    def _prune(self) -> None:
+        # Retired PEMs are deleted too, or the next reload would install them again
+        retired_before = self._retired_before(time.time())
+        for kid, (created_at, _, _) in list(self._keys.items()):
+            if created_at < retired_before:
+                del self._keys[kid]
+                self._remove_pem(kid)
+                self._jwks = None
+
+    def rotate(self) -> str:
+        """Generate a new signing key and make it active; returns its ``kid``."""
+        with self._lock:
+            return self._rotate()
+
+    def _rotate(self) -> str:
+        # Called with ``_lock`` held
+        from cryptography.hazmat.primitives import serialization
+        created_at = time.time()
+        kid = f"{self.alg.lower()}-{int(created_at)}-{secrets.token_hex(4)}"
+        private_key = _generate_private_key(self.alg)
+        if self._keys_dir:
+            path = os.path.join(self._keys_dir, f"{kid}.pem")
+            pem = private_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                            serialization.NoEncryption())
+            # write-then-rename so a worker reloading the directory never reads half a key
+            with open(f"{path}.tmp", "wb") as f:
+                f.write(pem)
+            os.chmod(f"{path}.tmp", 0o600)
+            os.replace(f"{path}.tmp", path)
+            created_at = os.path.getmtime(path)
+        self._install(kid, created_at, private_key)
+        self._prune()
+        logger.info(f"Rotated {self.alg} signing key to {kid}")
+        return kid
+
+    def _signing_key(self) -> Tuple[str, Any]:
+        with self._lock:
+            if self._rotation_seconds and time.time() - self._keys[self._active][0] > self._rotation_seconds:
+                # another worker may have rotated already; checked and rotated
+                # under one lock so concurrent signers rotate only once
+                if self._keys_dir:
+                    self._reload()
+                if time.time() - self._keys[self._active][0] > self._rotation_seconds:
+                    self._rotate()
+            kid = self._active
+            return kid, self._keys[kid][1]
+
+    def _public_key(self, kid: Optional[str]):
+        with self._lock:
+            entry = self._keys.get(kid)
+            if entry is None and self._keys_dir and time.monotonic() - self._last_reload > self._reload_seconds:
+                self._reload()
+                entry = self._keys.get(kid)
+        if entry is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+        return entry[2]
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        if self.symmetric:
+            return jwt.encode(claims, self._secret, algorithm=self.alg)
+        kid, private_key = self._signing_key()
+        return jwt.encode(claims, private_key, algorithm=self.alg, headers={"kid": kid})
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        if self.symmetric:
+            return jwt.decode(token, self._secret, algorithms=[self.alg])
+        kid = jwt.get_unverified_header(token).get("kid")
+        return jwt.decode(token, self._public_key(kid), algorithms=[self.alg])
+
+    def jwks(self) -> Tuple[bytes, str]:
+        """Serialized JWKS and its ETag, rebuilt only when the key set changes."""
+        with self._lock:
+            if self._keys_dir and time.monotonic() - self._last_reload > self._reload_seconds:
+                self._reload()
+            if self._jwks is None:
+                from jwt.algorithms import ECAlgorithm, RSAAlgorithm
+                to_jwk = ECAlgorithm.to_jwk if self.alg.startswith("ES") else RSAAlgorithm.to_jwk
+                keys = [
+                    {**to_jwk(public_key, as_dict=True), "use": "sig", "alg": self.alg, "kid": kid}
+                    for kid, (_, _, public_key) in sorted(self._keys.items(), key=lambda item: -item[1][0])
+                ]
+                body = json.dumps({"keys": keys}, separators=(",", ":")).encode()
+                self._jwks = (body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+            return self._jwks
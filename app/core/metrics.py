@@ -0,0 +1,214 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Sharded:
+    """Per-thread value shards.
+
+    The recording path only touches the calling thread's own dict, so it needs
+    no lock; a scrape merges snapshots of every shard. Dict/list copies are
+    atomic under the GIL, which is all the consistency a scrape needs.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshots(self) -> List[Dict]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        return [shard.copy() for shard in shards]
+
+
+class Counter(_Sharded):
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self) -> Dict[Labels, float]:
+        totals: Dict[Labels, float] = {}
+        for snapshot in self._snapshots():
+            for labels, value in snapshot.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram(_Sharded):
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            # per-bucket (non-cumulative) counts + [+Inf] count, then sum
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def collect(self) -> Dict[Labels, List[float]]:
+        totals: Dict[Labels, List[float]] = {}
+        for snapshot in self._snapshots():
+            for labels, series in snapshot.items():
+                series = list(series)
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = series
+                else:
+                    for i, value in enumerate(series):
+                        total[i] += value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        for labels, series in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose values are read from ``callback`` at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Dict[Labels, float]],
+                 labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for labels, value in sorted(self.callback().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class CallbackCounter(Gauge):
+    """Counter whose values are read from ``callback`` at scrape time, for
+    monotonic totals a component already keeps (cache hits, dropped entries)."""
+
+    type = "counter"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Labels) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.register(Counter(
+    "abdm_http_requests_total", "HTTP requests by method, route and status code.",
+    ("method", "route", "status")))
+http_latency = registry.register(Histogram(
+    "abdm_http_request_duration_seconds", "HTTP request latency by method and route.",
+    ("method", "route")))
+auth_decodes = registry.register(Counter(
+    "abdm_auth_token_verifications_total", "Bearer token verifications by outcome.",
+    ("result",)))
+requests_rejected = registry.register(Counter(
+    "abdm_requests_rejected_total", "Requests shed by rate limiting (429) or admission control (503).",
+    ("reason", "scope")))
+token_issuance = registry.register(Counter(
+    "abdm_auth_token_issuance_total", "Access token requests by outcome.",
+    ("result",)))
+webhook_events = registry.register(Counter(
+    "abdm_webhook_events_total", "Webhook events delivered, retried, dead-lettered and dropped per bridge.",
+    ("bridge", "result")))
+webhook_latency = registry.register(Histogram(
+    "abdm_webhook_delivery_seconds", "Time from queueing a webhook event to its delivery, retries included.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route request counts, status codes and latency.
+
+    Routes are labelled by their path template (``scope["route"]``, set during
+    routing) so path parameters do not explode label cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_latency.observe(time.perf_counter() - start, (method, path))
+            http_requests.inc((method, path, str(status_code)))
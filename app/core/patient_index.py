@@ -0,0 +1,242 @@
+import csv
+import json
+import re
+import sys
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+_SEP = "\x1f"
+_NON_DIGITS = re.compile(r"\D")
+_NON_LETTERS = re.compile(r"[^a-z]+")
+# Spelling variants that sound alike in transliterated Indian names collapse
+# to one key: Mohammed/Muhammad -> mhmd, Lakshmi/Laxmi -> lksm, Shyam/Syam -> sm.
+_PHONETIC_RULES = tuple((re.compile(pattern), repl) for pattern, repl in (
+    (r"(.)\1+", r"\1"),
+    (r"ph", "f"),
+    (r"x", "ks"),
+    (r"ck|q", "k"),
+    (r"w", "v"),
+    (r"z", "j"),
+    (r"(?<=[bcdgjkpst])h", ""),
+    (r"(?<=.)[aeiouy]+", ""),
+))
+
+# (patientId, mobile, name) as read from a snapshot
+PatientRecord = Tuple[str, str, Optional[str]]
+
+
+def normalize_mobile(mobile: str) -> int:
+    """Last ten digits of ``mobile``, so ``+91 98765-43210`` and ``09876543210`` match."""
+    digits = _NON_DIGITS.sub("", mobile)[-10:]
+    if not digits:
+        raise ValueError("mobile must contain digits")
+    return int(digits)
+
+
+def normalize_name(name: Optional[str]) -> str:
+    return " ".join(_NON_LETTERS.sub(" ", (name or "").lower()).split())
+
+
+def phonetic_key(token: str) -> str:
+    for pattern, repl in _PHONETIC_RULES:
+        token = pattern.sub(repl, token)
+    return token
+
+
+def _trigrams(token: str) -> frozenset:
+    padded = f" {token} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def name_similarity(query: str, candidate: str) -> float:
+    """How well the normalized ``query`` matches ``candidate``, from 0 to 1.
+
+    Each query token scores 1 against a candidate token with the same
+    phonetic key (or whose initial it is), else the Dice coefficient of their
+    trigrams; the result is the mean over query tokens of their best score,
+    so "Ravi Kumar" fully matches "Ravi Kumar Sharma".
+    """
+    query_tokens, candidate_tokens = query.split(), candidate.split()
+    if not query_tokens or not candidate_tokens:
+        return 0.0
+    keyed = [(token, phonetic_key(token), _trigrams(token)) for token in candidate_tokens]
+    total = 0.0
+    for token in query_tokens:
+        key, grams = phonetic_key(token), _trigrams(token)
+        best = 0.0
+        for other, other_key, other_grams in keyed:
+            if key == other_key or (len(token) == 1 and other.startswith(token)):
+                best = 1.0
+                break
+            best = max(best, 2 * len(grams & other_grams) / (len(grams) + len(other_grams)))
+        total += best
+    return total / len(query_tokens)
+
+
+def read_snapshot(path: str) -> Iterator[PatientRecord]:
+    """Stream ``(patientId, mobile, name)`` from a CSV file with a header row,
+    or from JSON lines, without holding the snapshot in memory."""
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            reader = csv.DictReader(f)
+            if not {"patientId", "mobile"} <= set(reader.fieldnames or ()):
+                raise ValueError(f"{path} needs a patientId,mobile,name header")
+            for row in reader:
+                yield row["patientId"], row["mobile"], row.get("name")
+            return
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                yield entry["patientId"], entry["mobile"], entry.get("name")
+
+
+class PatientIndex:
+    """Demographics index for patient discovery, held in flat arrays.
+
+    Each record is one row: its patient id and normalized name are packed
+    into a shared UTF-8 buffer, and its mobile, id hash and liveness sit in
+    typed arrays, so a record costs tens of bytes instead of the several
+    hundred a dict per patient would. Two chained hash tables (``array`` of
+    bucket heads plus a next-row array per row) find rows by normalized
+    mobile and by patient id. Updates are appended and the old row is
+    tombstoned; ``compact`` drops tombstones once they outnumber live rows.
+
+    Names are only compared within the rows sharing the queried mobile
+    (discovery requires a mobile match), so they need no index of their
+    own: ``name_similarity`` scores the few candidates directly.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.deleted = 0
+        self._data = bytearray()
+        self._offsets = array("Q")  # start of each row in _data
+        self._mobiles = array("Q")
+        self._id_hashes = array("I")
+        self._next_by_mobile = array("i")
+        self._next_by_id = array("i")
+        self._live = bytearray()
+        self._mobile_heads = array("i")
+        self._id_heads = array("i")
+        self._rehash(max(capacity, 16))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - self.deleted
+
+    def _rehash(self, buckets: int) -> None:
+        size = 1 << (buckets - 1).bit_length()
+        self._mask = size - 1
+        self._mobile_heads = array("i", [-1]) * size
+        self._id_heads = array("i", [-1]) * size
+        for row in range(len(self._offsets)):
+            if self._live[row]:
+                self._link(row)
+
+    def _link(self, row: int) -> None:
+        bucket = self._mobiles[row] & self._mask
+        self._next_by_mobile[row] = self._mobile_heads[bucket]
+        self._mobile_heads[bucket] = row
+        bucket = self._id_hashes[row] & self._mask
+        self._next_by_id[row] = self._id_heads[bucket]
+        self._id_heads[bucket] = row
+
+    def _row(self, row: int) -> Tuple[str, str]:
+        end = self._offsets[row + 1] if row + 1 < len(self._offsets) else len(self._data)
+        patient_id, _, name = self._data[self._offsets[row]:end].decode().partition(_SEP)
+        return patient_id, name
+
+    def _find(self, patient_id: str) -> int:
+        id_hash = hash(patient_id) & 0xFFFFFFFF
+        row = self._id_heads[id_hash & self._mask]
+        while row >= 0:
+            if self._live[row] and self._id_hashes[row] == id_hash and self._row(row)[0] == patient_id:
+                return row
+            row = self._next_by_id[row]
+        return -1
+
+    def add(self, patient_id: str, mobile: str, name: Optional[str] = None) -> bool:
+        """Insert or replace ``patient_id``; returns True when it is new."""
+        if _SEP in patient_id:
+            raise ValueError("patientId contains a control character")
+        mobile_key = normalize_mobile(mobile)
+        previous = self._find(patient_id)
+        if previous >= 0:
+            self._live[previous] = 0
+            self.deleted += 1
+        row = len(self._offsets)
+        self._offsets.append(len(self._data))
+        self._data += f"{patient_id}{_SEP}{normalize_name(name)}".encode()
+        self._mobiles.append(mobile_key)
+        self._id_hashes.append(hash(patient_id) & 0xFFFFFFFF)
+        self._next_by_mobile.append(-1)
+        self._next_by_id.append(-1)
+        self._live.append(1)
+        if row > self._mask:
+            self._rehash(2 * (self._mask + 1))
+        else:
+            self._link(row)
+        if self.deleted > len(self):
+            self.compact()
+        return previous < 0
+
+    def add_many(self, records: Iterable[PatientRecord]) -> int:
+        return sum(self.add(*record) for record in records)
+
+    def remove(self, patient_id: str) -> bool:
+        row = self._find(patient_id)
+        if row < 0:
+            return False
+        self._live[row] = 0
+        self.deleted += 1
+        if self.deleted > len(self):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """Rewrite the arrays without tombstoned rows."""
+        rows = [row for row in range(len(self._offsets)) if self._live[row]]
+        data, offsets = bytearray(), array("Q")
+        for row in rows:
+            end = self._offsets[row + 1] if row + 1 < len(self._offsets) else len(self._data)
+            offsets.append(len(data))
+            data += self._data[self._offsets[row]:end]
+        self._data, self._offsets = data, offsets
+        self._mobiles = array("Q", (self._mobiles[row] for row in rows))
+        self._id_hashes = array("I", (self._id_hashes[row] for row in rows))
+        self._next_by_mobile = array("i", [-1]) * len(rows)
+        self._next_by_id = array("i", [-1]) * len(rows)
+        self._live = bytearray(b"\x01") * len(rows)
+        self.deleted = 0
+        self._rehash(max(len(rows), 16))
+
+    def candidates(self, mobile: str) -> List[Tuple[str, str]]:
+        """``(patientId, normalized name)`` of every live record with this mobile."""
+        mobile_key = normalize_mobile(mobile)
+        found = []
+        row = self._mobile_heads[mobile_key & self._mask]
+        while row >= 0:
+            if self._live[row] and self._mobiles[row] == mobile_key:
+                found.append(self._row(row))
+            row = self._next_by_mobile[row]
+        return found
+
+    def match(self, mobile: str, name: Optional[str], threshold: float) -> Optional[str]:
+        """The one patient with this mobile whose name scores at least
+        ``threshold``; None when nobody, or more than one patient, matches.
+        Without a name the mobile must identify a single patient."""
+        candidates = self.candidates(mobile)
+        query = normalize_name(name)
+        if not query:
+            return candidates[0][0] if len(candidates) == 1 else None
+        scored = sorted(((name_similarity(query, candidate), patient_id) for patient_id, candidate in candidates),
+                        reverse=True)
+        if not scored or scored[0][0] < threshold or (len(scored) > 1 and scored[1][0] == scored[0][0]):
+            return None
+        return scored[0][1]
+
+    def memory_bytes(self) -> int:
+        buffers = (self._data, self._offsets, self._mobiles, self._id_hashes, self._next_by_mobile,
+                   self._next_by_id, self._live, self._mobile_heads, self._id_heads)
+        return sum(sys.getsizeof(buffer) for buffer in buffers)
+
+    def stats(self) -> dict:
+        return {"records": len(self), "deleted": self.deleted, "bytes": self.memory_bytes()}
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Tuple
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets refilling at ``rate`` tokens/second up to ``burst``.
+
+    Buckets are refilled lazily when touched, so idle keys cost only their
+    slot; past ``maxsize`` keys the least recently used bucket is dropped
+    (which resets that key to a full bucket). ``rate <= 0`` disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: float, maxsize: int = 100000):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.maxsize = maxsize
+        self.limited = 0
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens for ``key``; returns 0 if allowed, otherwise
+        the seconds until enough tokens will have accumulated."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                retry_after = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                self.limited += 1
+                retry_after = (cost - tokens) / self.rate
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def peek(self, key: Hashable, cost: float = 1.0) -> float:
+        """Like ``acquire`` but takes nothing: 0 while ``cost`` tokens are
+        available, otherwise the seconds until they will be."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        return 0.0 if tokens >= cost else (cost - tokens) / self.rate
+
+    async def hit(self, key: Hashable, cost: float = 1.0) -> float:
+        return self.acquire(key, cost)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self.limited = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"keys": len(self._buckets), "limited": self.limited}
+
+
+class SlidingWindowLimiter:
+    """Sliding-window counters in a Redis-protocol store shared by all workers.
+
+    The bucket parameters map to a window of ``burst / rate`` seconds allowing
+    ``burst`` hits; the previous window's count is weighted by how much of it
+    still overlaps the sliding window. Each hit is one pipelined round trip
+    (INCRBY, EXPIRE, GET); a rejected hit is given back so a client retrying
+    against the limit is not locked out indefinitely.
+    """
+
+    def __init__(self, client, rate: float, burst: float, prefix: str = "abdm:ratelimit"):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.window = self.burst / rate if rate > 0 else 0.0
+        self.limited = 0
+        self._client = client
+        self._prefix = prefix
+
+    async def hit(self, key: Hashable, cost: float = 1.0) -> float:
+        if self.rate <= 0:
+            return 0.0
+        now = time.time()
+        index, offset = divmod(now, self.window)
+        current = f"{self._prefix}:{key}:{int(index)}"
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.incrby(current, int(cost))
+            pipe.expire(current, int(self.window * 2) + 1)
+            pipe.get(f"{self._prefix}:{key}:{int(index) - 1}")
+            count, _, previous = await pipe.execute()
+        previous = int(previous or 0)
+        overlap = 1 - offset / self.window
+        if count + previous * overlap <= self.burst:
+            return 0.0
+        await self._client.decrby(current, int(cost))
+        self.limited += 1
+        # the weighted previous count decays linearly until the window ends
+        if previous:
+            return max(min((count + previous * overlap - self.burst) / previous * self.window,
+                           self.window - offset), 0.001)
+        return self.window - offset
+
+    def stats(self) -> Dict[str, int]:
+        return {"limited": self.limited}
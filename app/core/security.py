@@ -1,15 +1,98 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
 import time 
-import jwt 
-from typing import Any 
+from typing import Any, Optional 
 
 from app.core.config import get_settings
+from app.core.keys import KeyRing
+from app.core.metrics import auth_decodes
+from app.core.token_cache import TokenCache
 
 settings = get_settings()
 
+token_cache = TokenCache(maxsize=settings.token_cache_size)
+key_ring = KeyRing(
+    settings.jwt_alg,
+    secret=settings.jwt_secret,
+    keys_dir=settings.jwt_keys_dir,
+    rotation_seconds=settings.jwt_key_rotation_seconds,
+    token_ttl_seconds=settings.jwt_expiry_seconds,
+)
+
+# HMAC signing/verification takes microseconds and is cheaper inline than a
+# thread hop; asymmetric algorithms are offloaded from the event loop.
+_OFFLOAD_CRYPTO = not settings.jwt_alg.upper().startswith("HS")
+
 def create_access_token(payload: dict[str, Any]) -> str:
     to_encode = payload.copy()
     to_encode["exp"] = int(time.time()) + settings.jwt_expiry_seconds
-    return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_alg)
+    return key_ring.sign(to_encode)
+
+async def create_access_token_async(payload: dict[str, Any]) -> str:
+    if _OFFLOAD_CRYPTO:
+        return await asyncio.to_thread(create_access_token, payload)
+    return create_access_token(payload)
 
 def decode_access_token(token:str) -> dict[str, Any]:
-    return jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_alg])
\ No newline at end of file
+    return key_ring.decode(token)
+
+def _decode_and_cache(token: str) -> dict[str, Any]:
+    try:
+        claims = decode_access_token(token)
+    except Exception:
+        auth_decodes.inc(("invalid",))
+        raise
+    auth_decodes.inc(("decoded",))
+    token_cache.put(token, claims)
+    return claims
+
+def verify_access_token(token: str) -> dict[str, Any]:
+    claims = token_cache.get(token)
+    if claims is not None:
+        auth_decodes.inc(("cache_hit",))
+        return claims
+    return _decode_and_cache(token)
+
+async def verify_access_token_async(token: str) -> dict[str, Any]:
+    claims = token_cache.get(token)
+    if claims is not None:
+        auth_decodes.inc(("cache_hit",))
+        return claims
+    if _OFFLOAD_CRYPTO:
+        return await asyncio.to_thread(_decode_and_cache, token)
+    return _decode_and_cache(token)
+
+def hash_client_secret(secret: str, iterations: int | None = None) -> str:
+    """Salted PBKDF2-SHA256 hash encoded as ``pbkdf2_sha256$iterations$salt$hash``."""
+    iterations = iterations or settings.client_secret_hash_iterations
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", secret.encode(), salt, iterations)
+    return "$".join(("pbkdf2_sha256", str(iterations),
+                     base64.b64encode(salt).decode(), base64.b64encode(digest).decode()))
+
+def hash_otp(txn_id: str, otp: str) -> str:
+    """Keyed digest of a link OTP, bound to its transaction. A six-digit code is
+    too small for a slow hash to help; the attempt limit is what stops guessing.
+    Keyed by ``LINK_OTP_SECRET``, not the JWT secret, which may be a default
+    or unused when tokens are signed with ES256/RS256."""
+    return hmac.new(settings.link_otp_secret.encode(), f"{txn_id}:{otp}".encode(), hashlib.sha256).hexdigest()
+
+def verify_otp(txn_id: str, otp: str, encoded: Optional[str]) -> bool:
+    """False for a consumed OTP (``encoded`` cleared) as for a wrong one."""
+    if not encoded:
+        return False
+    return hmac.compare_digest(hash_otp(txn_id, otp), encoded)
+
+def verify_client_secret(secret: str, encoded: str) -> bool:
+    try:
+        scheme, iterations, salt, expected = encoded.split("$")
+        salt, expected, iterations = base64.b64decode(salt), base64.b64decode(expected), int(iterations)
+    except ValueError:
+        return False
+    if scheme != "pbkdf2_sha256":
+        return False
+    digest = hashlib.pbkdf2_hmac("sha256", secret.encode(), salt, iterations)
+    return hmac.compare_digest(digest, expected)
@@ -1,11 +1,15 @@
-from fastapi import Depends, HTTPException, status # type: ignore
+from fastapi import Depends, HTTPException, Request, status # type: ignore
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials # type: ignore
 
-from app.core.security import decode_access_token 
+from app.core.config import get_settings
+from app.core.gateway import gateway_context
+from app.core.security import verify_access_token_async
+
+settings = get_settings()
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
-def get_current_token(credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme)) -> dict:
+async def verify_bearer_token(credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme)) -> dict:
     
     if credentials is None or credentials.scheme.lower() != "bearer":
         raise HTTPException(
@@ -16,9 +20,30 @@ def get_current_token(credentials: HTTPAuthorizationCredentials | None = Depends
     token = credentials.credentials
 
     try:
-        return decode_access_token(token)
+        return await verify_access_token_async(token)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token"
-        )
\ No newline at end of file
+        )
+
+async def gateway_token(request: Request) -> dict:
+    """Returns the claims GatewayMiddleware already verified into request state."""
+    context = gateway_context(request.scope)
+    if context is None:
+        return await verify_bearer_token(await bearer_scheme(request))
+    if context.token_error == "missing":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing bearer token"
+        )
+    if context.token_error:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
+    return context.claims
+
+# Routes depend on this name. Behind GatewayMiddleware it only reads request
+# state, skipping the HTTPBearer sub-dependency and a second token lookup.
+get_current_token = gateway_token if settings.gateway_middleware else verify_bearer_token
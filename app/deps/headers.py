@@ -1,6 +1,11 @@
-from fastapi import Header, HTTPException, status
+from fastapi import Header, HTTPException, Request, status
 
-def require_gateway_headers(
+from app.core.config import get_settings
+from app.core.gateway import gateway_context
+
+settings = get_settings()
+
+async def parse_gateway_headers(
         request_id: str | None = Header(default=None, convert_underscores=False, alias="REQUEST-ID"),
         timestamp: str | None = Header(default=None, convert_underscores=False, alias="TIMESTAMP"),
         cm_id: str | None = Header(default=None, convert_underscores=False, alias="X-CM-ID"),
@@ -19,3 +24,21 @@ def require_gateway_headers(
         )
     
     return {"request_id": request_id, "timestamp": timestamp, "cm_id": cm_id}
+
+async def gateway_headers(request: Request) -> dict[str, str]:
+    """Reads the headers GatewayMiddleware already parsed into request state."""
+    context = gateway_context(request.scope)
+    if context is None:
+        return await parse_gateway_headers(request.headers.get("REQUEST-ID"),
+                                           request.headers.get("TIMESTAMP"),
+                                           request.headers.get("X-CM-ID"))
+    if context.missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Missing required headers: {', '.join(context.missing)}",
+        )
+    return context.headers()
+
+# Routes depend on this name. Behind GatewayMiddleware it only reads request
+# state, so FastAPI has no header parameters to extract and validate.
+require_gateway_headers = gateway_headers if settings.gateway_middleware else parse_gateway_headers
@@ -0,0 +1,68 @@
+import math
+from collections import Counter
+from typing import Iterable
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import get_settings
+from app.core.gateway import gateway_context
+from app.core.metrics import requests_rejected
+from app.core.rate_limit import SlidingWindowLimiter, TokenBucketLimiter
+from app.core.security import verify_access_token_async
+
+settings = get_settings()
+
+def _limiter(scope: str, rate: float, burst: float):
+    if settings.rate_limit_backend == "redis":
+        from app.storage import get_redis_client
+        return SlidingWindowLimiter(get_redis_client(), rate, burst,
+                                    prefix=f"{settings.redis_prefix}:ratelimit:{scope}")
+    return TokenBucketLimiter(rate, burst)
+
+limiters = {
+    "client": _limiter("client", settings.rate_limit_client_per_second, settings.rate_limit_client_burst),
+    "cm": _limiter("cm", settings.rate_limit_cm_per_second, settings.rate_limit_cm_burst),
+    "hip": _limiter("hip", settings.rate_limit_hip_per_second, settings.rate_limit_hip_burst),
+}
+
+async def _enforce(scope: str, key: str, cost: float = 1.0) -> None:
+    retry_after = await limiters[scope].hit(key, cost)
+    if retry_after:
+        requests_rejected.inc(("rate_limited", scope))
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Rate limit exceeded for {scope} '{key}'",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+
+async def rate_limit(request: Request) -> None:
+    """Router-wide dependency throttling by ``X-CM-ID`` and the JWT ``clientId``.
+
+    An invalid or missing token is not limited here; the route's own
+    ``get_current_token`` rejects it.
+    """
+    cm_id = request.headers.get("X-CM-ID")
+    if cm_id and limiters["cm"].rate > 0:
+        await _enforce("cm", cm_id)
+    if limiters["client"].rate > 0:
+        context = gateway_context(request.scope)
+        if context is not None:
+            claims = context.claims or {}
+        else:
+            scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return
+            try:
+                claims = await verify_access_token_async(token)
+            except Exception:
+                return
+        if claims.get("clientId"):
+            await _enforce("client", str(claims["clientId"]))
+
+async def enforce_hip_rate(hip_ids: Iterable[str]) -> None:
+    """Charge each HIP one hit per item it appears in; raises 429 when any is over its limit."""
+    if limiters["hip"].rate <= 0:
+        return
+    for hip_id, count in Counter(hip_id for hip_id in hip_ids if hip_id).items():
+        # a batch larger than the burst could otherwise never be admitted
+        await _enforce("hip", hip_id, min(count, limiters["hip"].burst))
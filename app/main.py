@@ -1,8 +1,26 @@
+import asyncio
+import secrets
+
 from fastapi import FastAPI 
+from fastapi.responses import PlainTextResponse
 from loguru import logger 
 
 from app.core.config import get_settings
 from app.core.logging import configure_logging
+from app.core.expiry import run_reaper
+from app.core.access_log import AccessLogMiddleware, access_log
+from app.core.admission import AdmissionMiddleware
+from app.core.gateway import GatewayMiddleware
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.services.client_service import load_clients, watch_clients
+from app.services.data_service import run_blob_retirement, start_data_transfers
+from app.services.linking_service import load_patients, watch_patients
+from app.services.event_bus import event_bus
+from app.services.metrics_service import render_metrics
+from app.services.transfer_engine import transfer_engine
+from app.services.webhook_dispatcher import webhook_dispatcher
+from app.utils.responses import FastJSONResponse
 from app.api.routes import api_router
 
 settings = get_settings()
@@ -11,23 +29,84 @@ configure_logging(settings.log_level)
 app = FastAPI(
     title="ABDM Gateway",
     description="API Gateway for ABDM services",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=FastJSONResponse
 )
 
+# add_middleware wraps outermost-last: metrics also sees replayed responses
+# and shed requests, admission control runs before any replay lookup, and
+# the replay cache reuses the token the gateway middleware verified
+if settings.idempotency_enabled:
+    app.add_middleware(IdempotencyMiddleware)
+if settings.gateway_middleware:
+    app.add_middleware(GatewayMiddleware)
+if settings.admission_max_concurrency > 0:
+    # event streams stay open for minutes and would pin their slots
+    app.add_middleware(AdmissionMiddleware, exempt=("/health", "/metrics", "/api/events/stream"))
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+if settings.access_log_enabled:
+    app.add_middleware(AccessLogMiddleware)
+
 app.include_router(api_router, prefix="/api")
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok", "service": "abdm-gateway"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(await render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.on_event("startup")
 async def startup_event():
+    if not settings.link_otp_secret:
+        if settings.app_env == "prod":
+            raise RuntimeError("LINK_OTP_SECRET must be set: it keys the HMAC of stored link OTPs")
+        # per process: OTPs issued before a restart, or by another worker, stop verifying
+        settings.link_otp_secret = secrets.token_hex(32)
+        logger.warning(f"LINK_OTP_SECRET is not set; using a random per-process secret ({settings.app_env})")
     logger.info(f"Starting ADBM Gateway on {settings.app_host}:{settings.app_port}")
     logger.info(f"Envirnment: {settings.app_env}")
+    app.state.reaper_task = asyncio.create_task(
+        run_reaper(settings.reaper_interval_seconds, settings.reaper_batch_size)
+    )
+    app.state.blob_task = asyncio.create_task(run_blob_retirement(settings.blob_retire_interval_seconds))
+    await webhook_dispatcher.start()
+    await event_bus.start()
+    requeued = await start_data_transfers()
+    if requeued:
+        logger.info(f"Re-queued {requeued} data requests not yet sent to their HIP")
+    if settings.access_log_enabled:
+        access_log.start()
+    app.state.clients_task = None
+    if settings.clients_file:
+        await load_clients(settings.clients_file)
+        if settings.clients_reload_seconds > 0:
+            app.state.clients_task = asyncio.create_task(
+                watch_clients(settings.clients_file, settings.clients_reload_seconds)
+            )
+    app.state.patient_index_task = None
+    if settings.patient_index_file:
+        await load_patients(settings.patient_index_file)
+        if settings.patient_index_reload_seconds > 0:
+            app.state.patient_index_task = asyncio.create_task(
+                watch_patients(settings.patient_index_file, settings.patient_index_reload_seconds)
+            )
 
 @app.on_event("shutdown")
 async def stutdown_event():
     logger.info("Setting down ABDM Gateway")
+    app.state.reaper_task.cancel()
+    app.state.blob_task.cancel()
+    if app.state.patient_index_task:
+        app.state.patient_index_task.cancel()
+    if app.state.clients_task:
+        app.state.clients_task.cancel()
+    await webhook_dispatcher.stop()
+    await event_bus.stop()
+    await transfer_engine.stop()
+    access_log.stop()
 
 @app.get("/hello")
 async def hello():
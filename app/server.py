@@ -0,0 +1,33 @@
+import uvicorn
+
+from app.core.config import Settings, get_settings
+
+def check_workers(settings: Settings) -> None:
+    """Refuse settings whose state would be split between worker processes."""
+    workers = settings.workers
+    if workers <= 1:
+        return
+    if settings.storage_backend == "memory":
+        raise SystemExit(
+            f"WORKERS={workers} needs a shared STORAGE_BACKEND (redis or sqlite); "
+            "with the memory backend each worker would see only its own consents, links and data"
+        )
+    if not settings.jwt_alg.upper().startswith("HS") and not settings.jwt_keys_dir:
+        raise SystemExit(
+            f"WORKERS={workers} with JWT_ALG={settings.jwt_alg} needs a shared JWT_KEYS_DIR; "
+            "otherwise each worker generates its own keys and rejects tokens signed by the others"
+        )
+
+def main() -> None:
+    settings = get_settings()
+    check_workers(settings)
+    uvicorn.run(
+        "app.main:app",
+        host=settings.app_host,
+        port=settings.app_port,
+        workers=settings.workers,
+        log_level=settings.log_level.lower(),
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,27 @@
+from typing import Tuple
+
 from app.core.config import get_settings
-from app.core.security import create_access_token
+from app.core.security import create_access_token_async, key_ring
+from app.services.client_service import registry_enabled, verify_client
 
 settings = get_settings()
 
-def validate_client_credentials(client_id: str, client_secret: str) -> bool:
-    # Simplified validation - replace with real DB lookup in production
-    # For now, accept any non-empty credentials
-    return bool(client_id and client_secret)
+async def validate_client_credentials(client_id: str, client_secret: str) -> bool:
+    if not (client_id and client_secret):
+        return False
+    if not registry_enabled():
+        # No CLIENTS_FILE configured (local development): accept any non-empty credentials
+        return True
+    return await verify_client(client_id, client_secret)
 
-def issue_access_token(client_id: str, cm_id: str) -> str:
-    token = create_access_token({"clientId": client_id, "cmId": cm_id})
+async def issue_access_token(client_id: str, cm_id: str) -> str:
+    token = await create_access_token_async({"clientId": client_id, "cmId": cm_id})
     return {
         "accessToken": token,
         "expiresIn": settings.jwt_expiry_seconds,
         "tokenType": "Bearer"
-    }
\ No newline at end of file
+    }
+
+def jwks() -> Tuple[bytes, str]:
+    """Serialized JWKS and its ETag; empty for HS* algorithms."""
+    return key_ring.jwks()
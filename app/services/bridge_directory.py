@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import json
+import time
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from app.storage.base import Repository
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
+# Service records also carry internal fields (e.g. bridgeId); only these are public
+SERVICE_FIELDS = ("id", "name", "active", "version")
+
+
+def _dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+class BridgeSnapshot:
+    """A bridge and its services as loaded at one directory version.
+
+    Never mutated once published: records are read-only mappings, and the
+    public service list is serialized, with its ETag, when the snapshot is built.
+    """
+
+    __slots__ = ("bridge", "services", "body", "etag", "version", "loaded_at")
+
+    def __init__(self, bridge: Dict, services: Iterable[Dict], version: int):
+        ordered = sorted(services, key=lambda service: service["id"])
+        self.bridge: Mapping = MappingProxyType(dict(bridge))
+        self.services: Mapping[str, Mapping] = MappingProxyType(
+            {service["id"]: MappingProxyType(dict(service)) for service in ordered})
+        self.body = _dumps([{field: service[field] for field in SERVICE_FIELDS} for service in ordered])
+        # a content hash, so every worker serves the same ETag for the same list
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+
+class BridgeDirectory:
+    """Directory of bridges and their services, published as per-bridge snapshots.
+
+    The repositories stay the source of truth. Every write goes through them
+    and then publishes a new immutable snapshot of the bridge it touched by
+    replacing that bridge's entry, so readers take the current snapshot with
+    a single dict lookup and no lock, and a write costs the same however many
+    bridges are published. Only writers take the lock, which keeps two writes
+    to a bridge from publishing out of order.
+
+    With a shared storage backend other workers write too; a snapshot older
+    than ``ttl`` seconds is then reloaded on its next read, which bounds how
+    long this worker serves a bridge another worker changed. Concurrent reads
+    of a stale bridge share one reload, and a reload that finishes after a
+    local write published is dropped. ``ttl=0`` keeps snapshots until this
+    process changes them.
+    """
+
+    def __init__(self, bridges: Repository, services: Repository, ttl: float = 0):
+        self.ttl = ttl
+        self.reloads = 0
+        self._bridges = bridges
+        self._services = services
+        self._version = 0
+        self._snapshots: Dict[str, BridgeSnapshot] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _fresh(self, snapshot: Optional[BridgeSnapshot]) -> bool:
+        return snapshot is not None and (not self.ttl or time.monotonic() - snapshot.loaded_at < self.ttl)
+
+    async def get(self, bridge_id: str) -> Optional[BridgeSnapshot]:
+        snapshot = self._snapshots.get(bridge_id)
+        if self._fresh(snapshot):
+            return snapshot
+        loading = self._loading.get(bridge_id)
+        if loading is None:
+            loading = self._loading[bridge_id] = asyncio.ensure_future(self._reload(bridge_id))
+            loading.add_done_callback(lambda _: self._loading.pop(bridge_id, None))
+        # a cancelled reader must not cancel the reload the others wait on
+        return await asyncio.shield(loading)
+
+    async def _reload(self, bridge_id: str, write: bool = False) -> Optional[BridgeSnapshot]:
+        """Rebuild ``bridge_id`` from the repositories and publish it.
+
+        A read's reload is dropped in favour of any snapshot of the bridge
+        published after it started: that one came from a write and is at
+        least as new. A ``write`` (made under the write lock) always publishes.
+        """
+        started = self._version
+        bridge = await self._bridges.get(bridge_id)
+        if bridge is None:
+            return None  # unknown ids are not cached, so they cannot grow the directory
+        services = await self._services.find("bridgeId", bridge_id)
+        current = self._snapshots.get(bridge_id)
+        if not write and current is not None and current.version > started:
+            return current
+        self._version += 1
+        snapshot = self._snapshots[bridge_id] = BridgeSnapshot(bridge, services, self._version)
+        self.reloads += 1
+        return snapshot
+
+    async def register(self, bridge_id: str, entity_type: str, name: str) -> Mapping:
+        async with self._write_lock:
+            if await self._bridges.get(bridge_id) is None:
+                await self._bridges.put(bridge_id, {
+                    "bridgeId": bridge_id,
+                    "entityType": entity_type,
+                    "name": name,
+                    "webhookUrl": None
+                })
+            return (await self._reload(bridge_id, write=True)).bridge
+
+    async def update_bridge(self, bridge_id: str, fields: Dict) -> Optional[Mapping]:
+        async with self._write_lock:
+            if await self._bridges.update(bridge_id, fields) is None:
+                return None
+            return (await self._reload(bridge_id, write=True)).bridge
+
+    async def add_services(self, bridge_id: str, services: List[Dict]) -> Optional[List[Mapping]]:
+        """Add services to a bridge in one write; None when the bridge does not
+        exist, ``ValueError`` when a service id is already taken."""
+        async with self._write_lock:
+            if await self._bridges.get(bridge_id) is None:
+                return None
+            ids = [service["id"] for service in services]
+            if len(set(ids)) != len(ids):
+                raise ValueError("Service ids must be unique")
+            taken = [service_id for service_id, existing in zip(ids, await self._services.get_many(ids)) if existing]
+            if taken:
+                raise ValueError(f"Service ids already exist: {', '.join(taken)}")
+            await self._services.put_many({service["id"]: {
+                "id": service["id"],
+                "bridgeId": bridge_id,
+                "name": service["name"],
+                "active": service.get("active", True),
+                "version": service.get("version", "v1")
+            } for service in services})
+            snapshot = await self._reload(bridge_id, write=True)
+            return [snapshot.services[service_id] for service_id in ids]
+
+    async def update_service(self, service_id: str, fields: Dict) -> Optional[Mapping]:
+        async with self._write_lock:
+            service = await self._services.update(service_id, fields)
+            if service is None:
+                return None
+            return (await self._reload(service["bridgeId"], write=True)).services[service_id]
+
+    async def service(self, service_id: str) -> Optional[Mapping]:
+        """The service as published in its bridge's snapshot.
+
+        Only the owning bridge is read from the repository; a global
+        service index would have to be copied on every write.
+        """
+        service = await self._services.get(service_id)
+        if service is None:
+            return None
+        snapshot = await self.get(service["bridgeId"])
+        if snapshot is not None and service_id in snapshot.services:
+            return snapshot.services[service_id]
+        return MappingProxyType(service)
+
+    def stats(self) -> Dict[str, int]:
+        snapshots = self._snapshots
+        return {"version": self._version, "bridges": len(snapshots),
+                "services": sum(len(snapshot.services) for snapshot in snapshots.values()),
+                "reloads": self.reloads}
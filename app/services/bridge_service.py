@@ -1,39 +1,59 @@
-from typing import Dict, List, Optional 
-
-_bridges: Dict[str, Dict] = {}
-_services_index: Dict[str, Dict] = {}
-
-def register_bridge(bridge_id: str, entity_type: str, name: str) -> Dict:
-    if bridge_id not in _bridges:
-        _bridges[bridge_id] = {
-            "bridgeId": bridge_id,
-            "entityType": entity_type,
-            "name": name,
-            "webhookUrl": None,
-            "services": []
-        }
-        # seed a couple of services
-        for i in range(1, 3):
-            svc = {
-                "id": f"{bridge_id}-svc-{i}",
-                "name": f"Service-{i}",
-                "active": True,
-                "version": "v1"
-            }
-            _bridges[bridge_id]["services"].append(svc)
-            _services_index[svc["id"]] = svc
-    return _bridges[bridge_id]
-
-def update_bridge_url(bridge_id: str, url: str) -> Optional[Dict]:
-    if bridge_id in _bridges:
-        _bridges[bridge_id]["webhookUrl"] = url
+from typing import Dict, FrozenSet, List, Mapping, Optional
+
+from app.core.config import get_settings
+from app.services.bridge_directory import BridgeDirectory, BridgeSnapshot
+from app.services.webhook_dispatcher import webhook_dispatcher
+from app.storage import get_repository
+
+settings = get_settings()
+
+_bridges = get_repository("bridges")
+_services_index = get_repository("bridge_services", indexes=("bridgeId",))
+
+# only the memory backend is private to this process; others may change under us
+directory = BridgeDirectory(_bridges, _services_index,
+                            ttl=settings.bridge_directory_ttl_seconds if settings.storage_backend != "memory" else 0)
+
+async def register_bridge(bridge_id: str, entity_type: str, name: str) -> Mapping:
+    return await directory.register(bridge_id, entity_type, name)
+
+async def get_bridge(bridge_id: str) -> Optional[Mapping]:
+    snapshot = await directory.get(bridge_id)
+    return snapshot.bridge if snapshot else None
+
+async def update_bridge_url(bridge_id: str, url: str) -> Optional[Dict]:
+    if await directory.update_bridge(bridge_id, {"webhookUrl": url}) is not None:
         return {"bridgeId": bridge_id, "webhookUrl": url}
     return None
 
-def get_services_by_bridge(bridge_id: str) -> List[Dict]:
-    if bridge_id in _bridges:
-        return _bridges[bridge_id]["services"]
-    return []
+async def get_bridge_services(bridge_id: str) -> Optional[BridgeSnapshot]:
+    """The bridge's current snapshot, whose ``body`` and ``etag`` are the
+    serialized public service list; None for an unknown bridge."""
+    return await directory.get(bridge_id)
+
+async def authorized_hips(client_id: str) -> FrozenSet[str]:
+    """HIP ids whose events ``client_id`` may see: its own bridge id and the
+    active services that bridge registered."""
+    snapshot = await directory.get(client_id)
+    services = snapshot.services.values() if snapshot else ()
+    return frozenset([client_id, *(service["id"] for service in services if service.get("active", True))])
+
+async def get_service_by_id(service_id: str) -> Optional[Mapping]:
+    return await directory.service(service_id)
+
+async def add_services(bridge_id: str, services: List[Dict]) -> Optional[List[Mapping]]:
+    return await directory.add_services(bridge_id, services)
+
+async def update_service(service_id: str, fields: Dict) -> Optional[Mapping]:
+    return await directory.update_service(service_id, fields)
+
+async def deactivate_service(service_id: str) -> Optional[Mapping]:
+    return await directory.update_service(service_id, {"active": False})
 
-def get_service_by_id(service_id: str) -> Optional[Dict]:
-    return _services_index.get(service_id)
\ No newline at end of file
+async def notify_bridge(bridge_id: Optional[str], event_type: str, payload: Dict) -> bool:
+    # Fire-and-forget: delivery happens on the dispatcher's own tasks. False
+    # when the bridge has no webhook or its event could not be queued.
+    bridge = await get_bridge(bridge_id) if bridge_id else None
+    if not bridge or not bridge.get("webhookUrl"):
+        return False
+    return webhook_dispatcher.publish(bridge_id, bridge["webhookUrl"], event_type, payload)
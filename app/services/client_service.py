@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import secrets
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.credential_cache import CredentialCache
+from app.core.rate_limit import TokenBucketLimiter
+from app.core.security import hash_client_secret, verify_client_secret
+from app.storage import get_repository
+
+settings = get_settings()
+
+_clients = get_repository("clients")
+
+credential_cache = CredentialCache(maxsize=settings.client_auth_cache_size,
+                                   ttl=settings.client_auth_cache_ttl_seconds)
+issuance_limiter = TokenBucketLimiter(settings.client_token_rate_per_second, settings.client_token_burst)
+# Keyed by (clientId, source address): a guesser behind a shared proxy address
+# exhausts only the ids it guesses at, and a client under attack keeps logging
+# in from its own address
+auth_failure_limiter = TokenBucketLimiter(settings.client_auth_failure_rate_per_second,
+                                          settings.client_auth_failure_burst)
+
+# Concurrent logins with the same credentials share one PBKDF2 verification
+_inflight: Dict[Tuple[str, bytes], "asyncio.Future[bool]"] = {}
+
+# clientId -> entry from the last load of CLIENTS_FILE, to reload only what changed
+_loaded: Dict[str, Dict] = {}
+_clients_mtime = None
+
+def registry_enabled() -> bool:
+    return bool(settings.clients_file)
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    return hash_client_secret(secrets.token_urlsafe(16))
+
+async def _register_client(client_id: str, secret: Optional[str] = None, secret_hash: Optional[str] = None) -> Dict:
+    if secret_hash is None:
+        secret_hash = await asyncio.to_thread(hash_client_secret, secret)
+    client = {
+        "clientId": client_id,
+        "secretHash": secret_hash,
+        "active": True,
+        "rotatedAt": datetime.now(timezone.utc).isoformat()
+    }
+    await _clients.put(client_id, client)
+    credential_cache.invalidate(client_id)
+    return {"clientId": client_id, "active": True}
+
+async def _deactivate_client(client_id: str) -> None:
+    await _clients.update(client_id, {"active": False})
+    credential_cache.invalidate(client_id)
+
+async def load_clients(path: str) -> int:
+    """Register clients from a JSON list of ``{"clientId", "secret" | "secretHash"}``.
+
+    On a reload only changed entries are re-registered, which drops their
+    cached credentials, and clients no longer listed are deactivated.
+    """
+    global _clients_mtime
+    mtime = os.stat(path).st_mtime_ns
+    with open(path) as f:
+        entries = {entry["clientId"]: entry for entry in json.load(f)}
+    for client_id, entry in entries.items():
+        if _loaded.get(client_id) != entry:
+            await _register_client(client_id, entry.get("secret"), entry.get("secretHash"))
+    for client_id in _loaded.keys() - entries.keys():
+        await _deactivate_client(client_id)
+    _loaded.clear()
+    _loaded.update(entries)
+    _clients_mtime = mtime
+    await asyncio.to_thread(_dummy_hash)
+    logger.info(f"Loaded {len(entries)} clients from {path}")
+    return len(entries)
+
+async def watch_clients(path: str, interval_seconds: float) -> None:
+    """Reload ``path`` whenever its modification time changes, so a rotated
+    or removed secret stops being accepted without a restart."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            if os.stat(path).st_mtime_ns != _clients_mtime:
+                await load_clients(path)
+        except Exception as exc:
+            logger.warning(f"Keeping the current clients, reloading {path} failed: {exc!r}")
+
+async def _verify(client_id: str, secret: str) -> bool:
+    client = await _clients.get(client_id)
+    if client is None or not client["active"]:
+        # the same PBKDF2 work as a real client, so timing does not reveal which ids exist
+        await asyncio.to_thread(verify_client_secret, secret, _dummy_hash())
+        return False
+    # PBKDF2 is deliberately slow; keep it off the event loop
+    return await asyncio.to_thread(verify_client_secret, secret, client["secretHash"])
+
+async def verify_client(client_id: str, secret: str) -> bool:
+    key = credential_cache.key(client_id, secret)
+    if credential_cache.contains(key):
+        return True
+    pending = _inflight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        valid = await _verify(client_id, secret)
+    except Exception as exc:
+        future.set_exception(exc)
+        # mark retrieved so an exception nobody else awaited is not logged
+        future.exception()
+        raise
+    except BaseException:
+        future.cancel()
+        raise
+    finally:
+        del _inflight[key]
+    if valid:
+        credential_cache.add(key)
+    future.set_result(valid)
+    return valid
+
+def check_issuance_rate(client_id: str) -> float:
+    """Seconds the client must wait before another token, or 0. Charge it
+    only once the client's secret is verified."""
+    return issuance_limiter.acquire(client_id)
+
+def check_auth_failures(client_id: str, source: str) -> float:
+    """Seconds ``source`` must wait after too many failed logins as
+    ``client_id``, or 0."""
+    return auth_failure_limiter.peek((client_id, source))
+
+def record_auth_failure(client_id: str, source: str) -> None:
+    auth_failure_limiter.acquire((client_id, source))
@@ -1,23 +1,58 @@
+import base64
+import json
 import uuid 
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 
-_consents: Dict[str, Dict] = {}
+from app.core.config import get_settings
+from app.core.expiry import expiry_registry
+from app.services.bridge_service import notify_bridge
+from app.services.event_bus import event_bus
+from app.storage import get_repository
 
-def init_consent(patient_id: str, hip_id: str, purpose: Dict) -> Dict:
-    consent_id = str(uuid.uuid4())
-    _consents[consent_id] = {
+settings = get_settings()
+
+# patientStatus/hipStatus are composite index keys so "GRANTED consents for
+# patient X" is a single sorted-index range rather than a filter over X's consents
+_consents = get_repository(
+    "consents",
+    indexes=("patientId", "hipId", "status", "patientStatus", "hipStatus"),
+    order_by=("requestedAt", "grantedAt"),
+)
+
+def _composite(first: str, second: str) -> str:
+    return f"{first}|{second}"
+
+def _new_consent(consent_id: str, patient_id: str, hip_id: str, purpose: Dict) -> Dict:
+    return {
         "consentRequestId": consent_id,
         "patientId": patient_id,
         "hipId": hip_id,
         "purpose": purpose,
         "status": "REQUESTED",
-        "grantedAt": None
+        "requestedAt": datetime.now(timezone.utc).isoformat(),
+        "grantedAt": None,
+        "patientStatus": _composite(patient_id, "REQUESTED"),
+        "hipStatus": _composite(hip_id, "REQUESTED")
     }
+
+async def init_consent(patient_id: str, hip_id: str, purpose: Dict) -> Dict:
+    consent_id = str(uuid.uuid4())
+    await _consents.put(consent_id, _new_consent(consent_id, patient_id, hip_id, purpose))
+    # Requests that are never acted on are reaped; granted consents are kept
+    await expiry_registry.register(_consents, consent_id, settings.consent_request_ttl_seconds)
     return {"consentRequestId": consent_id, "status": "REQUESTED"}
 
-def get_consent_status(consent_id: str) -> Optional[Dict]:
-    consent = _consents.get(consent_id)
+async def init_consents(requests: List[Tuple[str, str, Dict]]) -> List[Dict]:
+    consents = {}
+    for patient_id, hip_id, purpose in requests:
+        consent_id = str(uuid.uuid4())
+        consents[consent_id] = _new_consent(consent_id, patient_id, hip_id, purpose)
+    await _consents.put_many(consents)
+    await expiry_registry.register_many(_consents, consents, settings.consent_request_ttl_seconds)
+    return [{"consentRequestId": consent_id, "status": "REQUESTED"} for consent_id in consents]
+
+def _status_view(consent_id: str, consent: Optional[Dict]) -> Optional[Dict]:
     if consent:
         return {
             "consentRequestId": consent_id,
@@ -26,8 +61,15 @@ def get_consent_status(consent_id: str) -> Optional[Dict]:
         }
     return None
 
-def fetch_consent(consent_id: str) -> Optional[Dict]:
-    consent = _consents.get(consent_id)
+async def get_consent_status(consent_id: str) -> Optional[Dict]:
+    return _status_view(consent_id, await _consents.get(consent_id))
+
+async def get_consent_statuses(consent_ids: List[str]) -> List[Optional[Dict]]:
+    return [_status_view(consent_id, consent)
+            for consent_id, consent in zip(consent_ids, await _consents.get_many(consent_ids))]
+
+async def fetch_consent(consent_id: str) -> Optional[Dict]:
+    consent = await _consents.get(consent_id)
     if consent:
         return {
             "consentRequestId": consent_id,
@@ -36,10 +78,77 @@ def fetch_consent(consent_id: str) -> Optional[Dict]:
         }
     return None
 
-def notify_consent(consent_id: str, status: str) -> Dict:
-    if consent_id in _consents:
-        _consents[consent_id]["status"] = status
+async def notify_consent(consent_id: str, status: str) -> Dict:
+    consent = await _consents.get(consent_id)
+    if consent is None:
+        return None
+    fields = {
+        "status": status,
+        "patientStatus": _composite(consent["patientId"], status),
+        "hipStatus": _composite(consent["hipId"], status)
+    }
+    if status == "GRANTED":
+        fields["grantedAt"] = datetime.now(timezone.utc).isoformat()
+    consent = await _consents.update(consent_id, fields)
+    if consent is not None:
         if status == "GRANTED":
-            _consents[consent_id]["grantedAt"] = datetime.now(timezone.utc).isoformat()
+            await expiry_registry.cancel(_consents, consent_id)
+        event = {
+            "consentRequestId": consent_id,
+            "status": status,
+            "grantedAt": consent["grantedAt"]
+        }
+        await notify_bridge(consent["hipId"], "consent.notify", event)
+        await event_bus.publish("consent.notify", {
+            "consentRequestId": consent_id,
+            "patientId": consent["patientId"],
+            "hipId": consent["hipId"]
+        }, event)
         return {"consentRequestId": consent_id, "status": status}
     
+
+def _encode_cursor(position: Tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        order_value, key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(order_value), str(key)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def _summary(consent: Dict) -> Dict:
+    return {field: consent.get(field) for field in
+            ("consentRequestId", "patientId", "hipId", "status", "purpose", "requestedAt", "grantedAt")}
+
+async def search_consents(patient_id: Optional[str] = None, hip_id: Optional[str] = None,
+                          status: Optional[str] = None, order_by: str = "requestedAt",
+                          descending: bool = False, limit: int = 50,
+                          cursor: Optional[str] = None) -> Dict:
+    """One page of consents matching the filters, in ``order_by`` order.
+
+    Exactly one sorted index is read per page: patient or HIP (optionally
+    combined with status), or status alone. ``nextCursor`` is set when more
+    results follow.
+    """
+    if patient_id and hip_id:
+        raise ValueError("Filter by patientId or hipId, not both")
+    if patient_id:
+        field, value = ("patientStatus", _composite(patient_id, status)) if status else ("patientId", patient_id)
+    elif hip_id:
+        field, value = ("hipStatus", _composite(hip_id, status)) if status else ("hipId", hip_id)
+    elif status:
+        field, value = "status", status
+    else:
+        raise ValueError("At least one of patientId, hipId or status is required")
+    if order_by not in _consents.order_by:
+        raise ValueError(f"orderBy must be one of: {', '.join(_consents.order_by)}")
+
+    after = _decode_cursor(cursor) if cursor else None
+    rows = await _consents.page(field, value, order_by, after, limit + 1, descending)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        key, consent = rows[-1]
+        next_cursor = _encode_cursor((consent[order_by], key))
+    return {"consents": [_summary(consent) for _, consent in rows], "nextCursor": next_cursor}
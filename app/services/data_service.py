@@ -1,13 +1,35 @@
+import asyncio
+import base64
+import binascii
+import os
+import socket
 import uuid 
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime, timezone
 
-_health_data: Dict[str, Dict] = {}
-_data_requests: Dict[str, Dict] = {}
+from loguru import logger
 
-def send_health_info(txn_id: str, patient_id: str, hip_id: str, care_context_id: str, health_info: Dict, metadata: Dict):
+from app.core.config import get_settings
+from app.core.expiry import expiry_registry
+from app.services.bridge_service import get_bridge, notify_bridge
+from app.services.event_bus import event_bus
+from app.services.transfer_engine import transfer_engine
+from app.storage import get_repository
+from app.storage.segments import SegmentStore, SegmentWriter
+
+settings = get_settings()
+
+_health_data = get_repository("health_data", indexes=("txnId", "patientId", "hipId"))
+_data_requests = get_repository("data_requests", indexes=("status", "txnId"))
+# payloads are referenced only by health records, so segments are retired
+# once every record that could point into them has expired
+_blobs = SegmentStore(settings.blob_store_path, settings.blob_segment_max_bytes,
+                      reference_ttl=settings.health_data_ttl_seconds)
+
+async def _store_health_data(txn_id: str, patient_id: str, hip_id: str, care_context_id: str, health_info: Dict, metadata: Dict):
     data_id = str(uuid.uuid4())
-    _health_data[data_id] = {
+    await _health_data.put(data_id, {
+        "dataId": data_id,
         "txnId": txn_id,
         "patientId": patient_id,
         "hipId": hip_id,
@@ -15,28 +37,260 @@ def send_health_info(txn_id: str, patient_id: str, hip_id: str, care_context_id:
         "healthInfo": health_info,
         "metadata": metadata,
         "sentAt": datetime.now(timezone.utc).isoformat()
-    }
-    return {"status": "RECEIVED", "txnId": txn_id}
+    })
+    await expiry_registry.register(_health_data, data_id, settings.health_data_ttl_seconds)
+    for request in await _data_requests.find("txnId", txn_id):
+        await _data_requests.increment(request["requestId"], "received")
+    return {"status": "RECEIVED", "txnId": txn_id, "dataId": data_id}
 
-def request_health_info(patient_id: str, hip_id: str, care_context_id: str, data_types: List[str]) -> Dict:
-    request_id = str(uuid.uuid4())
-    _data_requests[request_id] = {
+def _blob_health_info(blob_ref: str, blob_size: int, key_material: str) -> Dict:
+    return {"blobRef": blob_ref, "size": blob_size, "keyMaterial": key_material}
+
+def _put_encrypted_data(encrypted_data: str) -> Tuple[str, int]:
+    try:
+        payload = base64.b64decode(encrypted_data, validate=True)
+    except binascii.Error as exc:
+        raise ValueError(f"healthInfo.encryptedData is not valid base64: {exc}")
+    return _blobs.put(payload), len(payload)
+
+async def send_health_info(txn_id: str, patient_id: str, hip_id: str, care_context_id: str, health_info: Dict, metadata: Dict):
+    # Stored as raw bytes, a third smaller than the base64 text; identical
+    # re-sends share one copy. Raises ValueError if encryptedData is not base64.
+    # Decoding, hashing and the append run in a thread, off the event loop.
+    blob_ref, size = await asyncio.to_thread(_put_encrypted_data, health_info["encryptedData"])
+    return await _store_health_data(txn_id, patient_id, hip_id, care_context_id,
+                                    _blob_health_info(blob_ref, size, health_info["keyMaterial"]), metadata)
+
+def health_info_blob_writer() -> SegmentWriter:
+    return _blobs.writer()
+
+async def send_health_info_blob(txn_id: str, patient_id: str, hip_id: str, care_context_id: str,
+                          blob_ref: str, blob_size: int, key_material: str, metadata: Dict):
+    # encryptedData already lives in the blob store; keep only the reference
+    return await _store_health_data(txn_id, patient_id, hip_id, care_context_id,
+                                    _blob_health_info(blob_ref, blob_size, key_material), metadata)
+
+async def read_health_info(data_id: str) -> Optional[Tuple[Dict, memoryview]]:
+    """A health-data record and its decoded encryptedData, as a read-only view
+    of the segment's mmap (nothing is copied); None when either is gone."""
+    record = await _health_data.get(data_id)
+    if record is None:
+        return None
+    # a miss re-scans segments other workers appended to
+    view = await asyncio.to_thread(_blobs.open, record["healthInfo"]["blobRef"])
+    return (record, view) if view is not None else None
+
+def blob_store_stats() -> Dict:
+    return _blobs.stats()
+
+async def run_blob_retirement(interval_seconds: float) -> None:
+    """Retire expired blob segments every ``interval_seconds``; a failed pass
+    is logged and retried on the next one."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(_blobs.retire)
+        except Exception as exc:
+            logger.exception(f"Blob segment retirement failed: {exc}")
+
+async def update_health_data(data_id: str, **fields) -> Optional[Dict]:
+    return await _health_data.update(data_id, fields)
+
+async def delete_health_data(data_id: str) -> Optional[Dict]:
+    await expiry_registry.cancel(_health_data, data_id)
+    return await _health_data.delete(data_id)
+
+async def get_health_data_by_txn(txn_id: str) -> List[Dict]:
+    return await _health_data.find("txnId", txn_id)
+
+async def get_health_data_by_patient(patient_id: str) -> List[Dict]:
+    return await _health_data.find("patientId", patient_id)
+
+async def get_health_data_by_hip(hip_id: str) -> List[Dict]:
+    return await _health_data.find("hipId", hip_id)
+
+# A data request is REQUESTED until a worker claims it (DISPATCHING) and the
+# transfer engine has handed it to the HIP (ACKNOWLEDGED), then TRANSFERRED or
+# FAILED once the HIP reports the flow.
+_TERMINAL = ("TRANSFERRED", "FAILED")
+
+# Owner of this process's DISPATCHING claims; unique per process, so a
+# restarted worker never takes a dead predecessor's claim for its own.
+_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+# kept on the record for claiming, never returned to callers
+_CLAIM_FIELDS = ("owner", "claimedAt")
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def _new_data_request(request_id: str, patient_id: str, hip_id: str, care_context_id: str, data_types: List[str]) -> Dict:
+    return {
+        "requestId": request_id,
         "patientId": patient_id,
         "hipId": hip_id,
         "careContextId": care_context_id,
         "dataTypes": data_types,
         "status": "REQUESTED",
-        "requestedAt": datetime.now(timezone.utc).isoformat()
+        "txnId": None,
+        "received": 0,
+        "error": None,
+        "requestedAt": _now(),
+        "acknowledgedAt": None,
+        "completedAt": None
     }
+
+def _check_transfer_capacity(jobs: int) -> None:
+    if not transfer_engine.admit(jobs):
+        raise OverflowError("Data transfer queue is full, retry later")
+
+async def request_health_info(patient_id: str, hip_id: str, care_context_id: str, data_types: List[str]) -> Dict:
+    """Record a data request and queue it for the HIP; raises ``OverflowError``
+    when the transfer queue is full."""
+    _check_transfer_capacity(1)
+    request_id = str(uuid.uuid4())
+    await _data_requests.put(request_id, _new_data_request(request_id, patient_id, hip_id, care_context_id, data_types))
+    await expiry_registry.register(_data_requests, request_id, settings.data_request_ttl_seconds)
+    # not queued while the engine is stopped; start_data_transfers() picks it up
+    transfer_engine.submit(hip_id, care_context_id, request_id)
     return {"requestId": request_id, "status": "REQUESTED"}
 
-def get_data_request_status(request_id: str) -> Optional[Dict]:
-    return _data_requests.get(request_id)
+async def request_health_info_many(requests: List[Tuple[str, str, str, List[str]]]) -> List[Dict]:
+    _check_transfer_capacity(len(requests))
+    data_requests = {}
+    for request in requests:
+        request_id = str(uuid.uuid4())
+        data_requests[request_id] = _new_data_request(request_id, *request)
+    await _data_requests.put_many(data_requests)
+    await expiry_registry.register_many(_data_requests, data_requests, settings.data_request_ttl_seconds)
+    transfer_engine.submit_many((request["hipId"], request["careContextId"], request_id)
+                                for request_id, request in data_requests.items())
+    return [{"requestId": request_id, "status": "REQUESTED"} for request_id in data_requests]
 
-def notify_data_flow(txn_id: str, status: str, hip_id: str) -> Dict:
-    # Find and update data entry with matching txn_id
-    for data_id, data in _health_data.items():
-        if data["txnId"] == txn_id:
-            _health_data[data_id]["status"] = status
+async def get_data_request_status(request_id: str) -> Optional[Dict]:
+    request = await _data_requests.get(request_id)
+    if request is None:
+        return None
+    return {field: value for field, value in request.items() if field not in _CLAIM_FIELDS}
+
+async def _set_request_status(request_id: str, status: str, fields: Dict,
+                              expected: Optional[Dict] = None) -> Optional[Dict]:
+    """Write ``status`` and publish it; with ``expected``, only if the record
+    still matches it (None otherwise)."""
+    if expected is None:
+        request = await _data_requests.update(request_id, {"status": status, **fields})
+    else:
+        request = await _data_requests.update_if(request_id, expected, {"status": status, **fields})
+    if request is not None:
+        await event_bus.publish("data.request", {
+            "requestId": request_id,
+            "txnId": request["txnId"],
+            "patientId": request["patientId"],
+            "hipId": request["hipId"]
+        }, {"requestId": request_id, "status": status, "txnId": request["txnId"], "error": request["error"]})
+    return request
+
+def _claim_expired(request: Dict) -> bool:
+    claimed_at = request.get("claimedAt")
+    if claimed_at is None:
+        return True
+    age = datetime.now(timezone.utc) - datetime.fromisoformat(claimed_at)
+    return age.total_seconds() > settings.data_transfer_claim_seconds
+
+async def _claim(request: Dict) -> Optional[Dict]:
+    """Take ``request`` for this worker with a conditional update, so only one
+    worker hands it to the HIP; None when another worker holds it or it is
+    past dispatch. A claim older than ``DATA_TRANSFER_CLAIM_SECONDS`` is
+    taken over: its worker died before the HIP acknowledged the request."""
+    status, owner = request["status"], request.get("owner")
+    if status not in ("REQUESTED", "DISPATCHING"):
+        return None
+    if status == "DISPATCHING" and owner != _WORKER_ID and not _claim_expired(request):
+        return None
+    expected = {"status": status, "owner": owner, "claimedAt": request.get("claimedAt")}
+    # health-info pushes and flow notifications arrive under this txnId
+    return await _data_requests.update_if(request["requestId"], expected, {
+        "status": "DISPATCHING",
+        "owner": _WORKER_ID,
+        "claimedAt": _now(),
+        "txnId": request["txnId"] or str(uuid.uuid4())
+    })
+
+async def _dispatch_data_request(request_id: str) -> None:
+    """Transfer-engine job: hand a REQUESTED data request to its HIP's bridge."""
+    request = await _data_requests.get(request_id)
+    if request is None:
+        return  # expired
+    request = await _claim(request)
+    if request is None:
+        return  # dispatched, or being dispatched, by another worker
+    # Outcomes are written only over our own claim: a HIP may already have
+    # reported the flow (TRANSFERRED) before its webhook response arrived.
+    claim = {"status": "DISPATCHING", "owner": _WORKER_ID}
+    bridge = await get_bridge(request["hipId"])
+    if not bridge or not bridge.get("webhookUrl"):
+        await _set_request_status(request_id, "FAILED", {"error": "HIP has no webhook URL", "completedAt": _now()},
+                                  claim)
+        return
+    txn_id = request["txnId"]
+    error = await transfer_engine.deliver(request["hipId"], bridge["webhookUrl"], {"events": [{
+        "id": str(uuid.uuid4()),
+        "type": "data.request",
+        "bridgeId": request["hipId"],
+        "payload": {
+            "requestId": request_id,
+            "txnId": txn_id,
+            "patientId": request["patientId"],
+            "careContextId": request["careContextId"],
+            "dataTypes": request["dataTypes"]
+        },
+        "createdAt": _now()
+    }]})
+    if error:
+        await _set_request_status(request_id, "FAILED", {"error": error, "completedAt": _now()}, claim)
+    else:
+        await _set_request_status(request_id, "ACKNOWLEDGED", {"acknowledgedAt": _now()}, claim)
+
+async def start_data_transfers() -> int:
+    """Start the transfer engine and queue the requests never handed to a HIP
+    that this worker manages to claim; returns how many were queued.
+
+    Every worker runs this at startup, so each request is claimed before it is
+    queued and lands on one worker only. Requests beyond the queue's free room
+    are left unclaimed for a worker with room.
+    """
+    await transfer_engine.start(_dispatch_data_request)
+    pending = (await _data_requests.find("status", "REQUESTED")
+               + await _data_requests.find("status", "DISPATCHING"))
+    room = transfer_engine.max_queue - transfer_engine.queued
+    claimed = []
+    for request in pending:
+        if len(claimed) >= room:
             break
+        if request.get("requestId"):
+            request = await _claim(request)
+            if request is not None:
+                claimed.append(request)
+    return transfer_engine.submit_many((request["hipId"], request["careContextId"], request["requestId"])
+                                       for request in claimed)
+
+async def notify_data_flow(txn_id: str, status: str, hip_id: str) -> Dict:
+    records = await _health_data.find("txnId", txn_id)
+    for data in records:
+        await _health_data.update(data["dataId"], {"status": status})
+    if status in _TERMINAL:
+        for request in await _data_requests.find("txnId", txn_id):
+            # conditional, so a terminal status is never overwritten; retried
+            # when a dispatch moved the request on in between
+            while request is not None and request["status"] not in _TERMINAL:
+                if await _set_request_status(request["requestId"], status, {"completedAt": _now()},
+                                             {"status": request["status"]}) is not None:
+                    break
+                request = await _data_requests.get(request["requestId"])
+    event = {"txnId": txn_id, "status": status}
+    await notify_bridge(hip_id, "data.flow", event)
+    await event_bus.publish("data.flow", {
+        "txnId": txn_id,
+        "patientId": records[0]["patientId"] if records else None,
+        "hipId": hip_id
+    }, event)
     return {"status": "ACKNOWLEDGED"}
@@ -0,0 +1,231 @@
+import asyncio
+import json
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Filter fields in order of selectivity: a subscription is indexed under the
+# first one it sets, so fan-out only visits subscribers that can match.
+FILTER_FIELDS = ("consentRequestId", "requestId", "txnId", "patientId", "hipId")
+
+
+class SubscriptionLagged(Exception):
+    """The subscriber fell more than its queue size behind and was cut off."""
+
+
+class Subscription:
+    """One subscriber's filters and pending events.
+
+    ``push`` never blocks the publisher: when ``max_queue`` events are already
+    pending the subscription is marked lagged, and once the pending events are
+    drained ``get`` raises so the client reconnects with ``Last-Event-ID``.
+    With ``hip_ids`` set, only events of those HIPs match, whatever the filters.
+    """
+
+    __slots__ = ("filters", "types", "hip_ids", "max_queue", "lagged", "_pending", "_ready")
+
+    def __init__(self, filters: Dict[str, str], types: Iterable[str] = (), max_queue: int = 256,
+                 hip_ids: Optional[Iterable[str]] = None):
+        self.filters = filters
+        self.types = frozenset(types)
+        self.hip_ids: Optional[FrozenSet[str]] = frozenset(hip_ids) if hip_ids is not None else None
+        self.max_queue = max_queue
+        self.lagged = False
+        self._pending: Deque[Dict] = deque()
+        self._ready = asyncio.Event()
+
+    @property
+    def index_key(self) -> Tuple[str, str]:
+        field = next(field for field in FILTER_FIELDS if field in self.filters)
+        return field, self.filters[field]
+
+    def matches(self, event: Dict) -> bool:
+        if self.types and event["type"] not in self.types:
+            return False
+        keys = event["keys"]
+        if self.hip_ids is not None and keys.get("hipId") not in self.hip_ids:
+            return False
+        return all(keys.get(field) == value for field, value in self.filters.items())
+
+    def push(self, event: Dict) -> bool:
+        if self.lagged:
+            return False
+        if len(self._pending) >= self.max_queue:
+            self.lagged = True
+        else:
+            self._pending.append(event)
+        self._ready.set()
+        return not self.lagged
+
+    async def get(self, timeout: float) -> Optional[Dict]:
+        """Next event, or ``None`` if nothing arrived within ``timeout`` seconds."""
+        if not self._pending and not self.lagged:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self._pending:
+            return self._pending.popleft()
+        raise SubscriptionLagged()
+
+
+class EventBus:
+    """In-process pub/sub of consent, link and data-flow state changes.
+
+    Subscribers are indexed by their most selective filter, so publishing
+    touches only the subscribers that could match and costs nothing when no
+    one is listening. The last ``history_size`` events are kept for
+    ``Last-Event-ID`` catch-up. With a Redis client, events are relayed
+    through a pub/sub channel so a subscriber on any worker sees every event.
+    """
+
+    def __init__(self, queue_size: int = 256, history_size: int = 1000, max_subscribers: int = 10000,
+                 redis_client=None, channel: str = "abdm:events"):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.published = 0
+        self.delivered = 0
+        self.lagged = 0
+        self._history: Deque[Dict] = deque(maxlen=history_size)
+        self._index: Dict[Tuple[str, str], Set[Subscription]] = {}
+        self._subscribers = 0
+        self._redis = redis_client
+        self._channel = channel
+        self._relay: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._redis is not None:
+            pubsub = self._redis.pubsub()
+            await pubsub.subscribe(self._channel)
+            self._relay = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self) -> None:
+        if self._relay is not None:
+            self._relay.cancel()
+            await asyncio.gather(self._relay, return_exceptions=True)
+            self._relay = None
+
+    async def publish(self, event_type: str, keys: Dict[str, Optional[str]], payload: Dict) -> Dict:
+        """Publish ``payload`` as ``event_type``; ``keys`` are the values subscribers filter on."""
+        event = {
+            "id": uuid.uuid4().hex,
+            "type": event_type,
+            "keys": {field: value for field, value in keys.items() if value is not None},
+            "data": payload,
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+        }
+        self.published += 1
+        if self._redis is not None:
+            # the relay delivers it, to this worker's subscribers as well
+            await self._redis.publish(self._channel, json.dumps(event))
+        else:
+            self._deliver(event)
+        return event
+
+    async def _listen(self, pubsub) -> None:
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    self._deliver(json.loads(message["data"]))
+                except Exception as exc:  # a bad message must not stop the relay
+                    logger.exception(f"Dropping malformed event from {self._channel}: {exc}")
+        finally:
+            await pubsub.reset()
+
+    def _deliver(self, event: Dict) -> None:
+        self._history.append(event)
+        for field, value in event["keys"].items():
+            for subscription in self._index.get((field, value), ()):
+                if subscription.matches(event):
+                    was_lagged = subscription.lagged
+                    if subscription.push(event):
+                        self.delivered += 1
+                    elif not was_lagged:
+                        self.lagged += 1
+
+    def prepare(self, filters: Dict[str, Optional[str]], types: Iterable[str] = (),
+                hip_ids: Optional[Iterable[str]] = None) -> Subscription:
+        """A subscription that is not registered yet; raises ``ValueError``
+        without a filter and ``OverflowError`` once ``max_subscribers`` are
+        connected."""
+        filters = {field: value for field, value in filters.items() if value}
+        unknown = set(filters) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+        if not filters:
+            raise ValueError(f"At least one of {', '.join(FILTER_FIELDS)} is required")
+        if self._subscribers >= self.max_subscribers:
+            raise OverflowError("Too many event subscribers")
+        return Subscription(filters, types, self.queue_size, hip_ids)
+
+    def attach(self, subscription: Subscription, last_event_id: Optional[str] = None) -> None:
+        """Register ``subscription``, queueing the history after ``last_event_id``;
+        ``OverflowError`` if ``max_subscribers`` filled up since ``prepare``."""
+        if self._subscribers >= self.max_subscribers:
+            raise OverflowError("Too many event subscribers")
+        if last_event_id:
+            for event in self._replay(last_event_id):
+                if subscription.matches(event):
+                    subscription.push(event)
+        self._index.setdefault(subscription.index_key, set()).add(subscription)
+        self._subscribers += 1
+
+    def subscribe(self, filters: Dict[str, Optional[str]], types: Iterable[str] = (),
+                  last_event_id: Optional[str] = None, hip_ids: Optional[Iterable[str]] = None) -> Subscription:
+        """``prepare`` and ``attach`` in one step."""
+        subscription = self.prepare(filters, types, hip_ids)
+        self.attach(subscription, last_event_id)
+        return subscription
+
+    def _replay(self, last_event_id: str) -> List[Dict]:
+        history = list(self._history)
+        for position, event in enumerate(history):
+            if event["id"] == last_event_id:
+                return history[position + 1:]
+        # the id has aged out of the history: resend everything kept, event
+        # ids let the client drop the ones it has already seen
+        return history
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        key = subscription.index_key
+        subscribers = self._index.get(key)
+        if subscribers and subscription in subscribers:
+            subscribers.discard(subscription)
+            self._subscribers -= 1
+            if not subscribers:
+                del self._index[key]
+
+    def stats(self) -> Dict:
+        return {
+            "subscribers": self._subscribers,
+            "published": self.published,
+            "delivered": self.delivered,
+            "lagged": self.lagged,
+            "history": len(self._history),
+        }
+
+
+def _redis_client():
+    if settings.events_backend != "redis":
+        return None
+    from app.storage import get_redis_client
+    return get_redis_client()
+
+
+event_bus = EventBus(
+    queue_size=settings.events_queue_size,
+    history_size=settings.events_history_size,
+    max_subscribers=settings.events_max_subscribers,
+    redis_client=_redis_client(),
+    channel=f"{settings.redis_prefix}:events",
+)
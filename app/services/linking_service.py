@@ -1,41 +1,239 @@
+import asyncio
+import os
+import secrets
+import time
 import uuid
-from typing import Dict, List
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
-_tokens: Dict[str, Dict] = {}
-_txns: Dict[str, Dict] = {}
+from loguru import logger
 
-def generate_link_token(patient_id: str, hip_id: str) -> Dict:
+from app.core.config import get_settings
+from app.core.expiry import expiry_registry
+from app.core.patient_index import PatientIndex, read_snapshot
+from app.core.security import hash_otp, verify_otp
+from app.services.bridge_service import get_bridge, notify_bridge
+from app.services.event_bus import event_bus
+from app.storage import get_repository
+
+settings = get_settings()
+
+_tokens = get_repository("link_tokens")
+_txns = get_repository("link_txns")
+_care_contexts = get_repository("care_contexts", indexes=("patientId",))
+
+patient_index = PatientIndex()
+_patients_mtime = None
+
+
+# Statuses a HIP notification may move a transaction to, by its current
+# status; anything else (EXPIRED, FAILED, LINKED, ...) is final.
+_OTP_STATUSES = frozenset({"INITIATED", "CONFIRMED"})
+_NOTIFY_TRANSITIONS = {
+    "INITIATED": frozenset({"EXPIRED", "FAILED", "CANCELLED"}),
+    "CONFIRMED": frozenset({"LINKED", "FAILED"}),
+}
+
+
+class LinkTransactionExists(Exception):
+    """``init_link`` was given a txnId that is already in use."""
+
+
+def discovery_enabled() -> bool:
+    return bool(settings.patient_index_file)
+
+async def load_patients(path: str) -> int:
+    """Index a CSV or JSON-lines snapshot of ``patientId, mobile, name``.
+
+    The index is only ever built from a snapshot: nothing in the gateway
+    writes patients. It is built off the event loop and swapped in whole, so
+    discovery keeps answering from the previous index during a reload and
+    patients missing from the new snapshot are dropped.
+    """
+    global patient_index, _patients_mtime
+    _patients_mtime = os.stat(path).st_mtime_ns
+    index = PatientIndex()
+    # parsing millions of rows would stall the event loop
+    await asyncio.to_thread(index.add_many, read_snapshot(path))
+    patient_index = index
+    logger.info(f"Indexed {len(index)} patients from {path}")
+    return len(index)
+
+async def watch_patients(path: str, interval_seconds: float) -> None:
+    """Reload the snapshot whenever its modification time changes; a snapshot
+    that fails to parse is logged once and the current index kept."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            if os.stat(path).st_mtime_ns != _patients_mtime:
+                await load_patients(path)
+        except Exception as exc:
+            # whatever broke the reload, discovery keeps the last good index
+            logger.warning(f"Keeping the current patient index, reloading {path} failed: {exc!r}")
+
+def patient_index_stats() -> Dict:
+    return patient_index.stats()
+
+async def generate_link_token(patient_id: str, hip_id: str) -> Dict:
     token = str(uuid.uuid4())
-    _tokens[token] = {
+    await _tokens.put(token, {
         "patientId": patient_id,
         "hipId": hip_id,
-    }
-    return {"token": token, "expiresIn": 300}
+    })
+    await expiry_registry.register(_tokens, token, settings.link_token_ttl_seconds)
+    return {"token": token, "expiresIn": settings.link_token_ttl_seconds}
+
+def _stage(care_contexts: List[Dict], pending: List[Dict]) -> List[Dict]:
+    """``pending`` plus ``care_contexts``, one entry per care context id."""
+    staged = {care_context["id"]: care_context for care_context in pending}
+    for care_context in care_contexts:
+        staged[care_context["id"]] = {"id": care_context["id"], "referenceNumber": care_context["referenceNumber"]}
+    if len(staged) > settings.link_max_care_contexts:
+        raise ValueError(f"A link transaction holds at most {settings.link_max_care_contexts} care contexts")
+    return list(staged.values())
+
+def _check_pending(txn: Dict, patient_id: str) -> None:
+    if txn["patientId"] != patient_id:
+        raise ValueError("Link transaction belongs to another patient")
+    if txn["status"] != "INITIATED":
+        raise ValueError(f"Link transaction is {txn['status']}")
 
-def link_care_contexts(patient_id: str, care_contexts: List[Dict]) -> Dict:
-    return {"status": "PENDING"}
+async def link_care_contexts(patient_id: str, txn_id: str, care_contexts: List[Dict]) -> Optional[Dict]:
+    """Add care contexts to a pending link transaction; None when it does not exist."""
+    while True:
+        txn = await _txns.get(txn_id)
+        if txn is None:
+            return None
+        _check_pending(txn, patient_id)
+        staged = txn.get("careContexts", [])
+        pending = _stage(care_contexts, staged)
+        # compare-and-set on the list read: a concurrent add is re-merged
+        # rather than lost, and a confirmed transaction is never written to
+        if await _txns.update_if(txn_id, {"status": "INITIATED", "careContexts": staged},
+                                 {"careContexts": pending}) is not None:
+            return {"status": "PENDING", "txnId": txn_id, "pending": len(pending)}
 
-def discover_patient(mobile: str, name: str | None) -> Dict:
-    patient_id = f"pat-{mobile}"
-    return {"patientId": patient_id, "status": "FOUND"}
+async def get_patient_care_contexts(patient_id: str, hip_id: Optional[str] = None) -> List[Dict]:
+    linked = await _care_contexts.find("patientId", patient_id)
+    return [care_context for care_context in linked if hip_id is None or care_context["hipId"] == hip_id]
 
-def init_link(patient_id: str, txn_id: str) -> Dict:
-    _txns[txn_id] = {
+async def discover_patient(mobile: str, name: str | None) -> Optional[Dict]:
+    """Match on mobile and fuzzy name; None when no single patient matches.
+    Raises ``ValueError`` for a mobile without digits."""
+    if not discovery_enabled():
+        # no demographics configured: every mobile resolves, as in the sandbox
+        return {"patientId": f"pat-{mobile}", "status": "FOUND"}
+    patient_id = patient_index.match(mobile, name, settings.discovery_name_threshold)
+    return {"patientId": patient_id, "status": "FOUND"} if patient_id else None
+
+async def init_link(patient_id: str, txn_id: str, hip_id: str, care_contexts: List[Dict] = ()) -> Dict:
+    """Open a link transaction holding ``care_contexts`` until the patient
+    confirms it with the OTP, which the HIP's bridge delivers to them.
+    ``LinkTransactionExists`` when ``txn_id`` is taken: re-initiating would
+    hand the transaction to another patient and reset its attempt count.
+    ``ValueError`` when the HIP has no bridge webhook to deliver the OTP
+    (unless ``LINK_FIXED_OTP`` makes it known), ``OverflowError`` when the
+    OTP could not be queued: the bridge's webhook queue is full or the
+    dispatcher is stopped. The transaction is then removed, so the txnId can
+    be retried."""
+    pending = _stage(care_contexts, [])
+    if not settings.link_fixed_otp:
+        bridge = await get_bridge(hip_id)
+        if not bridge or not bridge.get("webhookUrl"):
+            raise ValueError(f"HIP {hip_id} has no bridge webhook URL to deliver the OTP to")
+    otp = settings.link_fixed_otp or f"{secrets.randbelow(10 ** 6):06d}"
+    created = await _txns.insert(txn_id, {
         "patientId": patient_id,
-        "status": "INITIATED"
-    }
+        "hipId": hip_id,
+        "status": "INITIATED",
+        "careContexts": pending,
+        "otpHash": hash_otp(txn_id, otp),
+        "otpExpiresAt": time.time() + settings.link_otp_ttl_seconds,
+        "attempts": 0
+    })
+    if not created:
+        raise LinkTransactionExists(f"Link transaction {txn_id} already exists")
+    await expiry_registry.register(_txns, txn_id, settings.link_txn_ttl_seconds)
+    delivered = await notify_bridge(hip_id, "link.otp", {"txnId": txn_id, "patientId": patient_id, "otp": otp})
+    if not delivered and not settings.link_fixed_otp:
+        # nobody could ever confirm it; free the txnId for the retry
+        await _txns.delete(txn_id)
+        raise OverflowError("OTP could not be queued for delivery, retry later")
     return {"status": "INITIATED", "txnId": txn_id}
 
-def confirm_link(patient_id: str, txn_id: str, otp: str) -> Dict:
-    _txns[txn_id] = {
+async def confirm_link(patient_id: str, txn_id: str, otp: str) -> Optional[Dict]:
+    """Check the OTP and commit the transaction's care contexts to the
+    patient. None when the transaction does not exist; ``ValueError`` when
+    it is not pending or the OTP is wrong or expired, and after
+    ``LINK_OTP_MAX_ATTEMPTS`` wrong OTPs the transaction fails for good."""
+    txn = await _txns.get(txn_id)
+    if txn is None:
+        return None
+    _check_pending(txn, patient_id)
+    if time.time() > txn["otpExpiresAt"]:
+        await _txns.update_if(txn_id, {"status": "INITIATED"}, {"status": "EXPIRED", "otpHash": None})
+        raise ValueError("OTP has expired")
+    # Each guess is counted in one atomic write before it is checked, so
+    # concurrent confirms, on any worker, cannot check more than the limit.
+    attempts = await _txns.increment(txn_id, "attempts")
+    if attempts is None:
+        return None
+    if attempts > settings.link_otp_max_attempts:
+        raise ValueError("Too many invalid OTP attempts")
+    if not verify_otp(txn_id, otp, txn.get("otpHash")):
+        if attempts == settings.link_otp_max_attempts:
+            await _txns.update_if(txn_id, {"status": "INITIATED"}, {"status": "FAILED", "otpHash": None})
+            raise ValueError("Too many invalid OTP attempts")
+        raise ValueError("Invalid OTP")
+    # only one concurrent confirm wins the transaction and links its care contexts
+    txn = await _txns.update_if(txn_id, {"status": "INITIATED"}, {"status": "CONFIRMED", "otpHash": None})
+    if txn is None:
+        raise ValueError("Link transaction is no longer pending")
+
+    hip_id = txn["hipId"]
+    linked_at = datetime.now(timezone.utc).isoformat()
+    # one write for the whole batch; re-linking a care context replaces it
+    await _care_contexts.put_many({f"{patient_id}:{hip_id or ''}:{care_context['id']}": {
         "patientId": patient_id,
-        "status": "CONFIRMED"
-    }
-    return {"status": "CONFIRMED", "txnId": txn_id}
-
-def notify_link(txn_id: str, status: str) -> Dict:
-    _txns[txn_id] = {
-        "patientId": _txns.get(txn_id, {}).get("patientId"),
-        "status": status
-    }
-    return {"status": status, "txnId": txn_id}
\ No newline at end of file
+        "hipId": hip_id,
+        "id": care_context["id"],
+        "referenceNumber": care_context["referenceNumber"],
+        "txnId": txn_id,
+        "linkedAt": linked_at
+    } for care_context in txn["careContexts"]})
+    linked = len(txn["careContexts"])
+    await _txns.update(txn_id, {"careContexts": [], "linked": linked})
+    await notify_bridge(hip_id, "link.confirm", {"txnId": txn_id, "patientId": patient_id, "status": "CONFIRMED",
+                                                 "careContexts": [care_context["id"] for care_context in txn["careContexts"]]})
+    return {"status": "CONFIRMED", "txnId": txn_id, "linked": linked}
+
+async def notify_link(txn_id: str, status: str) -> Dict:
+    """Apply a HIP's status notification. ``ValueError`` when the transaction
+    cannot move to ``status``: INITIATED and CONFIRMED are only reached through
+    init and confirm, and an ended transaction is never reopened."""
+    while True:
+        txn = await _txns.get(txn_id)
+        if txn is None:
+            if status in _OTP_STATUSES:
+                raise ValueError(f"Link transaction cannot be notified as {status}")
+            txn = {"patientId": None, "hipId": None, "status": status}
+            if await _txns.insert(txn_id, txn):
+                break
+            continue  # initiated meanwhile: check the transition against it
+        if txn["status"] == status:
+            break  # a repeated notification
+        if status not in _NOTIFY_TRANSITIONS.get(txn["status"], ()):
+            raise ValueError(f"Link transaction is {txn['status']}, it cannot move to {status}")
+        # conditional, so a concurrent confirm or notify is never overwritten
+        txn = await _txns.update_if(txn_id, {"status": txn["status"]}, {"status": status, "otpHash": None})
+        if txn is not None:
+            break
+    await expiry_registry.register(_txns, txn_id, settings.link_txn_ttl_seconds)
+    event = {"txnId": txn_id, "status": status}
+    await notify_bridge(txn.get("hipId"), "link.notify", event)
+    await event_bus.publish("link.notify", {
+        "txnId": txn_id,
+        "patientId": txn.get("patientId"),
+        "hipId": txn.get("hipId")
+    }, event)
+    return {"status": status, "txnId": txn_id}
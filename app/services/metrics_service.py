@@ -0,0 +1,104 @@
+import time
+
+from app.core.access_log import access_log
+from app.core.admission import admission_controller
+from app.core.config import get_settings
+from app.core.expiry import expiry_registry
+from app.core.idempotency import replay_cache
+from app.core.metrics import CallbackCounter, Gauge, registry
+from app.core.security import token_cache
+from app.services.bridge_service import directory
+from app.services.client_service import credential_cache
+from app.services.data_service import blob_store_stats
+from app.services.event_bus import event_bus
+from app.services.linking_service import patient_index_stats
+from app.services.transfer_engine import transfer_engine
+from app.services.webhook_dispatcher import webhook_dispatcher
+from app.storage import all_repositories
+
+settings = get_settings()
+
+# Repository counts are async and run a COUNT(*) per table on SQLite, so
+# render_metrics() refreshes them at most every METRICS_STORE_COUNT_SECONDS and
+# the gauge callback only reads the last snapshot.
+_store_size_snapshot = {}
+_store_counted_at = float("-inf")
+
+def _store_sizes():
+    return dict(_store_size_snapshot)
+
+def _stats(stats, keys):
+    """Scrape callback exporting ``keys`` of ``stats()`` as ``stat`` labels;
+    values that are None (no samples yet) are left out."""
+    def collect():
+        values = stats()
+        return {(key,): values[key] for key in keys if values.get(key) is not None}
+    return collect
+
+def _expiry():
+    stats = expiry_registry.stats()
+    return {("live",): stats["live"], ("reclaim_rate",): stats["reclaimRate"]}
+
+def _webhook_queues():
+    # Per-bridge depths would add a series for every bridge ever registered,
+    # so only the aggregate is exported.
+    depths = webhook_dispatcher.stats()["queueDepth"].values()
+    return {("queues",): len(depths), ("events",): sum(depths), ("max",): max(depths, default=0)}
+
+registry.register(Gauge("abdm_store_records", "Records held per storage repository.", _store_sizes, ("repository",)))
+registry.register(Gauge("abdm_token_cache", "Verified-token cache size.",
+                        _stats(token_cache.stats, ("size",)), ("stat",)))
+registry.register(CallbackCounter("abdm_token_cache_total", "Verified-token cache hits and misses.",
+                                  _stats(token_cache.stats, ("hits", "misses")), ("stat",)))
+registry.register(Gauge("abdm_client_credential_cache", "Verified client-credential cache size.",
+                        _stats(credential_cache.stats, ("size",)), ("stat",)))
+registry.register(CallbackCounter("abdm_client_credential_cache_total",
+                                  "Verified client-credential cache hits and misses.",
+                                  _stats(credential_cache.stats, ("hits", "misses")), ("stat",)))
+registry.register(Gauge("abdm_admission", "Requests running and queued for an admission slot.",
+                        _stats(admission_controller.stats, ("in_flight", "waiting")), ("stat",)))
+registry.register(Gauge("abdm_expiry", "Expiry registry live entries and reclaim rate.", _expiry, ("stat",)))
+registry.register(CallbackCounter("abdm_expiry_total", "Expired records reclaimed.",
+                                  _stats(expiry_registry.stats, ("reclaimed",)), ("stat",)))
+registry.register(Gauge("abdm_idempotency", "REQUEST-ID replay cache size.",
+                        _stats(replay_cache.stats, ("size",)), ("stat",)))
+registry.register(CallbackCounter("abdm_idempotency_total", "REQUEST-ID replays and coalesced duplicates.",
+                                  _stats(replay_cache.stats, ("replays", "coalesced")), ("stat",)))
+registry.register(Gauge("abdm_access_log", "Access-log entries queued for the writer.",
+                        _stats(access_log.stats, ("queued",)), ("stat",)))
+registry.register(CallbackCounter("abdm_access_log_total",
+                                  "Access-log entries enqueued, written, dropped, sampled out and failed.",
+                                  _stats(access_log.stats, ("enqueued", "written", "dropped", "sampled_out",
+                                                            "write_errors")), ("stat",)))
+registry.register(Gauge("abdm_blob_store", "Health payloads, segments and bytes stored.",
+                        _stats(blob_store_stats, ("payloads", "segments", "bytes")), ("stat",)))
+registry.register(CallbackCounter("abdm_blob_store_total", "Health payload writes deduplicated and segments retired.",
+                                  _stats(blob_store_stats, ("deduplicated", "retired")), ("stat",)))
+registry.register(Gauge("abdm_event_bus", "Event stream subscribers and replay history held.",
+                        _stats(event_bus.stats, ("subscribers", "history")), ("stat",)))
+registry.register(CallbackCounter("abdm_event_bus_total", "Events published, delivered and lagged.",
+                                  _stats(event_bus.stats, ("published", "delivered", "lagged")), ("stat",)))
+registry.register(Gauge("abdm_bridge_directory", "Bridge directory version and bridges and services published.",
+                        _stats(directory.stats, ("version", "bridges", "services")), ("stat",)))
+registry.register(CallbackCounter("abdm_bridge_directory_total", "Bridge directory reloads.",
+                                  _stats(directory.stats, ("reloads",)), ("stat",)))
+registry.register(Gauge("abdm_patient_index", "Patients indexed for discovery, tombstoned rows and index bytes.",
+                        _stats(patient_index_stats, ("records", "deleted", "bytes")), ("stat",)))
+registry.register(Gauge("abdm_data_transfer", "Data requests queued and in flight, HIP lanes and queue latency "
+                        "percentiles.", _stats(transfer_engine.stats, ("queued", "inFlight", "lanes",
+                                                                        "queueLatencyP50", "queueLatencyP95")),
+                        ("stat",)))
+registry.register(CallbackCounter("abdm_data_transfer_total", "Data requests processed, failed and rejected.",
+                                  _stats(transfer_engine.stats, ("processed", "failed", "rejected")), ("stat",)))
+registry.register(Gauge("abdm_webhook_queue_depth", "Webhook queues, events queued across them and the deepest queue.",
+                        _webhook_queues, ("stat",)))
+
+async def render_metrics() -> str:
+    global _store_counted_at
+    now = time.monotonic()
+    if now - _store_counted_at >= settings.metrics_store_count_seconds:
+        # stamped before counting so concurrent scrapes do not all recount
+        _store_counted_at = now
+        for name, repo in all_repositories().items():
+            _store_size_snapshot[(name,)] = await repo.count()
+    return registry.render()
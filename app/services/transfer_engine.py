@@ -0,0 +1,163 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# (hipId, careContextId)
+_LaneKey = Tuple[str, str]
+Handler = Callable[[str], Awaitable[None]]
+
+
+class TransferEngine:
+    """Schedules data-request jobs onto a bounded pool of asyncio workers.
+
+    Jobs are queued in FIFO lanes per (hipId, careContextId), so requests for
+    one care context are dispatched in order. A lane runs while it holds one
+    of the HIP's ``per_hip_concurrency`` slots and one of the ``workers``
+    global slots, so a slow HIP cannot starve the others. ``admit`` refuses
+    work once ``max_queue`` jobs are waiting, which callers turn into 503s.
+    ``deliver`` POSTs to a HIP over that HIP's keep-alive client, retrying
+    with exponential backoff; per-HIP pools stay at ``per_hip_concurrency``
+    connections, which keeps httpx's per-request pool scan short.
+    """
+
+    def __init__(self, workers: int = 32, per_hip_concurrency: int = 4, max_queue: int = 10000,
+                 max_attempts: int = 3, backoff_base: float = 0.5, timeout: float = 10.0):
+        self.workers = workers
+        self.per_hip_concurrency = per_hip_concurrency
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.queued = 0
+        self.in_flight = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self._handler: Optional[Handler] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._hip_slots: Dict[str, asyncio.Semaphore] = {}
+        self._lanes: Dict[_LaneKey, Deque[Tuple[float, str]]] = {}
+        self._lane_tasks: Dict[_LaneKey, asyncio.Task] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    async def start(self, handler: Handler) -> None:
+        self._handler = handler
+        self._slots = asyncio.Semaphore(self.workers)
+
+    async def stop(self) -> None:
+        for task in self._lane_tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._lane_tasks.values(), return_exceptions=True)
+        self._lane_tasks.clear()
+        self._lanes.clear()
+        self._hip_slots.clear()
+        self.queued = 0
+        await asyncio.gather(*(client.aclose() for client in self._clients.values()))
+        self._clients.clear()
+        self._handler = None
+
+    def admit(self, jobs: int = 1) -> bool:
+        """Whether ``jobs`` more fit in the queue; refused jobs count as rejected."""
+        if self.queued + jobs > self.max_queue:
+            self.rejected += jobs
+            return False
+        return True
+
+    def submit(self, hip_id: str, care_context_id: str, request_id: str) -> bool:
+        """Queue ``request_id``; returns False when the engine is stopped or full."""
+        if self._handler is None or not self.admit():
+            return False
+        key = (hip_id, care_context_id)
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = deque()
+            self._lane_tasks[key] = asyncio.create_task(self._run_lane(key, lane))
+        lane.append((time.monotonic(), request_id))
+        self.queued += 1
+        return True
+
+    def submit_many(self, jobs: Iterable[Tuple[str, str, str]]) -> int:
+        return sum(self.submit(*job) for job in jobs)
+
+    async def _run_lane(self, key: _LaneKey, lane: Deque[Tuple[float, str]]) -> None:
+        hip_slots = self._hip_slots.get(key[0])
+        if hip_slots is None:
+            hip_slots = self._hip_slots[key[0]] = asyncio.Semaphore(self.per_hip_concurrency)
+        try:
+            while lane:
+                async with hip_slots, self._slots:
+                    enqueued_at, request_id = lane.popleft()
+                    self.queued -= 1
+                    self._latencies.append(time.monotonic() - enqueued_at)
+                    self.in_flight += 1
+                    try:
+                        await self._handler(request_id)
+                        self.processed += 1
+                    except Exception as exc:  # one bad job must not stall the lane
+                        self.failed += 1
+                        logger.exception(f"Data transfer job {request_id} failed: {exc}")
+                    finally:
+                        self.in_flight -= 1
+        finally:
+            # the lane is drained; a later submit starts a fresh one
+            del self._lanes[key]
+            del self._lane_tasks[key]
+
+    def _client(self, hip_id: str) -> httpx.AsyncClient:
+        client = self._clients.get(hip_id)
+        if client is None:
+            limit = self.per_hip_concurrency
+            client = self._clients[hip_id] = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+            )
+        return client
+
+    async def deliver(self, hip_id: str, url: str, payload: Dict) -> Optional[str]:
+        """POST ``payload`` to ``hip_id`` at ``url``; returns None on a 2xx, else the last error."""
+        client = self._client(hip_id)
+        error = None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                delay = self.backoff_base * 2 ** (attempt - 1)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            try:
+                response = await client.post(url, json=payload)
+                if response.status_code < 300:
+                    return None
+                error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as exc:
+                error = repr(exc)
+        return error
+
+    def stats(self) -> Dict:
+        latencies = sorted(self._latencies)
+        return {
+            "queued": self.queued,
+            "inFlight": self.in_flight,
+            "lanes": len(self._lanes),
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queueLatencyP50": latencies[len(latencies) // 2] if latencies else None,
+            "queueLatencyP95": latencies[int(len(latencies) * 0.95)] if latencies else None,
+        }
+
+
+transfer_engine = TransferEngine(
+    workers=settings.data_transfer_workers,
+    per_hip_concurrency=settings.data_transfer_per_hip_concurrency,
+    max_queue=settings.data_transfer_max_queue,
+    max_attempts=settings.data_transfer_max_attempts,
+    timeout=settings.data_transfer_timeout_seconds,
+)
@@ -0,0 +1,211 @@
+import asyncio
+import random
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.metrics import webhook_events, webhook_latency
+
+settings = get_settings()
+
+# (enqueued at, monotonic) + event envelope
+_QueuedEvent = Tuple[float, Dict]
+
+
+class WebhookDispatcher:
+    """Delivers bridge callbacks off the request path.
+
+    Events are queued per bridge and drained by one worker per bridge, so a
+    bridge sees its events in order and in batches of up to ``batch_size``.
+    Deliveries share one keep-alive ``httpx.AsyncClient`` per host, at most
+    ``concurrency`` requests are in flight overall, and failed batches are
+    retried with exponential backoff before landing in the dead-letter queue.
+    A bridge's worker exits once its queue has been empty for ``idle_seconds``,
+    so bridges that stop receiving events (or are gone) hold no queue, task or
+    connection pool; the next event starts a new worker.
+    """
+
+    def __init__(self, max_queue_size: int = 1000, batch_size: int = 20, concurrency: int = 16,
+                 max_attempts: int = 5, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 timeout: float = 5.0, dead_letter_size: int = 1000, idle_seconds: float = 300.0):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self.dead_letters: Deque[Dict] = deque(maxlen=dead_letter_size)
+        self.delivered = 0
+        self.retried = 0
+        self.dropped = 0
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._urls: Dict[str, str] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def stop(self) -> None:
+        for task in self._workers.values():
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        for client in self._clients.values():
+            await client.aclose()
+        self._workers.clear()
+        self._queues.clear()
+        self._clients.clear()
+        self._loop = None
+
+    def publish(self, bridge_id: str, url: str, event_type: str, payload: Dict) -> bool:
+        """Queue an event for ``bridge_id``; safe to call from any thread and never blocks.
+
+        False when the dispatcher is stopped or, for a call made on the
+        dispatcher's loop, when the bridge's queue is full and the event was
+        dead-lettered. Calls from other threads are queued asynchronously, so
+        a full queue is not reported to them.
+        """
+        loop = self._loop
+        if loop is None:
+            self.dropped += 1
+            webhook_events.inc((bridge_id, "dropped"))
+            return False
+        event = {
+            "id": str(uuid.uuid4()),
+            "type": event_type,
+            "bridgeId": bridge_id,
+            "payload": payload,
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+        }
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return self._enqueue(bridge_id, url, event)
+        else:
+            loop.call_soon_threadsafe(self._enqueue, bridge_id, url, event)
+        return True
+
+    def _enqueue(self, bridge_id: str, url: str, event: Dict) -> bool:
+        self._urls[bridge_id] = url
+        queue = self._queues.get(bridge_id)
+        if queue is None:
+            queue = self._queues[bridge_id] = asyncio.Queue(maxsize=self.max_queue_size)
+            self._workers[bridge_id] = asyncio.create_task(self._worker(bridge_id, queue))
+        try:
+            queue.put_nowait((time.monotonic(), event))
+        except asyncio.QueueFull:
+            self._dead_letter(bridge_id, url, [event], "queue full")
+            return False
+        return True
+
+    async def _worker(self, bridge_id: str, queue: asyncio.Queue) -> None:
+        while True:
+            try:
+                batch: List[_QueuedEvent] = [await asyncio.wait_for(queue.get(), self.idle_seconds)]
+            except asyncio.TimeoutError:
+                # _enqueue runs on this loop too, so nothing can be queued
+                # between this check and the cleanup
+                if queue.empty():
+                    self._retire(bridge_id)
+                    return
+                continue
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await self._deliver(bridge_id, self._urls[bridge_id], batch)
+            except Exception as exc:  # never let one bad batch kill the worker
+                logger.exception(f"Webhook worker for bridge {bridge_id} failed: {exc}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _retire(self, bridge_id: str) -> None:
+        del self._queues[bridge_id]
+        del self._workers[bridge_id]
+        host = self._host(self._urls.pop(bridge_id))
+        # the pool is shared by every bridge on the same host
+        if host in self._clients and all(self._host(url) != host for url in self._urls.values()):
+            asyncio.create_task(self._clients.pop(host).aclose())
+
+    @staticmethod
+    def _host(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _client(self, url: str) -> httpx.AsyncClient:
+        host = self._host(url)
+        client = self._clients.get(host)
+        if client is None:
+            client = self._clients[host] = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.concurrency,
+                                    max_keepalive_connections=self.concurrency),
+            )
+        return client
+
+    async def _deliver(self, bridge_id: str, url: str, batch: List[_QueuedEvent]) -> None:
+        events = [event for _, event in batch]
+        error = None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                self.retried += 1
+                webhook_events.inc((bridge_id, "retried"), len(events))
+                delay = min(self.backoff_base * 2 ** (attempt - 1), self.backoff_max)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            try:
+                async with self._semaphore:
+                    response = await self._client(url).post(url, json={"events": events})
+                if response.status_code < 300:
+                    now = time.monotonic()
+                    for enqueued_at, _ in batch:
+                        self._latencies.append(now - enqueued_at)
+                        webhook_latency.observe(now - enqueued_at)
+                    self.delivered += len(events)
+                    webhook_events.inc((bridge_id, "delivered"), len(events))
+                    return
+                error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as exc:
+                error = repr(exc)
+        self._dead_letter(bridge_id, url, events, error)
+
+    def _dead_letter(self, bridge_id: str, url: str, events: List[Dict], error: str) -> None:
+        logger.warning(f"Dead-lettering {len(events)} webhook event(s) for bridge {bridge_id}: {error}")
+        self.dead_letters.append({"bridgeId": bridge_id, "url": url, "events": events, "error": error})
+        webhook_events.inc((bridge_id, "dead_lettered"), len(events))
+
+    def stats(self) -> Dict:
+        latencies = sorted(self._latencies)
+        return {
+            "queueDepth": {bridge_id: queue.qsize() for bridge_id, queue in self._queues.items()},
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "deadLetters": len(self.dead_letters),
+            "latencyP50": latencies[len(latencies) // 2] if latencies else None,
+            "latencyP95": latencies[int(len(latencies) * 0.95)] if latencies else None,
+        }
+
+
+webhook_dispatcher = WebhookDispatcher(
+    max_queue_size=settings.webhook_queue_size,
+    batch_size=settings.webhook_batch_size,
+    concurrency=settings.webhook_concurrency,
+    max_attempts=settings.webhook_max_attempts,
+    timeout=settings.webhook_timeout_seconds,
+    idle_seconds=settings.webhook_idle_seconds,
+)
@@ -0,0 +1,51 @@
+from typing import Dict, Iterable, Optional
+
+from app.core.config import get_settings
+from app.storage.base import Repository
+from app.storage.memory import MemoryRepository
+
+_repositories: Dict[str, Repository] = {}
+_sqlite_db = None
+_redis_client = None
+
+def _get_sqlite_db():
+    global _sqlite_db
+    if _sqlite_db is None:
+        from app.storage.sqlite import SQLiteDatabase
+        settings = get_settings()
+        _sqlite_db = SQLiteDatabase(settings.sqlite_path, pool_size=settings.sqlite_pool_size)
+    return _sqlite_db
+
+def get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        from app.storage.redis import connect
+        settings = get_settings()
+        _redis_client = connect(settings.redis_url, max_connections=settings.redis_pool_size)
+    return _redis_client
+
+def get_repository(name: str, indexes: Iterable[str] = (), backend: Optional[str] = None,
+                   order_by: Iterable[str] = ()) -> Repository:
+    """Return the repository called ``name`` on the configured storage backend."""
+    if name in _repositories:
+        return _repositories[name]
+
+    backend = backend or get_settings().storage_backend
+    if backend == "memory":
+        repo = MemoryRepository(name, indexes, order_by)
+    elif backend == "sqlite":
+        from app.storage.sqlite import SQLiteRepository
+        repo = SQLiteRepository(_get_sqlite_db(), name, indexes, order_by)
+    elif backend == "redis":
+        from app.storage.redis import RedisRepository
+        repo = RedisRepository(get_redis_client(), name, indexes, order_by, prefix=get_settings().redis_prefix)
+    else:
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    _repositories[name] = repo
+    return repo
+
+def all_repositories() -> Dict[str, Repository]:
+    return dict(_repositories)
+
+__all__ = ["Repository", "MemoryRepository", "get_repository", "all_repositories", "get_redis_client"]
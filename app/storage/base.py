@@ -0,0 +1,107 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class Repository(ABC):
+    """Keyed collection of JSON-serialisable records with an async interface.
+
+    ``indexes`` names the record fields that ``find`` may be queried on;
+    backends keep those lookups O(1)/indexed. ``order_by`` names fields that
+    ``page`` can sort an index by, for cursor pagination without scanning. Records returned by a
+    repository must be treated as read-only - write changes back through
+    ``put``/``update`` so every backend sees them.
+
+    Backends shared between processes set ``native_expiry`` and keep record
+    deadlines themselves (``expire``/``persist``/``reap_expired``), so a
+    deadline set by one worker can be cancelled or reaped by another. The
+    defaults here keep deadlines in a dict on the instance, which only this
+    process sees.
+    """
+
+    native_expiry = False
+
+    def __init__(self, name: str, indexes: Iterable[str] = (), order_by: Iterable[str] = ()):
+        self.name = name
+        self.indexes = tuple(indexes)
+        self.order_by = tuple(order_by)
+        self._deadlines: Dict[str, float] = {}
+
+    def _check_indexed(self, field: str) -> None:
+        if field not in self.indexes:
+            raise ValueError(f"Field '{field}' is not indexed in repository '{self.name}'")
+
+    def _check_ordered(self, field: str, order_by: str) -> None:
+        self._check_indexed(field)
+        if order_by not in self.order_by:
+            raise ValueError(f"Field '{order_by}' is not sortable in repository '{self.name}'")
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Dict]: ...
+
+    @abstractmethod
+    async def put(self, key: str, value: Dict) -> None: ...
+
+    @abstractmethod
+    async def insert(self, key: str, value: Dict) -> bool:
+        """``put`` only if ``key`` does not exist yet, atomically; False when it does."""
+
+    @abstractmethod
+    async def update(self, key: str, fields: Dict) -> Optional[Dict]: ...
+
+    @abstractmethod
+    async def update_if(self, key: str, expected: Dict, fields: Dict) -> Optional[Dict]:
+        """``update`` only while every ``expected`` field still has its value,
+        atomically; None when the record is missing or has changed."""
+
+    @abstractmethod
+    async def increment(self, key: str, field: str, amount: int = 1) -> Optional[int]:
+        """Add ``amount`` to a numeric field atomically and return the new
+        value; None when the record does not exist."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> Optional[Dict]: ...
+
+    @abstractmethod
+    async def find(self, field: str, value: str) -> List[Dict]: ...
+
+    @abstractmethod
+    async def page(self, field: str, value: str, order_by: str, after: Optional[Tuple[str, str]] = None,
+                   limit: int = 50, descending: bool = False) -> List[Tuple[str, Dict]]:
+        """``(key, record)`` pairs with ``field == value`` and a non-null
+        ``order_by``, sorted by ``(record[order_by], key)`` and starting
+        strictly after ``after``, the ``(order value, key)`` of the last
+        record on the previous page."""
+
+    @abstractmethod
+    async def count(self) -> int: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+    async def get_many(self, keys: Iterable[str]) -> List[Optional[Dict]]:
+        return [await self.get(key) for key in keys]
+
+    async def put_many(self, items: Dict[str, Dict]) -> None:
+        for key, value in items.items():
+            await self.put(key, value)
+
+    async def expire(self, key: str, ttl_seconds: float) -> None:
+        self._deadlines[key] = time.time() + ttl_seconds
+
+    async def expire_many(self, keys: Iterable[str], ttl_seconds: float) -> None:
+        for key in keys:
+            await self.expire(key, ttl_seconds)
+
+    async def persist(self, key: str) -> None:
+        self._deadlines.pop(key, None)
+
+    async def reap_expired(self, now: float, limit: int) -> int:
+        """Delete at most ``limit`` records whose deadline is ``<= now``."""
+        due = sorted((deadline, key) for key, deadline in self._deadlines.items() if deadline <= now)[:limit]
+        reaped = 0
+        for _, key in due:
+            del self._deadlines[key]
+            if await self.delete(key) is not None:
+                reaped += 1
+        return reaped
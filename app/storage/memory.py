@@ -0,0 +1,165 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.storage.base import Repository
+
+
+class MemoryRepository(Repository):
+    """Process-local dict storage with secondary indexes (field -> value -> keys).
+
+    Every operation completes without awaiting, so callers never yield to the
+    event loop mid-update. Sorted indexes keep ``(order value, key)`` lists per
+    indexed value; removals only count the entry as stale (it is skipped on
+    read) and a list is compacted once half of it is stale, so moving a record
+    between values stays O(log n) amortised.
+    """
+
+    def __init__(self, name: str, indexes: Iterable[str] = (), order_by: Iterable[str] = ()):
+        super().__init__(name, indexes, order_by)
+        self._records: Dict[str, Dict] = {}
+        # Inner dicts are used as insertion-ordered sets of keys
+        self._indexes: Dict[str, Dict[str, Dict[str, None]]] = {field: {} for field in self.indexes}
+        # (field, order_by) -> value -> [sorted (order value, key) entries, stale count]
+        self._sorted: Dict[Tuple[str, str], Dict[str, list]] = {
+            (field, order): {} for field in self.indexes for order in self.order_by
+        }
+        self._tracked = frozenset(self.indexes) | frozenset(self.order_by)
+
+    def _index_add(self, key: str, record: Dict) -> None:
+        for field in self.indexes:
+            value = record.get(field)
+            if value is not None:
+                self._indexes[field].setdefault(value, {})[key] = None
+                for order in self.order_by:
+                    position = record.get(order)
+                    if position is not None:
+                        self._sorted_add(self._sorted[(field, order)].setdefault(value, [[], 0]), (position, key))
+
+    @staticmethod
+    def _sorted_add(bucket: list, entry: Tuple) -> None:
+        entries = bucket[0]
+        if not entries or entries[-1] < entry:
+            # order values are mostly timestamps, so inserts usually append
+            entries.append(entry)
+            return
+        i = bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            # the stale copy left by a previous removal becomes live again
+            bucket[1] -= 1
+        else:
+            insort(entries, entry)
+
+    def _index_remove(self, key: str, record: Dict) -> None:
+        for field in self.indexes:
+            value = record.get(field)
+            keys = self._indexes[field].get(value)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self._indexes[field][value]
+                for order in self.order_by:
+                    if record.get(order) is not None:
+                        self._sorted_stale(field, order, value, key)
+
+    def _sorted_stale(self, field: str, order: str, value: str, key: str) -> None:
+        buckets = self._sorted[(field, order)]
+        bucket = buckets.get(value)
+        if bucket is None:
+            return
+        bucket[1] += 1
+        if bucket[1] * 2 >= len(bucket[0]):
+            # ``key`` is mid-update and still holds its old record, so its entry is dropped explicitly
+            live = [entry for entry in bucket[0]
+                    if entry[1] != key and self._live(field, value, order, entry)]
+            if live:
+                buckets[value] = [live, 0]
+            else:
+                del buckets[value]
+
+    def _live(self, field: str, value: str, order: str, entry: Tuple) -> bool:
+        record = self._records.get(entry[1])
+        return record is not None and record.get(field) == value and record.get(order) == entry[0]
+
+    async def get(self, key: str) -> Optional[Dict]:
+        return self._records.get(key)
+
+    async def put(self, key: str, value: Dict) -> None:
+        old = self._records.get(key)
+        if old is not None:
+            self._index_remove(key, old)
+        self._records[key] = value
+        self._index_add(key, value)
+
+    async def insert(self, key: str, value: Dict) -> bool:
+        if key in self._records:
+            return False
+        self._records[key] = value
+        self._index_add(key, value)
+        return True
+
+    async def update(self, key: str, fields: Dict) -> Optional[Dict]:
+        record = self._records.get(key)
+        if record is None:
+            return None
+        if any(field in self._tracked for field in fields):
+            self._index_remove(key, record)
+            record.update(fields)
+            self._index_add(key, record)
+        else:
+            record.update(fields)
+        return record
+
+    async def update_if(self, key: str, expected: Dict, fields: Dict) -> Optional[Dict]:
+        record = self._records.get(key)
+        if record is None or any(record.get(field) != value for field, value in expected.items()):
+            return None
+        return await self.update(key, fields)
+
+    async def increment(self, key: str, field: str, amount: int = 1) -> Optional[int]:
+        record = self._records.get(key)
+        if record is None:
+            return None
+        value = record.get(field, 0) + amount
+        await self.update(key, {field: value})
+        return value
+
+    async def delete(self, key: str) -> Optional[Dict]:
+        record = self._records.pop(key, None)
+        if record is not None:
+            self._index_remove(key, record)
+        return record
+
+    async def find(self, field: str, value: str) -> List[Dict]:
+        self._check_indexed(field)
+        return [self._records[key] for key in self._indexes[field].get(value, ())]
+
+    async def page(self, field: str, value: str, order_by: str, after: Optional[Tuple[str, str]] = None,
+                   limit: int = 50, descending: bool = False) -> List[Tuple[str, Dict]]:
+        self._check_ordered(field, order_by)
+        bucket = self._sorted[(field, order_by)].get(value)
+        if bucket is None:
+            return []
+        entries = bucket[0]
+        if descending:
+            i = (bisect_left(entries, tuple(after)) if after else len(entries)) - 1
+            step = -1
+        else:
+            i = bisect_right(entries, tuple(after)) if after else 0
+            step = 1
+        results = []
+        while 0 <= i < len(entries) and len(results) < limit:
+            entry = entries[i]
+            if self._live(field, value, order_by, entry):
+                results.append((entry[1], self._records[entry[1]]))
+            i += step
+        return results
+
+    async def count(self) -> int:
+        return len(self._records)
+
+    async def clear(self) -> None:
+        self._records.clear()
+        for index in self._indexes.values():
+            index.clear()
+        for index in self._sorted.values():
+            index.clear()
@@ -0,0 +1,284 @@
+import json
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from redis.exceptions import WatchError
+
+from app.storage.base import Repository
+
+
+def connect(url: str, max_connections: int = 32):
+    """Async client for ``url``; ``fakeredis://`` gives an in-process stand-in."""
+    if url.startswith("fakeredis://"):
+        import fakeredis
+        return fakeredis.FakeAsyncRedis(decode_responses=True)
+    from redis.asyncio import BlockingConnectionPool, Redis
+    # Blocking pool: requests beyond max_connections wait for a free
+    # connection instead of failing with "Too many connections".
+    pool = BlockingConnectionPool.from_url(url, max_connections=max_connections, decode_responses=True)
+    return Redis(connection_pool=pool)
+
+
+class RedisRepository(Repository):
+    """Records shared between worker processes through a Redis-protocol server.
+
+    Each record is a hash (one JSON-encoded hash field per record field), so
+    ``update`` writes only the changed fields. Indexed fields are sorted sets
+    of keys scored by insertion time, and writes that touch them run in a
+    WATCH/MULTI transaction. Multi-key operations are pipelined into one
+    round trip. Sorted indexes for ``page`` are sorted sets of
+    ``"<order value>\\0<key>"`` members read with ZRANGEBYLEX, so order values
+    compare as strings (ISO timestamps sort correctly). Expiry deadlines
+    live in a sorted set so any worker can reap them and a grant on one
+    worker cancels a deadline set on another; each is mirrored in a
+    per-record key that the reaper watches instead of the shared set.
+    """
+
+    native_expiry = True
+
+    def __init__(self, client, name: str, indexes: Iterable[str] = (), order_by: Iterable[str] = (),
+                 prefix: str = "abdm"):
+        super().__init__(name, indexes, order_by)
+        self._tracked = tuple(dict.fromkeys((*self.indexes, *self.order_by)))
+        self._client = client
+        self._prefix = f"{prefix}:{name}"
+        self._keys = f"{self._prefix}:keys"
+        self._ttl = f"{self._prefix}:ttl"
+
+    def _record_key(self, key: str) -> str:
+        return f"{self._prefix}:r:{key}"
+
+    def _deadline_key(self, key: str) -> str:
+        return f"{self._prefix}:d:{key}"
+
+    def _index_key(self, field: str, value) -> str:
+        return f"{self._prefix}:ix:{field}:{value}"
+
+    @staticmethod
+    def _decode(raw: Dict[str, str]) -> Optional[Dict]:
+        return {field: json.loads(value) for field, value in raw.items()} if raw else None
+
+    @staticmethod
+    def _encode(record: Dict) -> Dict[str, str]:
+        return {field: json.dumps(value) for field, value in record.items()}
+
+    def _sorted_key(self, field: str, order: str, value) -> str:
+        return f"{self._prefix}:ox:{field}:{order}:{value}"
+
+    def _stage_index(self, pipe, key: str, old: Optional[Dict], new: Optional[Dict]) -> None:
+        now = time.time()
+        old, new = old or {}, new or {}
+        for field in self.indexes:
+            old_value, new_value = old.get(field), new.get(field)
+            if old_value != new_value:
+                if old_value is not None:
+                    pipe.zrem(self._index_key(field, old_value), key)
+                if new_value is not None:
+                    pipe.zadd(self._index_key(field, new_value), {key: now})
+            for order in self.order_by:
+                old_position, new_position = old.get(order), new.get(order)
+                if old_value == new_value and old_position == new_position:
+                    continue
+                if old_value is not None and old_position is not None:
+                    pipe.zrem(self._sorted_key(field, order, old_value), f"{old_position}\x00{key}")
+                if new_value is not None and new_position is not None:
+                    pipe.zadd(self._sorted_key(field, order, new_value), {f"{new_position}\x00{key}": 0})
+
+    def _stage_put(self, pipe, key: str, old: Optional[Dict], value: Dict) -> None:
+        record_key = self._record_key(key)
+        pipe.delete(record_key)
+        if value:
+            pipe.hset(record_key, mapping=self._encode(value))
+        pipe.sadd(self._keys, key)
+        self._stage_index(pipe, key, old, value)
+
+    def _stage_delete(self, pipe, key: str, old: Dict) -> None:
+        pipe.delete(self._record_key(key))
+        pipe.srem(self._keys, key)
+        pipe.zrem(self._ttl, key)
+        pipe.delete(self._deadline_key(key))
+        self._stage_index(pipe, key, old, None)
+
+    async def _transact(self, key: str, stage: Callable):
+        """Read ``key`` under WATCH, queue ``stage(pipe, current)`` and EXEC,
+        retrying if another worker changed the record in between."""
+        record_key = self._record_key(key)
+        async with self._client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(record_key)
+                    current = self._decode(await pipe.hgetall(record_key))
+                    pipe.multi()
+                    result = stage(pipe, current)
+                    await pipe.execute()
+                    return result
+                except WatchError:
+                    continue
+
+    async def get(self, key: str) -> Optional[Dict]:
+        return self._decode(await self._client.hgetall(self._record_key(key)))
+
+    async def get_many(self, keys: Iterable[str]) -> List[Optional[Dict]]:
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hgetall(self._record_key(key))
+            return [self._decode(raw) for raw in await pipe.execute()]
+
+    async def put(self, key: str, value: Dict) -> None:
+        if not self.indexes:
+            async with self._client.pipeline(transaction=True) as pipe:
+                self._stage_put(pipe, key, None, value)
+                await pipe.execute()
+            return
+        await self._transact(key, lambda pipe, current: self._stage_put(pipe, key, current, value))
+
+    async def put_many(self, items: Dict[str, Dict]) -> None:
+        if not items:
+            return
+        record_keys = [self._record_key(key) for key in items]
+        async with self._client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    old = [None] * len(items)
+                    if self.indexes:
+                        await pipe.watch(*record_keys)
+                        async with self._client.pipeline(transaction=False) as reads:
+                            for record_key in record_keys:
+                                reads.hmget(record_key, self._tracked)
+                            old = [
+                                {field: json.loads(value) for field, value in zip(self._tracked, values)
+                                 if value is not None}
+                                for values in await reads.execute()
+                            ]
+                    pipe.multi()
+                    for (key, value), current in zip(items.items(), old):
+                        self._stage_put(pipe, key, current, value)
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue
+
+    async def insert(self, key: str, value: Dict) -> bool:
+        def stage(pipe, current):
+            if current is not None:
+                return False
+            self._stage_put(pipe, key, None, value)
+            return True
+        return await self._transact(key, stage)
+
+    def _stage_update(self, pipe, key: str, current: Dict, fields: Dict) -> Dict:
+        record = {**current, **fields}
+        if fields:
+            pipe.hset(self._record_key(key), mapping=self._encode(fields))
+        self._stage_index(pipe, key, current, record)
+        return record
+
+    async def update(self, key: str, fields: Dict) -> Optional[Dict]:
+        def stage(pipe, current):
+            return self._stage_update(pipe, key, current, fields) if current is not None else None
+        return await self._transact(key, stage)
+
+    async def update_if(self, key: str, expected: Dict, fields: Dict) -> Optional[Dict]:
+        def stage(pipe, current):
+            if current is None or any(current.get(field) != value for field, value in expected.items()):
+                return None
+            return self._stage_update(pipe, key, current, fields)
+        return await self._transact(key, stage)
+
+    async def increment(self, key: str, field: str, amount: int = 1) -> Optional[int]:
+        # under WATCH, so concurrent increments from other workers retry rather than collide
+        def stage(pipe, current):
+            if current is None:
+                return None
+            return self._stage_update(pipe, key, current, {field: current.get(field, 0) + amount})[field]
+        return await self._transact(key, stage)
+
+    async def delete(self, key: str) -> Optional[Dict]:
+        def stage(pipe, current):
+            if current is not None:
+                self._stage_delete(pipe, key, current)
+            return current
+        return await self._transact(key, stage)
+
+    async def find(self, field: str, value: str) -> List[Dict]:
+        self._check_indexed(field)
+        keys = await self._client.zrange(self._index_key(field, value), 0, -1)
+        return [record for record in await self.get_many(keys) if record is not None]
+
+    async def page(self, field: str, value: str, order_by: str, after: Optional[Tuple[str, str]] = None,
+                   limit: int = 50, descending: bool = False) -> List[Tuple[str, Dict]]:
+        self._check_ordered(field, order_by)
+        sorted_key = self._sorted_key(field, order_by, value)
+        bound = f"({after[0]}\x00{after[1]}" if after else None
+        if descending:
+            members = await self._client.zrevrangebylex(sorted_key, bound or "+", "-", start=0, num=limit)
+        else:
+            members = await self._client.zrangebylex(sorted_key, bound or "-", "+", start=0, num=limit)
+        keys = [member.rpartition("\x00")[2] for member in members]
+        return [(key, record) for key, record in zip(keys, await self.get_many(keys)) if record is not None]
+
+    async def count(self) -> int:
+        return await self._client.scard(self._keys)
+
+    async def clear(self) -> None:
+        batch = []
+        async for name in self._client.scan_iter(match=f"{self._prefix}:*", count=500):
+            batch.append(name)
+            if len(batch) >= 500:
+                await self._client.delete(*batch)
+                batch = []
+        if batch:
+            await self._client.delete(*batch)
+
+    async def expire(self, key: str, ttl_seconds: float) -> None:
+        await self.expire_many((key,), ttl_seconds)
+
+    async def expire_many(self, keys: Iterable[str], ttl_seconds: float) -> None:
+        expires_at = time.time() + ttl_seconds
+        mapping = {key: expires_at for key in keys}
+        if mapping:
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.zadd(self._ttl, mapping)
+                pipe.mset({self._deadline_key(key): expires_at for key in mapping})
+                await pipe.execute()
+
+    async def persist(self, key: str) -> None:
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._ttl, key)
+            pipe.delete(self._deadline_key(key))
+            await pipe.execute()
+
+    async def reap_expired(self, now: float, limit: int) -> int:
+        keys = await self._client.zrangebyscore(self._ttl, "-inf", now, start=0, num=limit)
+        reaped = 0
+        for key in keys:
+            reaped += await self._reap_one(key, now)
+        return reaped
+
+    async def _reap_one(self, key: str, now: float) -> int:
+        # The deadline is re-read under WATCH so a record that another worker
+        # re-registered or persisted after the range query survives. Only this
+        # record's keys are watched: watching the shared deadline set would
+        # abort the reap whenever any other record's deadline moved.
+        record_key, deadline_key = self._record_key(key), self._deadline_key(key)
+        async with self._client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(record_key, deadline_key)
+                    deadline = await pipe.get(deadline_key)
+                    if deadline is None:
+                        # deadline set before per-record keys existed
+                        deadline = await pipe.zscore(self._ttl, key)
+                    if deadline is None or float(deadline) > now:
+                        return 0
+                    current = self._decode(await pipe.hgetall(record_key))
+                    pipe.multi()
+                    if current is None:
+                        pipe.zrem(self._ttl, key)
+                        pipe.delete(deadline_key)
+                    else:
+                        self._stage_delete(pipe, key, current)
+                    await pipe.execute()
+                    return 1 if current is not None else 0
+                except WatchError:
+                    continue
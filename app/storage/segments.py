@@ -0,0 +1,271 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+# Record header: magic, sha256 digest of the payload, payload length
+_HEADER = struct.Struct("<4s32sQ")
+_MAGIC = b"ABSG"
+_SUFFIX = ".seg"
+_COPY_CHUNK = 1 << 20
+
+
+class SegmentWriter:
+    """Spools bytes to a temporary file while hashing them; ``commit`` appends
+    them to the active segment (or drops them if the content is already stored)."""
+
+    def __init__(self, store: "SegmentStore"):
+        self._store = store
+        self._hash = hashlib.sha256()
+        self.size = 0
+        fd, self._tmp_path = tempfile.mkstemp(dir=store.tmp_dir)
+        self._file = os.fdopen(fd, "w+b")
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)
+        self._hash.update(data)
+        self.size += len(data)
+
+    def commit(self) -> str:
+        try:
+            self._file.seek(0)
+            return self._store._append(self._hash.digest(), self.size,
+                                       iter(lambda: self._file.read(_COPY_CHUNK), b""))
+        finally:
+            self.discard()
+
+    def discard(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+
+
+class SegmentStore:
+    """Content-addressed payloads in append-only segment files under ``root``.
+
+    Each record is a fixed header (magic, sha256, length) followed by the raw
+    bytes, so a payload costs its own size plus 44 bytes and identical
+    payloads are stored once. An in-memory offset index maps digests to
+    ``(segment, offset, length)``; it is rebuilt on start by walking record
+    headers, and reads are zero-copy slices of a read-only mmap.
+
+    Every process appends only to its own segments and rotates them at
+    ``segment_max_bytes``, so several workers can share ``root``. A lookup
+    that misses re-scans whatever other writers have appended since. A torn
+    record at the end of a segment (a crash mid-write) is never indexed.
+
+    Payloads are shared by every record that stores the same bytes, so they
+    are not freed one by one; with ``reference_ttl`` (how long a record that
+    refers to a payload lives) whole segments are retired instead. A write
+    only deduplicates against a segment written to within ``reference_ttl /
+    2``, and a writer rotates its segment after that long idle, so every
+    reference into a segment idle for ``2 * reference_ttl`` has expired and
+    ``retire`` deletes it. Files are named by writer and mtime is shared, so
+    any worker may retire any segment.
+    """
+
+    def __init__(self, root: str, segment_max_bytes: int = 64 << 20, reference_ttl: float = 0):
+        self.root = root
+        self.segment_max_bytes = segment_max_bytes
+        self.reference_ttl = reference_ttl
+        self.segment_dir = os.path.join(root, "segments")
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.segment_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self.deduplicated = 0
+        self.retired = 0
+        self.stored_bytes = 0
+        self._writer_id = uuid.uuid4().hex[:12]
+        self._seq = 0
+        self._active = None
+        self._active_name: Optional[str] = None
+        self._active_size = 0
+        self._active_written = 0.0
+        self._index: Dict[bytes, Tuple[str, int, int]] = {}
+        self._scanned: Dict[str, int] = {}
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._lock = threading.Lock()
+        with self._lock:
+            self._refresh()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.segment_dir, name)
+
+    def _refresh(self) -> None:
+        """Index records appended since the last scan, in any segment."""
+        for name in sorted(os.listdir(self.segment_dir)):
+            if not name.endswith(_SUFFIX) or name == self._active_name:
+                continue
+            offset = self._scanned.get(name, 0)
+            try:
+                size = os.path.getsize(self._path(name))
+                if size - offset < _HEADER.size:
+                    continue
+                with open(self._path(name), "rb") as f:
+                    view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except FileNotFoundError:
+                continue  # retired by another worker since the listing
+            try:
+                while offset + _HEADER.size <= size:
+                    magic, digest, length = _HEADER.unpack_from(view, offset)
+                    if magic != _MAGIC:
+                        logger.warning(f"Corrupt record in segment {name} at offset {offset}; ignoring the rest")
+                        offset = size
+                        break
+                    end = offset + _HEADER.size + length
+                    if end > size:
+                        break  # still being written, or torn by a crash
+                    if digest not in self._index:
+                        self._index[digest] = (name, offset + _HEADER.size, length)
+                        self.stored_bytes += length
+                    offset = end
+            finally:
+                view.close()
+            self._scanned[name] = offset
+
+    def _rotate(self) -> None:
+        if self._active is not None:
+            self._active.close()
+            self._scanned[self._active_name] = self._active_size
+        self._seq += 1
+        self._active_name = f"{self._writer_id}-{self._seq:06d}{_SUFFIX}"
+        self._active = open(self._path(self._active_name), "ab")
+        self._active_size = 0
+
+    def _reusable(self, name: str, now: float) -> bool:
+        """Whether new references may point into segment ``name``."""
+        if not self.reference_ttl:
+            return True
+        if name == self._active_name:
+            return now - self._active_written < self.reference_ttl / 2
+        try:
+            return now - os.path.getmtime(self._path(name)) < self.reference_ttl / 2
+        except FileNotFoundError:
+            return False
+
+    def _append(self, digest: bytes, length: int, chunks: Iterable[bytes]) -> str:
+        now = time.time()
+        with self._lock:
+            location = self._index.get(digest)
+            if location is not None and self._reusable(location[0], now):
+                self.deduplicated += 1
+                return digest.hex()
+            if location is not None:
+                # only in a segment due for retirement: store a fresh copy
+                self.stored_bytes -= location[2]
+            if self._active is None or (self._active_size and
+                                        self._active_size + _HEADER.size + length > self.segment_max_bytes) or (
+                    self.reference_ttl and now - self._active_written >= self.reference_ttl / 2):
+                self._rotate()
+            offset = self._active_size
+            self._active.write(_HEADER.pack(_MAGIC, digest, length))
+            for chunk in chunks:
+                self._active.write(chunk)
+            # flushed as a whole so other workers never index a partial record
+            self._active.flush()
+            self._active_size = offset + _HEADER.size + length
+            self._active_written = now
+            self._index[digest] = (self._active_name, offset + _HEADER.size, length)
+            self.stored_bytes += length
+        return digest.hex()
+
+    def writer(self) -> SegmentWriter:
+        return SegmentWriter(self)
+
+    def put(self, data: bytes) -> str:
+        return self._append(hashlib.sha256(data).digest(), len(data), (data,))
+
+    def open(self, ref: str) -> Optional[memoryview]:
+        """Read-only view of a payload; pages are loaded lazily as they are read."""
+        try:
+            digest = bytes.fromhex(ref)
+        except ValueError:
+            return None
+        with self._lock:
+            location = self._index.get(digest)
+            if location is None:
+                self._refresh()
+                location = self._index.get(digest)
+                if location is None:
+                    return None
+            name, offset, length = location
+            if length == 0:
+                return memoryview(b"")
+            view = self._maps.get(name)
+            if view is None or len(view) < offset + length:
+                # segments only grow; views handed out earlier keep the old map alive
+                try:
+                    with open(self._path(name), "rb") as f:
+                        view = self._maps[name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except FileNotFoundError:
+                    return None  # retired by another worker
+        return memoryview(view)[offset:offset + length]
+
+    def retire(self) -> int:
+        """Delete segments no live reference can point into; returns how many.
+        A no-op without ``reference_ttl``."""
+        if not self.reference_ttl:
+            return 0
+        now = time.time()
+        with self._lock:
+            if self._active is not None and now - self._active_written >= self.reference_ttl / 2:
+                # idle: seal it, so it ages like any other segment
+                self._active.close()
+                self._scanned[self._active_name] = self._active_size
+                self._active = None
+                self._active_name = None
+            retired: List[str] = []
+            for name in list(self._scanned):
+                if name == self._active_name:
+                    continue
+                try:
+                    if now - os.path.getmtime(self._path(name)) < 2 * self.reference_ttl:
+                        continue
+                    os.unlink(self._path(name))
+                except FileNotFoundError:
+                    pass  # already retired by another worker
+                retired.append(name)
+            if not retired:
+                return 0
+            gone = set(retired)
+            for digest, (name, _, length) in list(self._index.items()):
+                if name in gone:
+                    del self._index[digest]
+                    self.stored_bytes -= length
+            for name in retired:
+                del self._scanned[name]
+                # views handed out earlier keep their map (and the unlinked file) alive
+                self._maps.pop(name, None)
+            self.retired += len(retired)
+        logger.info(f"Retired {len(retired)} blob segment(s) past {2 * self.reference_ttl:.0f}s idle")
+        return len(retired)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            segments = set(self._scanned)
+            if self._active_name:
+                segments.add(self._active_name)
+            return {
+                "payloads": len(self._index),
+                "segments": len(segments),
+                "bytes": self.stored_bytes,
+                "deduplicated": self.deduplicated,
+                "retired": self.retired,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._active is not None:
+                self._active.close()
+                self._scanned[self._active_name] = self._active_size
+                self._active = None
+                self._active_name = None
+            self._maps.clear()
+
@@ -0,0 +1,277 @@
+import asyncio
+import json
+import queue
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.storage.base import Repository
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class SQLiteDatabase:
+    """Small pool of WAL-mode connections shared by every repository on one file.
+
+    WAL lets readers in several uvicorn workers proceed alongside a single
+    writer; ``busy_timeout`` makes concurrent writers wait instead of failing.
+    Queries run on a dedicated executor with one thread per pooled connection,
+    so blocking sqlite3 calls never run on the event loop.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4, busy_timeout_ms: int = 5000):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="sqlite")
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None,
+                                   cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+            self._pool.put(conn)
+
+    async def run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+
+class SQLiteRepository(Repository):
+    """One table per repository; records are stored as JSON and indexed fields
+    get expression indexes on ``json_extract`` so ``find`` never scans.
+    Deadlines are kept in a ``<name>_ttl`` table so every worker on the file
+    sees the same expiry state."""
+
+    native_expiry = True
+
+    def __init__(self, db: SQLiteDatabase, name: str, indexes: Iterable[str] = (), order_by: Iterable[str] = ()):
+        super().__init__(name, indexes, order_by)
+        for identifier in (name, *self.indexes, *self.order_by):
+            if not _IDENTIFIER.match(identifier):
+                raise ValueError(f"Invalid SQLite identifier: {identifier!r}")
+        self._db = db
+        # SQL text is fixed per repository so sqlite3's statement cache reuses
+        # the prepared statements on every pooled connection.
+        self._sql_get = f"SELECT value FROM {name} WHERE key = ?"
+        self._sql_put = f"INSERT OR REPLACE INTO {name} (key, value) VALUES (?, ?)"
+        self._sql_insert = f"INSERT OR IGNORE INTO {name} (key, value) VALUES (?, ?)"
+        self._sql_delete = f"DELETE FROM {name} WHERE key = ?"
+        self._sql_count = f"SELECT COUNT(*) FROM {name}"
+        self._sql_clear = f"DELETE FROM {name}"
+        self._sql_expire = f"INSERT OR REPLACE INTO {name}_ttl (key, expires_at) VALUES (?, ?)"
+        self._sql_persist = f"DELETE FROM {name}_ttl WHERE key = ?"
+        self._sql_expired = f"SELECT key FROM {name}_ttl WHERE expires_at <= ? ORDER BY expires_at LIMIT ?"
+        self._sql_find = {
+            field: f"SELECT value FROM {name} WHERE json_extract(value, '$.{field}') = ? ORDER BY rowid"
+            for field in self.indexes
+        }
+        self._sql_page = {}
+        for field in self.indexes:
+            for order in self.order_by:
+                column, where = f"json_extract(value, '$.{order}')", f"json_extract(value, '$.{field}') = ?"
+                for descending, op, direction in ((False, ">", "ASC"), (True, "<", "DESC")):
+                    for cursor in (False, True):
+                        self._sql_page[(field, order, descending, cursor)] = (
+                            f"SELECT key, value FROM {name} WHERE {where} AND {column} IS NOT NULL"
+                            # the plain bound lets the index seek; the row value breaks ties by key
+                            + (f" AND {column} {op}= ? AND ({column}, key) {op} (?, ?)" if cursor else "")
+                            + f" ORDER BY {column} {direction}, key {direction} LIMIT ?"
+                        )
+        with db.connection() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            for field in self.indexes:
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS ix_{name}_{field} "
+                    f"ON {name} (json_extract(value, '$.{field}'))"
+                )
+            for field in self.indexes:
+                for order in self.order_by:
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS ix_{name}_{field}_by_{order} ON {name} "
+                        f"(json_extract(value, '$.{field}'), json_extract(value, '$.{order}'), key)"
+                    )
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {name}_ttl (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{name}_ttl_expires_at ON {name}_ttl (expires_at)")
+
+    def _get(self, key: str) -> Optional[Dict]:
+        with self._db.connection() as conn:
+            row = conn.execute(self._sql_get, (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _put(self, key: str, value: Dict) -> None:
+        with self._db.connection() as conn:
+            conn.execute(self._sql_put, (key, json.dumps(value)))
+
+    def _insert(self, key: str, value: Dict) -> bool:
+        with self._db.connection() as conn:
+            return conn.execute(self._sql_insert, (key, json.dumps(value))).rowcount == 1
+
+    def _get_many(self, keys: Iterable[str]) -> List[Optional[Dict]]:
+        keys = list(keys)
+        found: Dict[str, Dict] = {}
+        with self._db.connection() as conn:
+            # stay well below SQLITE_MAX_VARIABLE_NUMBER
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, value FROM {self.name} WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update((key, json.loads(value)) for key, value in rows)
+        return [found.get(key) for key in keys]
+
+    def _put_many(self, items: Dict[str, Dict]) -> None:
+        with self._db.transaction() as conn:
+            conn.executemany(self._sql_put, [(key, json.dumps(value)) for key, value in items.items()])
+
+    def _update(self, key: str, fields: Dict, expected: Optional[Dict] = None) -> Optional[Dict]:
+        # BEGIN IMMEDIATE: the read and the write see no other worker's write in between
+        with self._db.transaction() as conn:
+            row = conn.execute(self._sql_get, (key,)).fetchone()
+            if row is None:
+                return None
+            record = json.loads(row[0])
+            if expected and any(record.get(field) != value for field, value in expected.items()):
+                return None
+            record.update(fields)
+            conn.execute(self._sql_put, (key, json.dumps(record)))
+        return record
+
+    def _increment(self, key: str, field: str, amount: int) -> Optional[int]:
+        with self._db.transaction() as conn:
+            row = conn.execute(self._sql_get, (key,)).fetchone()
+            if row is None:
+                return None
+            record = json.loads(row[0])
+            record[field] = record.get(field, 0) + amount
+            conn.execute(self._sql_put, (key, json.dumps(record)))
+        return record[field]
+
+    def _delete(self, key: str) -> Optional[Dict]:
+        with self._db.transaction() as conn:
+            row = conn.execute(self._sql_get, (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(self._sql_delete, (key,))
+            conn.execute(self._sql_persist, (key,))
+        return json.loads(row[0])
+
+    def _find(self, field: str, value: str) -> List[Dict]:
+        with self._db.connection() as conn:
+            rows = conn.execute(self._sql_find[field], (value,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def _page(self, field: str, value: str, order_by: str, after: Optional[Tuple[str, str]],
+              limit: int, descending: bool) -> List[Tuple[str, Dict]]:
+        sql = self._sql_page[(field, order_by, descending, after is not None)]
+        params = (value, after[0], *after, limit) if after is not None else (value, limit)
+        with self._db.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [(key, json.loads(record)) for key, record in rows]
+
+    def _count(self) -> int:
+        with self._db.connection() as conn:
+            return conn.execute(self._sql_count).fetchone()[0]
+
+    def _clear(self) -> None:
+        with self._db.transaction() as conn:
+            conn.execute(self._sql_clear)
+            conn.execute(f"DELETE FROM {self.name}_ttl")
+
+    def _expire(self, key: str, expires_at: float) -> None:
+        with self._db.connection() as conn:
+            conn.execute(self._sql_expire, (key, expires_at))
+
+    def _expire_many(self, keys: List[str], expires_at: float) -> None:
+        with self._db.transaction() as conn:
+            conn.executemany(self._sql_expire, [(key, expires_at) for key in keys])
+
+    def _persist(self, key: str) -> None:
+        with self._db.connection() as conn:
+            conn.execute(self._sql_persist, (key,))
+
+    def _reap_expired(self, now: float, limit: int) -> int:
+        # BEGIN IMMEDIATE: workers reaping the same file never double-delete
+        with self._db.transaction() as conn:
+            keys = [row[0] for row in conn.execute(self._sql_expired, (now, limit))]
+            if not keys:
+                return 0
+            placeholders = ",".join("?" * len(keys))
+            reaped = conn.execute(f"DELETE FROM {self.name} WHERE key IN ({placeholders})", keys).rowcount
+            conn.execute(f"DELETE FROM {self.name}_ttl WHERE key IN ({placeholders})", keys)
+        return reaped
+
+    async def get(self, key: str) -> Optional[Dict]:
+        return await self._db.run(self._get, key)
+
+    async def get_many(self, keys: Iterable[str]) -> List[Optional[Dict]]:
+        return await self._db.run(self._get_many, list(keys))
+
+    async def put(self, key: str, value: Dict) -> None:
+        await self._db.run(self._put, key, value)
+
+    async def put_many(self, items: Dict[str, Dict]) -> None:
+        await self._db.run(self._put_many, items)
+
+    async def insert(self, key: str, value: Dict) -> bool:
+        return await self._db.run(self._insert, key, value)
+
+    async def update(self, key: str, fields: Dict) -> Optional[Dict]:
+        return await self._db.run(self._update, key, fields)
+
+    async def update_if(self, key: str, expected: Dict, fields: Dict) -> Optional[Dict]:
+        return await self._db.run(self._update, key, fields, expected)
+
+    async def increment(self, key: str, field: str, amount: int = 1) -> Optional[int]:
+        return await self._db.run(self._increment, key, field, amount)
+
+    async def delete(self, key: str) -> Optional[Dict]:
+        return await self._db.run(self._delete, key)
+
+    async def find(self, field: str, value: str) -> List[Dict]:
+        self._check_indexed(field)
+        return await self._db.run(self._find, field, value)
+
+    async def page(self, field: str, value: str, order_by: str, after: Optional[Tuple[str, str]] = None,
+                   limit: int = 50, descending: bool = False) -> List[Tuple[str, Dict]]:
+        self._check_ordered(field, order_by)
+        return await self._db.run(self._page, field, value, order_by, after, limit, descending)
+
+    async def count(self) -> int:
+        return await self._db.run(self._count)
+
+    async def clear(self) -> None:
+        await self._db.run(self._clear)
+
+    async def expire(self, key: str, ttl_seconds: float) -> None:
+        await self._db.run(self._expire, key, time.time() + ttl_seconds)
+
+    async def expire_many(self, keys: Iterable[str], ttl_seconds: float) -> None:
+        await self._db.run(self._expire_many, list(keys), time.time() + ttl_seconds)
+
+    async def persist(self, key: str) -> None:
+        await self._db.run(self._persist, key)
+
+    async def reap_expired(self, now: float, limit: int) -> int:
+        return await self._db.run(self._reap_expired, now, limit)
@@ -0,0 +1,38 @@
+import base64
+import binascii
+from typing import Callable
+
+
+class Base64StreamDecoder:
+    """Decodes base64 text fed in arbitrary chunks and passes the bytes to ``sink``.
+
+    Only whole 4-character groups are decoded; the remainder is carried over
+    to the next chunk. Raises ``ValueError`` on characters outside the base64
+    alphabet, data after padding, or a truncated final group.
+    """
+
+    def __init__(self, sink: Callable[[bytes], None]):
+        self._sink = sink
+        self._carry = b""
+        self._padded = False
+
+    def feed(self, chunk: bytes) -> None:
+        data = self._carry + bytes(chunk)
+        whole = len(data) - len(data) % 4
+        self._carry = data[whole:]
+        if not whole:
+            return
+        if self._padded:
+            raise ValueError("base64 data continues after padding")
+        try:
+            decoded = base64.b64decode(data[:whole], validate=True)
+        except binascii.Error as exc:
+            raise ValueError(f"Invalid base64: {exc}")
+        self._padded = data[whole - 1] == 0x3D  # '='
+        self._sink(decoded)
+
+    def close(self) -> None:
+        if self._carry:
+            if self._padded:
+                raise ValueError("base64 data continues after padding")
+            raise ValueError("Truncated base64 data")
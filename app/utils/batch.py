@@ -0,0 +1,39 @@
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+def check_batch_size(items: List[Any]) -> None:
+    if len(items) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds {settings.batch_max_items} items",
+        )
+
+def validate_batch_items(model: Type[BaseModel], items: List[Any]) -> Tuple[List[Tuple[int, BaseModel]], Dict[int, Dict]]:
+    """Validate each raw item against ``model``; returns (index, model) pairs and per-index errors."""
+    check_batch_size(items)
+    valid: List[Tuple[int, BaseModel]] = []
+    errors: Dict[int, Dict] = {}
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, model(**item)))
+        except ValidationError as exc:
+            errors[index] = item_error("VALIDATION_ERROR", "Invalid request item",
+                                       {"errors": exc.errors(include_url=False, include_context=False)})
+        except TypeError:
+            errors[index] = item_error("VALIDATION_ERROR", "Request item must be an object")
+    return valid, errors
+
+def item_error(code: str, message: str, details: Optional[Dict[str, Any]] = None) -> Dict:
+    return {"code": code, "message": message, "details": details}
+
+def batch_results(count: int, responses: Dict[int, Dict], errors: Dict[int, Dict]) -> Dict:
+    return {"results": [
+        {"index": index, "response": responses.get(index), "error": errors.get(index)}
+        for index in range(count)
+    ]}
@@ -0,0 +1,99 @@
+import re
+from typing import Callable
+
+_QUOTE, _BACKSLASH, _COLON = 0x22, 0x5C, 0x3A
+_WHITESPACE = frozenset(b" \t\r\n")
+_FIELD_SPECIAL = re.compile(rb'["\\]')
+_SIMPLE_ESCAPES = {ord('"'): b'"', ord("\\"): b"\\", ord("/"): b"/"}
+
+
+class JsonFieldSpooler:
+    """Incrementally splits a JSON body into a small skeleton and one large string field.
+
+    The contents of the first string value whose key is ``field`` are passed to
+    ``sink`` as they arrive and replaced by ``""`` in the skeleton, so the
+    field is never held in memory in full. Everything else is buffered (up to
+    ``max_skeleton_bytes``) and can be parsed with ``json.loads`` once the
+    body has been fed. Only the escapes valid in base64 payloads (``\\"``,
+    ``\\\\``, ``\\/``) are accepted inside the spooled field.
+    """
+
+    def __init__(self, field: str, sink: Callable[[bytes], None], max_skeleton_bytes: int = 65536):
+        self.field = field.encode()
+        self.found = False
+        self._sink = sink
+        self._max_skeleton_bytes = max_skeleton_bytes
+        self._skeleton = bytearray()
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key = None
+        # 0: nothing pending, 1: string closed (maybe a key), 2: key followed by ':'
+        self._pending = 0
+        self._in_field = False
+        self._field_escape = False
+
+    @property
+    def skeleton(self) -> bytes:
+        return bytes(self._skeleton)
+
+    def feed(self, chunk: bytes) -> None:
+        i, n = 0, len(chunk)
+        while i < n:
+            if self._in_field:
+                i = self._feed_field(chunk, i)
+                continue
+            c = chunk[i]
+            i += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == _BACKSLASH:
+                    self._escape = True
+                elif c == _QUOTE:
+                    self._in_string = False
+                    self._last_key = bytes(self._skeleton[self._string_start:])
+                    self._pending = 1
+            elif c == _QUOTE:
+                if self._pending == 2 and self._last_key == self.field and not self.found:
+                    self._skeleton += b'""'
+                    self._in_field = True
+                    self.found = True
+                    self._pending = 0
+                    continue
+                self._in_string = True
+                self._string_start = len(self._skeleton) + 1
+                self._pending = 0
+            elif c == _COLON and self._pending == 1:
+                self._pending = 2
+            elif c not in _WHITESPACE:
+                self._pending = 0
+            self._skeleton.append(c)
+            if len(self._skeleton) > self._max_skeleton_bytes:
+                raise ValueError("JSON body outside the spooled field is too large")
+
+    def _feed_field(self, chunk: bytes, i: int) -> int:
+        if self._field_escape:
+            escaped = _SIMPLE_ESCAPES.get(chunk[i])
+            if escaped is None:
+                raise ValueError(f"Unsupported escape in '{self.field.decode()}'")
+            self._sink(escaped)
+            self._field_escape = False
+            return i + 1
+        match = _FIELD_SPECIAL.search(chunk, i)
+        if match is None:
+            self._sink(chunk[i:])
+            return len(chunk)
+        j = match.start()
+        if j > i:
+            self._sink(chunk[i:j])
+        if chunk[j] == _QUOTE:
+            self._in_field = False
+        else:
+            self._field_escape = True
+        return j + 1
+
+    def close(self) -> bytes:
+        if self._in_field or self._in_string:
+            raise ValueError("Unterminated JSON string")
+        return self.skeleton
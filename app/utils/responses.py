@@ -1,5 +1,43 @@
+import json
 from datetime import datetime, timezone 
-from typing import Any
+from typing import Any, Dict, Iterable, List, Type
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.config import get_settings
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to compact stdlib encoding
+    orjson = None
+
+settings = get_settings()
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def model_response(model: Type[BaseModel], data: Any) -> Any:
+    """Return trusted service output shaped like ``model``.
+
+    With ``FAST_RESPONSES`` the dict is encoded once as-is; returning a
+    Response makes FastAPI skip ``response_model`` validation and
+    serialization. Otherwise the model is built and validated as usual.
+    """
+    if settings.fast_responses:
+        return FastJSONResponse(data)
+    if isinstance(data, list):
+        return [model(**item) for item in data]
+    return model(**data)
+
+def project(records: Iterable[Dict], fields: Iterable[str]) -> List[Dict]:
+    fields = tuple(fields)
+    return [{field: record[field] for field in fields} for record in records]
 
 def success_response(data: Any, request_id: str) -> dict[str, Any]:
     return {
@@ -19,4 +57,4 @@ def error_response(code: str, message: str, request_id: str, details: dict[str,
             "message": message,
             "details": details or {},
         },
-    }
\ No newline at end of file
+    }
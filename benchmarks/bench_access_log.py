@@ -0,0 +1,76 @@
+"""Request-path overhead of AccessLogMiddleware, unloaded and paced at a target rate.
+
+Run from the repository root:  python -m benchmarks.bench_access_log [rps] [seconds]
+Entries go to a temporary file through the real writer thread.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from app.core.access_log import AccessLog, AccessLogMiddleware, SamplingRules
+
+N = 200_000
+SCOPE = {
+    "type": "http", "method": "GET", "path": "/api/consent/status/c-1", "client": ("127.0.0.1", 5000),
+    "headers": [(b"request-id", b"3f2c1d3e-bench"), (b"x-cm-id", b"sbx"), (b"authorization", b"Bearer x")],
+}
+
+async def plain_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b'{"status":"GRANTED"}'})
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+async def send(message):
+    pass
+
+async def unloaded(app, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - start) / n
+
+async def paced(app, rps: int, seconds: float) -> list:
+    """Issue requests on a fixed schedule and record each one's latency."""
+    latencies = []
+    interval = 1 / rps
+    start = time.perf_counter()
+    for i in range(int(rps * seconds)):
+        delay = start + i * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        began = time.perf_counter()
+        await app(dict(SCOPE), receive, send)
+        latencies.append(time.perf_counter() - began)
+    return sorted(latencies)
+
+def _pct(latencies: list, q: float) -> float:
+    return latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1e6
+
+def main():
+    rps = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "access.log")
+        bare = asyncio.run(unloaded(plain_app, N))
+        print(f"{'middleware':<22}{'overhead':>12}{'p50':>10}{'p99':>10}{'p99.9':>10}  written/dropped (paced)")
+        base = asyncio.run(paced(plain_app, rps, seconds))
+        print(f"{'none':<22}{'':>12}{_pct(base, .5):8.1f}us{_pct(base, .99):8.1f}us{_pct(base, .999):8.1f}us")
+        for rate in (1.0, 0.1, 0.0):
+            # unloaded runs far above any real rate, so most entries are dropped there
+            log = AccessLog(sink=path, max_queue=rps)
+            log.start()
+            overhead = asyncio.run(unloaded(AccessLogMiddleware(plain_app, log, SamplingRules(default=rate)), N)) - bare
+            log.stop()
+            log = AccessLog(sink=path, max_queue=rps)
+            log.start()
+            latencies = asyncio.run(paced(AccessLogMiddleware(plain_app, log, SamplingRules(default=rate)), rps, seconds))
+            log.stop()
+            print(f"{f'sample rate {rate}':<22}{overhead * 1e6:10.2f}us{_pct(latencies, .5):8.1f}us"
+                  f"{_pct(latencies, .99):8.1f}us{_pct(latencies, .999):8.1f}us  {log.written}/{log.dropped}")
+
+if __name__ == "__main__":
+    main()
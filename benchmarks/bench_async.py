@@ -0,0 +1,59 @@
+"""Throughput of sync (threadpool-dispatched) vs. async handlers at high concurrency.
+
+Both apps serve the same consent-status style lookup; the only difference is
+``def`` vs ``async def``, i.e. whether Starlette hops to its 40-thread pool.
+
+Run from the repository root:  python -m benchmarks.bench_async [requests] [concurrency]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from app.api.schemas import ConsentStatusResponse
+
+CONSENTS = {f"c-{i}": {"consentRequestId": f"c-{i}", "status": "GRANTED", "grantedAt": None} for i in range(1000)}
+
+sync_app = FastAPI()
+async_app = FastAPI()
+
+@sync_app.get("/status/{consent_id}", response_model=ConsentStatusResponse)
+def sync_status(consent_id: str):
+    consent = CONSENTS.get(consent_id)
+    if not consent:
+        raise HTTPException(status_code=404)
+    return ConsentStatusResponse(**consent)
+
+@async_app.get("/status/{consent_id}", response_model=ConsentStatusResponse)
+async def async_status(consent_id: str):
+    consent = CONSENTS.get(consent_id)
+    if not consent:
+        raise HTTPException(status_code=404)
+    return ConsentStatusResponse(**consent)
+
+async def drive(app, requests: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one(i):
+            async with semaphore:
+                start = time.perf_counter()
+                await client.get(f"/status/c-{i % 1000}")
+                latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return requests / elapsed, latencies[int(len(latencies) * 0.99)]
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    for label, app in (("sync def", sync_app), ("async def", async_app)):
+        rps, p99 = asyncio.run(drive(app, requests, concurrency))
+        print(f"{label:<10} {rps:9.0f} req/s   p99 {p99 * 1e3:8.2f} ms   (concurrency {concurrency})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""Cold vs. warm per-request cost of bearer token verification.
+
+Run from the repository root:  python -m benchmarks.bench_auth
+"""
+import timeit
+
+from app.core.security import create_access_token, decode_access_token, token_cache, verify_access_token
+
+N = 20000
+
+def main():
+    token = create_access_token({"clientId": "bench-client", "cmId": "sbx"})
+
+    cold = timeit.timeit(lambda: decode_access_token(token), number=N) / N
+
+    token_cache.clear()
+    verify_access_token(token)
+    warm = timeit.timeit(lambda: verify_access_token(token), number=N) / N
+
+    print(f"cold decode : {cold * 1e6:8.2f} us/request")
+    print(f"warm cache  : {warm * 1e6:8.2f} us/request")
+    print(f"speedup     : {cold / warm:8.1f}x")
+    print(f"cache stats : {token_cache.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Items/sec of the batch routes vs. the equivalent single-item routes.
+
+Run from the repository root:  python -m benchmarks.bench_batch [items] [batch_size]
+"""
+import os
+import sys
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("LINK_OTP_SECRET", "bench")
+# links are initiated without a bridge webhook to deliver OTPs to
+os.environ.setdefault("LINK_FIXED_OTP", "123456")
+
+from app.main import app  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+
+HEADERS = {"REQUEST-ID": "bench", "TIMESTAMP": "2025-01-01T00:00:00Z", "X-CM-ID": "sbx"}
+
+def fresh(headers: dict) -> dict:
+    # a new REQUEST-ID per call, otherwise the idempotency layer replays responses
+    return {**headers, "REQUEST-ID": str(uuid.uuid4())}
+
+CONSENT = {"patientId": "pat-1", "hipId": "hip-1", "purpose": {"code": "CAREMGT", "text": "care"}}
+LINK = {"patientId": "pat-1", "hipId": "hip-1", "careContexts": [{"id": "cc-1", "referenceNumber": "ref-1"}]}
+DATA_REQUEST = {"patientId": "pat-1", "hipId": "hip-1", "careContextId": "cc-1", "dataTypes": ["DiagnosticReport"]}
+
+def rate(label: str, items: int, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    print(f"{label:<28} {items / (time.perf_counter() - start):9.0f} items/s")
+
+def main():
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    headers = {**HEADERS, "Authorization": f"Bearer {create_access_token({'clientId': 'bench', 'cmId': 'sbx'})}"}
+
+    with TestClient(app) as client:
+        ids = []
+        def single_init():
+            for _ in range(items):
+                ids.append(client.post("/api/consent/init", headers=fresh(headers), json=CONSENT).json()["consentRequestId"])
+        def batch_init():
+            for _ in range(0, items, batch_size):
+                client.post("/api/consent/init:batch", headers=fresh(headers), json={"requests": [CONSENT] * batch_size})
+        def single_status():
+            for consent_id in ids:
+                client.get(f"/api/consent/status/{consent_id}", headers=fresh(headers))
+        def batch_status():
+            for start in range(0, items, batch_size):
+                client.post("/api/consent/status:batch", headers=fresh(headers),
+                            json={"consentRequestIds": ids[start:start + batch_size]})
+        def single_link_init():
+            for _ in range(items):
+                client.post("/api/link/init", headers=fresh(headers), json={**LINK, "txnId": str(uuid.uuid4())})
+        def batch_link_init():
+            for _ in range(0, items, batch_size):
+                client.post("/api/link/init:batch", headers=fresh(headers),
+                            json={"requests": [{**LINK, "txnId": str(uuid.uuid4())} for _ in range(batch_size)]})
+        def single_request_info():
+            for _ in range(items):
+                client.post("/api/data/request-info", headers=fresh(headers), json=DATA_REQUEST)
+        def batch_request_info():
+            for _ in range(0, items, batch_size):
+                client.post("/api/data/request-info:batch", headers=fresh(headers), json={"requests": [DATA_REQUEST] * batch_size})
+
+        rate("consent/init", items, single_init)
+        rate("consent/init:batch", items, batch_init)
+        rate("consent/status/{id}", items, single_status)
+        rate("consent/status:batch", items, batch_status)
+        rate("link/init", items, single_link_init)
+        rate("link/init:batch", items, batch_link_init)
+        rate("data/request-info", items, single_request_info)
+        rate("data/request-info:batch", items, batch_request_info)
+
+if __name__ == "__main__":
+    main()
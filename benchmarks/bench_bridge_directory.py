@@ -0,0 +1,92 @@
+"""Bridge service listing from per-bridge snapshots vs. rebuilding it per request, and the cost of a write.
+
+Run from the repository root:  python -m benchmarks.bench_bridge_directory [bridges] [services] [reads]
+``services`` is the number of services per bridge. Writes replace one bridge's
+snapshot, so their cost does not grow with ``bridges``. The last figure is a
+burst of concurrent lookups after every snapshot has outlived its TTL, with a
+1 ms round trip per repository call as a shared backend would add.
+"""
+import asyncio
+import random
+import sys
+import time
+
+from app.api.schemas import BridgeService
+from app.services.bridge_directory import SERVICE_FIELDS, BridgeDirectory, _dumps
+from app.storage.memory import MemoryRepository
+
+
+class SharedRepository(MemoryRepository):
+    """In-memory repository that adds ``latency`` to each read."""
+
+    latency = 0.0
+
+    async def get(self, key):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await super().get(key)
+
+    async def find(self, field, value):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await super().find(field, value)
+
+
+async def rebuilt(services_repo, bridge_id: str) -> bytes:
+    """What list_services_endpoint did before: query, project, validate, serialize."""
+    records = await services_repo.find("bridgeId", bridge_id)
+    models = [BridgeService(**{field: record[field] for field in SERVICE_FIELDS}) for record in records]
+    return _dumps([model.dict() for model in models])
+
+
+async def run(bridges: int, services: int, reads: int) -> None:
+    bridges_repo = SharedRepository("bridges")
+    services_repo = SharedRepository("bridge_services", indexes=("bridgeId",))
+    directory = BridgeDirectory(bridges_repo, services_repo)
+    start = time.perf_counter()
+    for b in range(bridges):
+        await directory.register(f"bridge-{b}", "HIP", f"HIP {b}")
+        await directory.add_services(f"bridge-{b}", [{"id": f"bridge-{b}-svc-{s}", "name": f"Service {s}"}
+                                                     for s in range(services)])
+    print(f"published {bridges} bridges x {services} services in {time.perf_counter() - start:.1f}s "
+          f"(directory version {directory.version})")
+
+    rng = random.Random(5)
+    ids = [f"bridge-{rng.randrange(bridges)}" for _ in range(reads)]
+    for label, read in (("rebuilt per request", lambda bridge_id: rebuilt(services_repo, bridge_id)),
+                        ("snapshot", directory.get)):
+        start = time.perf_counter()
+        for bridge_id in ids:
+            await read(bridge_id)
+        print(f"{label:<20} {(time.perf_counter() - start) / reads * 1e6:8.2f}us/list")
+
+    latencies = []
+    for n in range(min(reads, 1000)):
+        bridge_id = ids[n]
+        began = time.perf_counter()
+        await directory.update_service(f"{bridge_id}-svc-0", {"version": f"v{n}"})
+        latencies.append(time.perf_counter() - began)
+    latencies.sort()
+    print(f"{'service update':<20} {latencies[len(latencies) // 2] * 1e6:8.2f}us p50 "
+          f"{latencies[int(len(latencies) * .99)] * 1e6:8.2f}us p99 (snapshot publish)")
+
+    directory.ttl = 0.05
+    bridges_repo.latency = services_repo.latency = 0.001
+    await asyncio.sleep(directory.ttl)
+    burst = [f"bridge-{rng.randrange(min(bridges, 100))}" for _ in range(min(reads, 5000))]
+    reloads = directory.reloads
+    start = time.perf_counter()
+    await asyncio.gather(*(directory.get(bridge_id) for bridge_id in burst))
+    print(f"{'expired burst':<20} {(time.perf_counter() - start) / len(burst) * 1e6:8.2f}us/lookup "
+          f"{directory.reloads - reloads} reloads for {len(set(burst))} bridges")
+
+
+def main():
+    bridges = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    services = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    reads = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+    asyncio.run(run(bridges, services, reads))
+
+
+if __name__ == "__main__":
+    main()
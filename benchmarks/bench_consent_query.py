@@ -0,0 +1,72 @@
+"""Latency of indexed consent queries as the consent store grows.
+
+Loads ``consents`` records spread over many patients and HIPs (a quarter of
+them GRANTED), then times first pages and deep cursor pages of the common
+operations queries. Run from the repository root:
+    python -m benchmarks.bench_consent_query [consents] [page_size]
+STORAGE_BACKEND=sqlite/redis benchmarks the other backends.
+"""
+import asyncio
+import random
+import sys
+import time
+
+from app.services import consent_service
+
+QUERIES = 2000
+
+async def load(consents: int) -> None:
+    repo = consent_service._consents
+    await repo.clear()
+    patients, hips = max(consents // 20, 1), max(consents // 1000, 1)
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for offset in range(0, consents, 10000):
+        batch = {}
+        for i in range(offset, min(offset + 10000, consents)):
+            consent_id = f"consent-{i:09d}"
+            consent = consent_service._new_consent(consent_id, f"pat-{i % patients}", f"hip-{i % hips}",
+                                                   {"code": "CAREMGT", "text": "care"})
+            if rng.random() < 0.25:
+                consent.update(status="GRANTED", grantedAt=consent["requestedAt"],
+                               patientStatus=f"pat-{i % patients}|GRANTED", hipStatus=f"hip-{i % hips}|GRANTED")
+            batch[consent_id] = consent
+        await repo.put_many(batch)
+    print(f"loaded {consents} consents in {time.perf_counter() - start:.1f}s "
+          f"({patients} patients, {hips} HIPs)")
+    return patients, hips
+
+async def timed(label: str, make_query) -> None:
+    samples, rows = [], 0
+    for _ in range(QUERIES):
+        query = make_query()
+        start = time.perf_counter()
+        page = await query
+        samples.append(time.perf_counter() - start)
+        rows += len(page["consents"])
+    samples.sort()
+    print(f"{label:<40} p50 {samples[len(samples) // 2] * 1e6:8.1f} us   "
+          f"p99 {samples[int(len(samples) * 0.99)] * 1e6:8.1f} us   {rows / QUERIES:5.1f} rows/page")
+
+async def main(consents: int, page_size: int) -> None:
+    patients, hips = await load(consents)
+    search = consent_service.search_consents
+    await timed("GRANTED for patient (by grantedAt)", lambda: search(
+        patient_id=f"pat-{random.randrange(patients)}", status="GRANTED", order_by="grantedAt", limit=page_size))
+    await timed("REQUESTED for HIP (first page)", lambda: search(
+        hip_id=f"hip-{random.randrange(hips)}", status="REQUESTED", limit=page_size))
+    await timed("all REQUESTED, newest first", lambda: search(
+        status="REQUESTED", descending=True, limit=page_size))
+
+    # a cursor from deep inside a large HIP's result set
+    hip = "hip-0"
+    page = await search(hip_id=hip, status="REQUESTED", limit=page_size)
+    for _ in range(20):
+        page = await search(hip_id=hip, status="REQUESTED", limit=page_size, cursor=page["nextCursor"])
+    deep_cursor = page["nextCursor"]
+    await timed("REQUESTED for HIP (page 22)", lambda: search(
+        hip_id=hip, status="REQUESTED", limit=page_size, cursor=deep_cursor))
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+                     int(sys.argv[2]) if len(sys.argv) > 2 else 50))
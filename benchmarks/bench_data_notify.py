@@ -0,0 +1,36 @@
+"""Latency of notify_data_flow as the number of stored payloads grows.
+
+Run from the repository root:  python -m benchmarks.bench_data_notify [max_payloads]
+"""
+import asyncio
+import sys
+import time
+
+from app.services import data_service
+
+HEALTH_INFO = {"encryptedData": "ZW5jcnlwdGVk", "keyMaterial": "key"}
+METADATA = {"type": "DiagnosticReport", "createdAt": "2025-01-01T00:00:00Z"}
+
+async def fill(count: int) -> None:
+    for i in range(await data_service._health_data.count(), count):
+        await data_service.send_health_info(f"txn-{i}", f"pat-{i % 5000}", f"hip-{i % 50}",
+                                      f"cc-{i}", HEALTH_INFO, METADATA)
+
+async def run(max_payloads: int) -> None:
+    size = 1000
+    while size <= max_payloads:
+        await fill(size)
+        target = f"txn-{size - 1}"
+        n = 10000
+        start = time.perf_counter()
+        for _ in range(n):
+            await data_service.notify_data_flow(target, "TRANSFERRED", "hip-0")
+        per_call = (time.perf_counter() - start) / n
+        print(f"{size:>9} payloads : {per_call * 1e6:7.2f} us/notify")
+        size *= 10
+
+def main():
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Patient discovery latency and index memory: a dict per patient vs. the array-backed PatientIndex.
+
+Run from the repository root:  python -m benchmarks.bench_discovery [records] [queries]
+Pass 10000000 records for the production-scale figure (a few minutes, under 1 GiB).
+About 5% of patients share the previous patient's mobile, as families do, and
+queries are exact, respelled, unknown-mobile and wrong-name lookups.
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from app.core.patient_index import PatientIndex, normalize_mobile, normalize_name
+
+FIRST = ["Ravi", "Priya", "Mohammed", "Lakshmi", "Suresh", "Anita", "Arjun", "Kavya", "Imran", "Deepa",
+         "Shyam", "Meena", "Vikram", "Sunita", "Rahul", "Pooja", "Ashok", "Fatima", "Karthik", "Neha"]
+LAST = ["Kumar", "Sharma", "Reddy", "Patel", "Singh", "Nair", "Iyer", "Khan", "Das", "Gupta",
+        "Menon", "Rao", "Joshi", "Yadav", "Bose", "Pillai", "Verma", "Shaikh", "Mishra", "Chopra"]
+RESPELLED = {"Mohammed": "Muhammad", "Lakshmi": "Laxmi", "Shyam": "Syam", "Ashok": "Asok", "Priya": "Preeya",
+             "Sharma": "Sarma", "Pooja": "Puja", "Deepa": "Dipa"}
+SAMPLE = 200_000
+
+
+def records(count: int, seed: int = 11):
+    rng = random.Random(seed)
+    mobile = 0
+    for i in range(count):
+        if not mobile or rng.random() > 0.05:
+            mobile = rng.randrange(6_000_000_000, 10_000_000_000)
+        yield f"pat-{i:08d}", str(mobile), f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+
+
+def queries(sample: list, count: int, seed: int = 12):
+    rng = random.Random(seed)
+    for _ in range(count):
+        patient_id, mobile, name = rng.choice(sample)
+        kind = rng.randrange(4)
+        if kind == 1:
+            name = " ".join(RESPELLED.get(token, token) for token in name.split())
+        elif kind == 2:
+            mobile = str(rng.randrange(1_000_000_000, 6_000_000_000))
+        elif kind == 3:
+            name = "Zubin Wadia"
+        yield kind, mobile, name
+
+
+def dict_baseline(count: int) -> float:
+    """Bytes per patient when kept as a dict of dicts keyed by mobile."""
+    tracemalloc.start()
+    by_mobile = {}
+    for patient_id, mobile, name in records(count):
+        by_mobile.setdefault(normalize_mobile(mobile), []).append(
+            {"patientId": patient_id, "mobile": mobile, "name": normalize_name(name)})
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    index = PatientIndex()
+    sample = []
+    start = time.perf_counter()
+    for record in records(count):
+        index.add(*record)
+        if len(sample) < SAMPLE:
+            sample.append(record)
+    build = time.perf_counter() - start
+    stats = index.stats()
+    baseline = dict_baseline(min(count, SAMPLE))
+    print(f"indexed {stats['records']} patients in {build:.1f}s ({stats['records'] / build:.0f}/s)")
+    print(f"memory  index {stats['bytes'] / (1 << 20):.1f} MiB ({stats['bytes'] / count:.0f} B/patient)  "
+          f"dict of dicts ~{baseline * count / (1 << 20):.1f} MiB ({baseline:.0f} B/patient)")
+
+    labels = ("exact", "respelled", "unknown mobile", "wrong name")
+    latencies = {kind: [] for kind in range(4)}
+    found = {kind: 0 for kind in range(4)}
+    for kind, mobile, name in queries(sample, n):
+        began = time.perf_counter()
+        patient_id = index.match(mobile, name, 0.75)
+        latencies[kind].append(time.perf_counter() - began)
+        found[kind] += patient_id is not None
+    for kind, label in enumerate(labels):
+        values = sorted(latencies[kind])
+        print(f"{label:<15} p50={values[len(values) // 2] * 1e6:6.1f}us p99={values[int(len(values) * .99)] * 1e6:6.1f}us "
+              f"matched {found[kind]}/{len(values)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Event bus fan-out: publish cost and delivery latency with thousands of subscribers.
+
+Run from the repository root:  python -m benchmarks.bench_events [subscribers] [events]
+"""
+import asyncio
+import sys
+import time
+
+from app.services.event_bus import EventBus
+
+
+async def _consume(subscription, expected: int, latencies: list) -> None:
+    for _ in range(expected):
+        event = await subscription.get(timeout=30)
+        latencies.append(time.perf_counter() - event["data"]["sentAt"])
+
+
+def _report(label: str, published: int, publish_time: float, elapsed: float, latencies: list) -> None:
+    latencies.sort()
+    print(f"{label}: {published} events published in {publish_time * 1e3:.1f}ms "
+          f"({publish_time / published * 1e6:.1f}us/event), {len(latencies)} deliveries in {elapsed:.2f}s; "
+          f"latency p50={latencies[len(latencies) // 2] * 1e3:.2f}ms "
+          f"p99={latencies[int(len(latencies) * 0.99)] * 1e3:.2f}ms")
+
+
+async def targeted(subscribers: int) -> None:
+    """Every subscriber waits on its own consent; one event each, as HIUs polling status would."""
+    bus = EventBus(max_subscribers=subscribers)
+    subscriptions = [bus.subscribe({"consentRequestId": f"consent-{i}"}) for i in range(subscribers)]
+    latencies = []
+    consumers = [asyncio.create_task(_consume(s, 1, latencies)) for s in subscriptions]
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    for i in range(subscribers):
+        await bus.publish("consent.notify", {"consentRequestId": f"consent-{i}", "hipId": "hip-1"},
+                          {"status": "GRANTED", "sentAt": time.perf_counter()})
+    publish_time = time.perf_counter() - start
+    await asyncio.gather(*consumers)
+    _report(f"targeted  ({subscribers} subscribers)", subscribers, publish_time,
+            time.perf_counter() - start, latencies)
+
+
+async def broadcast(subscribers: int, events: int) -> None:
+    """Every subscriber watches the same HIP, so each event fans out to all of them."""
+    bus = EventBus(queue_size=events, max_subscribers=subscribers)
+    subscriptions = [bus.subscribe({"hipId": "hip-1"}) for _ in range(subscribers)]
+    latencies = []
+    consumers = [asyncio.create_task(_consume(s, events, latencies)) for s in subscriptions]
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    publish_time = 0.0
+    for i in range(events):
+        sent = time.perf_counter()
+        await bus.publish("data.flow", {"txnId": f"txn-{i}", "hipId": "hip-1"},
+                          {"status": "TRANSFERRED", "sentAt": sent})
+        publish_time += time.perf_counter() - sent
+        await asyncio.sleep(0)  # let subscribers drain between events
+    await asyncio.gather(*consumers)
+    _report(f"broadcast ({subscribers} subscribers)", events, publish_time,
+            time.perf_counter() - start, latencies)
+
+
+async def unmatched(events: int) -> None:
+    """Publishing with no interested subscriber should cost next to nothing."""
+    bus = EventBus()
+    bus.subscribe({"consentRequestId": "someone-else"})
+    start = time.perf_counter()
+    for i in range(events):
+        await bus.publish("consent.notify", {"consentRequestId": f"consent-{i}"}, {"status": "GRANTED"})
+    elapsed = time.perf_counter() - start
+    print(f"unmatched: {events} events in {elapsed * 1e3:.1f}ms ({elapsed / events * 1e6:.1f}us/event)")
+
+
+def main():
+    subscribers = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    asyncio.run(targeted(subscribers))
+    asyncio.run(broadcast(subscribers, events))
+    asyncio.run(unmatched(subscribers))
+
+
+if __name__ == "__main__":
+    main()
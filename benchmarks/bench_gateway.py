@@ -0,0 +1,59 @@
+"""Per-request cost of header and token checks: FastAPI dependencies vs. GatewayMiddleware.
+
+Run from the repository root:  python -m benchmarks.bench_gateway [requests]
+Each mode runs in a fresh interpreter because GATEWAY_MIDDLEWARE is read at import.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+async def drive(n: int) -> None:
+    from app.main import app
+    from app.core.security import create_access_token
+    from app.services.consent_service import init_consent
+
+    consent_id = (await init_consent("pat-1", "hip-1", {"code": "CAREMGT"}))["consentRequestId"]
+    token = create_access_token({"clientId": "bench", "cmId": "sbx"})
+    headers = [
+        (b"host", b"bench"), (b"authorization", f"Bearer {token}".encode()),
+        (b"request-id", b"5d6f5a4e-bench"), (b"timestamp", b"2025-01-01T00:00:00Z"), (b"x-cm-id", b"sbx"),
+    ]
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": f"/api/consent/status/{consent_id}", "raw_path": b"", "root_path": "",
+             "query_string": b"", "headers": headers, "client": ("127.0.0.1", 5000), "server": ("bench", 80)}
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    for _ in range(1000):  # warm caches and lazily built routes
+        await app(dict(scope), receive, send)
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        await app(dict(scope), receive, send)
+        latencies.append(time.perf_counter() - start)
+    assert set(statuses) == {200}, set(statuses)
+    latencies.sort()
+    mode = "GatewayMiddleware" if os.environ["GATEWAY_MIDDLEWARE"] == "true" else "dependencies"
+    print(f"{mode:<18} mean {sum(latencies) / n * 1e6:7.1f}us  p50 {latencies[n // 2] * 1e6:7.1f}us  "
+          f"p99 {latencies[int(n * 0.99)] * 1e6:7.1f}us")
+
+def main():
+    n = sys.argv[1] if len(sys.argv) > 1 else "20000"
+    for enabled in ("false", "true"):
+        env = {**os.environ, "GATEWAY_MIDDLEWARE": enabled, "LOG_LEVEL": "WARNING", "METRICS_ENABLED": "false",
+               "ADMISSION_MAX_CONCURRENCY": "0"}
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_gateway", "--run", n], env=env, check=True)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        asyncio.run(drive(int(sys.argv[2])))
+    else:
+        main()
@@ -0,0 +1,89 @@
+"""Memory and disk footprint of health payloads: verbatim base64 records vs. the segment store.
+
+Run from the repository root:  python -m benchmarks.bench_health_storage [payloads] [duplicate_ratio]
+Payload sizes follow a log-normal distribution around 4 KiB (typical encrypted
+FHIR bundles) and ``duplicate_ratio`` of the pushes re-send an earlier payload.
+"""
+import base64
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from app.storage.segments import SegmentStore
+
+
+def payloads(count: int, duplicate_ratio: float, seed: int = 7):
+    rng = random.Random(seed)
+    sent = []
+    for _ in range(count):
+        if sent and rng.random() < duplicate_ratio:
+            yield rng.choice(sent)
+            continue
+        size = int(min(max(rng.lognormvariate(8.3, 0.8), 256), 256 * 1024))
+        payload = base64.b64encode(os.urandom(size)).decode()
+        sent.append(payload)
+        yield payload
+
+
+def _mib(n: int) -> str:
+    return f"{n / (1 << 20):8.1f} MiB"
+
+
+def verbatim(count: int, duplicate_ratio: float) -> None:
+    tracemalloc.start()
+    records = {}
+    for i, payload in enumerate(payloads(count, duplicate_ratio)):
+        # every record gets its own copy, as it would after JSON parsing
+        records[i] = {"healthInfo": {"encryptedData": payload.encode().decode(), "keyMaterial": "key"}}
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"verbatim  memory {_mib(current)}  disk {_mib(0)}")
+
+
+def segments(count: int, duplicate_ratio: float) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        store = SegmentStore(root)
+        tracemalloc.start()
+        records = {}
+        start = time.perf_counter()
+        for i, payload in enumerate(payloads(count, duplicate_ratio)):
+            data = base64.b64decode(payload, validate=True)
+            records[i] = {"healthInfo": {"blobRef": store.put(data), "size": len(data), "keyMaterial": "key"}}
+        write_time = time.perf_counter() - start
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        disk = sum(os.path.getsize(os.path.join(store.segment_dir, name)) for name in os.listdir(store.segment_dir))
+        stats = store.stats()
+        print(f"segments  memory {_mib(current)}  disk {_mib(disk)}  "
+              f"({stats['payloads']} stored, {stats['deduplicated']} deduplicated, {stats['segments']} segments, "
+              f"{count / write_time:.0f} writes/s)")
+
+        refs = [record["healthInfo"]["blobRef"] for record in records.values()]
+        random.Random(1).shuffle(refs)
+        start = time.perf_counter()
+        total = 0
+        for ref in refs:
+            total += len(store.open(ref))
+        elapsed = time.perf_counter() - start
+        print(f"          {len(refs) / elapsed:.0f} zero-copy reads/s ({_mib(total).strip()} viewed)")
+
+        store.close()
+        start = time.perf_counter()
+        reopened = SegmentStore(root)
+        print(f"          index rebuilt from segment headers in {(time.perf_counter() - start) * 1e3:.0f}ms "
+              f"({reopened.stats()['payloads']} payloads)")
+        reopened.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    duplicate_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    verbatim(count, duplicate_ratio)
+    segments(count, duplicate_ratio)
+
+
+if __name__ == "__main__":
+    main()
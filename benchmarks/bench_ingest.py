@@ -0,0 +1,65 @@
+"""Peak RSS of buffered (/health-info) vs. streaming (/health-info/stream) ingestion.
+
+Run from the repository root:  python -m benchmarks.bench_ingest [payload_mb] [concurrency]
+Each mode runs in a fresh interpreter since peak RSS only ever grows.
+"""
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import uuid
+
+HEADERS = {"REQUEST-ID": "bench", "TIMESTAMP": "2025-01-01T00:00:00Z", "X-CM-ID": "sbx"}
+
+def fresh(headers: dict) -> dict:
+    # a new REQUEST-ID per call, otherwise the idempotency layer replays responses
+    return {**headers, "REQUEST-ID": str(uuid.uuid4())}
+
+CHUNK = b"QUJD" * 16384  # 64 KiB of base64
+
+def body_chunks(i: int, payload_mb: int):
+    yield (f'{{"txnId": "txn-{i}", "patientId": "pat-{i}", "hipId": "hip-1", "careContextId": "cc-1", '
+           f'"metadata": {{"type": "DiagnosticReport", "createdAt": "2025-01-01T00:00:00Z"}}, '
+           f'"healthInfo": {{"keyMaterial": "key", "encryptedData": "').encode()
+    for _ in range(payload_mb * 16):
+        yield CHUNK
+    yield b'"}}'
+
+async def run(path: str, payload_mb: int, concurrency: int) -> None:
+    import httpx
+    from app.main import app
+    from app.core.security import create_access_token
+
+    headers = {**HEADERS, "Authorization": f"Bearer {create_access_token({'clientId': 'bench', 'cmId': 'sbx'})}",
+               "Content-Type": "application/json"}
+    async def upload(client, i):
+        async def content():
+            for chunk in body_chunks(i, payload_mb):
+                yield chunk
+        response = await client.post(path, headers=fresh(headers), content=content())
+        response.raise_for_status()
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await asyncio.gather(*(upload(client, i) for i in range(concurrency)))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{path:<28} {payload_mb} MiB x {concurrency}: peak RSS +{(peak - baseline) / 1024:7.1f} MiB "
+          f"({(peak - baseline) / 1024 / concurrency:6.1f} MiB per upload)")
+
+def main():
+    payload_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "BLOB_STORE_PATH": tmp, "LOG_LEVEL": "WARNING"}
+        for path in ("/api/data/health-info", "/api/data/health-info/stream"):
+            subprocess.run([sys.executable, "-m", "benchmarks.bench_ingest", "--run", path,
+                            str(payload_mb), str(concurrency)], env=env, check=True)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        asyncio.run(run(sys.argv[2], int(sys.argv[3]), int(sys.argv[4])))
+    else:
+        main()
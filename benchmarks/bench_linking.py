@@ -0,0 +1,57 @@
+"""Care-context link throughput by batch size, and per-patient lookup latency.
+
+Run from the repository root:  python -m benchmarks.bench_linking [care_contexts] [lookups]
+Each batch is one link transaction (init with its care contexts, then confirm)
+against the configured STORAGE_BACKEND.
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("LINK_FIXED_OTP", "123456")
+os.environ.setdefault("LINK_OTP_SECRET", "bench")
+
+from app.services.linking_service import confirm_link, get_patient_care_contexts, init_link  # noqa: E402
+
+
+async def link(total: int, batch: int, patients: int) -> float:
+    start = time.perf_counter()
+    for n in range(total // batch):
+        patient_id, txn_id = f"pat-{n % patients}", f"bench-{batch}-{n}"
+        care_contexts = [{"id": f"cc-{batch}-{n}-{i}", "referenceNumber": f"ref-{i}"} for i in range(batch)]
+        await init_link(patient_id, txn_id, "hip-1", care_contexts)
+        await confirm_link(patient_id, txn_id, "123456")
+    return (total // batch * batch) / (time.perf_counter() - start)
+
+
+async def lookup(patients: int, n: int):
+    rng = random.Random(3)
+    latencies = []
+    found = 0
+    for _ in range(n):
+        patient_id = f"pat-{rng.randrange(patients)}"
+        began = time.perf_counter()
+        found += len(await get_patient_care_contexts(patient_id))
+        latencies.append(time.perf_counter() - began)
+    return sorted(latencies), found / n
+
+
+async def run(total: int, n: int) -> None:
+    patients = max(total // 50, 1)
+    for batch in (1, 10, 100, 500):
+        print(f"batch {batch:>4}: {await link(total, batch, patients):9.0f} care contexts linked/s")
+    latencies, mean = await lookup(patients, n)
+    print(f"lookup ({patients} patients, {mean:.0f} care contexts on average) "
+          f"p50={latencies[len(latencies) // 2] * 1e6:.1f}us p99={latencies[int(len(latencies) * .99)] * 1e6:.1f}us")
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    asyncio.run(run(total, n))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Bytes/sec and CPU per response with FAST_RESPONSES on vs. off.
+
+Run from the repository root:  python -m benchmarks.bench_responses [services] [requests]
+``services`` controls the size of the /api/bridge/{id}/services payload.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+HEADERS = {"TIMESTAMP": "2025-01-01T00:00:00Z", "X-CM-ID": "sbx"}
+
+async def run(services: int, requests: int) -> None:
+    import httpx
+    from app.main import app
+    from app.core.security import create_access_token
+    from app.services import bridge_service, consent_service
+
+    await bridge_service.register_bridge("bench-bridge", "HIP", "Bench HIP")
+    await bridge_service.add_services("bench-bridge", [
+        {"id": f"bench-svc-{i}", "name": f"Service {i}"} for i in range(services)
+    ])
+    consent_id = (await consent_service.init_consent("pat-1", "hip-1", {"code": "CAREMGT", "text": "care"}))["consentRequestId"]
+    auth = {**HEADERS, "Authorization": f"Bearer {create_access_token({'clientId': 'bench', 'cmId': 'sbx'})}"}
+
+    mode = "fast" if os.environ.get("FAST_RESPONSES", "true") == "true" else "validated"
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for label, path in (("bridge services", "/api/bridge/bench-bridge/services"),
+                            ("consent status", f"/api/consent/status/{consent_id}")):
+            total_bytes = 0
+            wall, cpu = time.perf_counter(), time.process_time()
+            for _ in range(requests):
+                response = await client.get(path, headers={**auth, "REQUEST-ID": str(uuid.uuid4())})
+                total_bytes += len(response.content)
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            print(f"{mode:<10} {label:<16} {total_bytes / wall / 1e6:8.2f} MB/s "
+                  f"{cpu / requests * 1e3:8.3f} ms CPU/response ({total_bytes // requests} bytes)")
+
+def main():
+    services = sys.argv[1] if len(sys.argv) > 1 else "2000"
+    requests = sys.argv[2] if len(sys.argv) > 2 else "200"
+    for fast in ("false", "true"):
+        env = {**os.environ, "FAST_RESPONSES": fast, "LOG_LEVEL": "WARNING"}
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_responses", "--run", services, requests],
+                       env=env, check=True)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        asyncio.run(run(int(sys.argv[2]), int(sys.argv[3])))
+    else:
+        main()
@@ -0,0 +1,61 @@
+"""Sessions/sec of /api/auth/session under a token-refresh storm, with and
+without the verified-credential cache.
+
+Every client re-authenticates many times concurrently, as happens when a
+fleet's tokens expire together. Run from the repository root:
+    python -m benchmarks.bench_sessions [clients] [sessions] [concurrency]
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+HEADERS = {"TIMESTAMP": "2025-01-01T00:00:00Z", "X-CM-ID": "sbx"}
+
+async def run(clients: int, sessions: int, concurrency: int) -> None:
+    import httpx
+    from app.main import app
+    from app.services.client_service import credential_cache, load_clients
+
+    await load_clients(os.environ["CLIENTS_FILE"])
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses = {}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def session(i: int) -> None:
+            async with semaphore:
+                response = await client.post("/api/auth/session", headers={**HEADERS, "REQUEST-ID": str(uuid.uuid4())},
+                                             json={"clientId": f"client-{i % clients}", "clientSecret": "secret",
+                                                   "grantType": "client_credentials"})
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(session(i) for i in range(sessions)))
+        elapsed = time.perf_counter() - start
+
+    label = "cached" if credential_cache.maxsize > 0 else "uncached"
+    print(f"{label:<9} {sessions / elapsed:9.0f} sessions/s  statuses={statuses}  cache={credential_cache.stats()}")
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    sessions = sys.argv[2] if len(sys.argv) > 2 else "2000"
+    concurrency = sys.argv[3] if len(sys.argv) > 3 else "100"
+    with tempfile.TemporaryDirectory() as tmp:
+        clients_file = os.path.join(tmp, "clients.json")
+        with open(clients_file, "w") as f:
+            json.dump([{"clientId": f"client-{i}", "secret": "secret"} for i in range(clients)], f)
+        for cache_size in ("0", "10000"):
+            env = {**os.environ, "CLIENTS_FILE": clients_file, "CLIENT_AUTH_CACHE_SIZE": cache_size,
+                   "CLIENT_TOKEN_RATE_PER_SECOND": "0", "LOG_LEVEL": "WARNING"}
+            subprocess.run([sys.executable, "-m", "benchmarks.bench_sessions", "--run", str(clients), sessions, concurrency],
+                           env=env, check=True)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        asyncio.run(run(int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])))
+    else:
+        main()
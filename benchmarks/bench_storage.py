@@ -0,0 +1,57 @@
+"""Throughput of the real consent/data routes on each storage backend.
+
+Run from the repository root:  python -m benchmarks.bench_storage [requests]
+Each backend runs in its own interpreter because the backend is chosen from
+``Settings`` at import time.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+HEADERS = {"REQUEST-ID": "bench", "TIMESTAMP": "2025-01-01T00:00:00Z", "X-CM-ID": "sbx"}
+
+def fresh(headers: dict) -> dict:
+    # a new REQUEST-ID per call, otherwise the idempotency layer replays responses
+    return {**headers, "REQUEST-ID": str(uuid.uuid4())}
+
+def run(n: int) -> None:
+    os.environ.setdefault("LINK_OTP_SECRET", "bench")
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        session = client.post("/api/auth/session", headers=HEADERS, json={
+            "clientId": "bench", "clientSecret": "bench", "grantType": "client_credentials"})
+        headers = {**HEADERS, "Authorization": f"Bearer {session.json()['accessToken']}"}
+
+        start = time.perf_counter()
+        for i in range(n):
+            consent = client.post("/api/consent/init", headers=fresh(headers), json={
+                "patientId": f"pat-{i}", "hipId": "hip-1", "purpose": {"code": "CAREMGT", "text": "care"}})
+            client.get(f"/api/consent/status/{consent.json()['consentRequestId']}", headers=fresh(headers))
+            client.post("/api/data/health-info", headers=fresh(headers), json={
+                "txnId": f"txn-{i}", "patientId": f"pat-{i}", "hipId": "hip-1", "careContextId": "cc-1",
+                "healthInfo": {"encryptedData": "ZW5jcnlwdGVk", "keyMaterial": "key"},
+                "metadata": {"type": "DiagnosticReport", "createdAt": "2025-01-01T00:00:00Z"}})
+            client.post("/api/data/notify", json={"txnId": f"txn-{i}", "status": "TRANSFERRED", "hipId": "hip-1"})
+        elapsed = time.perf_counter() - start
+
+    backend = os.environ.get("STORAGE_BACKEND", "memory")
+    print(f"{backend:>7} : {4 * n / elapsed:8.0f} req/s ({n} iterations x 4 routes)")
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("memory", "sqlite"):
+            env = {**os.environ, "STORAGE_BACKEND": backend, "SQLITE_PATH": os.path.join(tmp, "bench.db"),
+                   "LOG_LEVEL": "WARNING"}
+            subprocess.run([sys.executable, "-m", "benchmarks.bench_storage", "--run", str(n)], env=env, check=True)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--run":
+        run(int(sys.argv[2]))
+    else:
+        main()
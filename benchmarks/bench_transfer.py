@@ -0,0 +1,86 @@
+"""Data-request throughput and queue latency through the transfer engine against a local stub HIP.
+
+Run from the repository root:  python -m benchmarks.bench_transfer [requests] [hips] [hip_delay_ms]
+Each stub HIP takes ``hip_delay_ms`` to acknowledge a request, so per-HIP
+concurrency, not the gateway, bounds throughput once there are few HIPs. The
+stub runs in its own process so its threads do not contend for the GIL.
+"""
+import asyncio
+import multiprocessing
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.services.bridge_service import register_bridge, update_bridge_url
+from app.services.data_service import get_data_request_status, request_health_info_many, start_data_transfers
+from app.services.transfer_engine import transfer_engine
+
+
+class StubHIP(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is exercised
+    delay = 0.0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(self.delay)
+        self.send_response(202)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+async def run(requests: int, hips: int, url: str) -> None:
+    for h in range(hips):
+        await register_bridge(f"hip-{h}", "HIP", f"HIP {h}")
+        await update_bridge_url(f"hip-{h}", f"{url}/hip-{h}")
+    await start_data_transfers()
+    jobs = [("patient@sbx", f"hip-{i % hips}", f"cc-{i % (hips * 10)}", ["Prescription"]) for i in range(requests)]
+    start = time.perf_counter()
+    created = []
+    for offset in range(0, requests, 100):
+        created += await request_health_info_many(jobs[offset:offset + 100])
+    while transfer_engine.processed + transfer_engine.failed < requests:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    stats = transfer_engine.stats()
+    acknowledged = 0
+    for item in created:
+        acknowledged += (await get_data_request_status(item["requestId"]))["status"] == "ACKNOWLEDGED"
+    await transfer_engine.stop()
+    print(f"dispatched {requests} requests to {hips} HIPs in {elapsed:.2f}s ({requests / elapsed:.0f} requests/s, "
+          f"{acknowledged} acknowledged)")
+    print(f"queue latency p50={stats['queueLatencyP50'] * 1e3:.1f}ms p95={stats['queueLatencyP95'] * 1e3:.1f}ms "
+          f"workers={transfer_engine.workers} perHip={transfer_engine.per_hip_concurrency}")
+
+
+class StubServer(ThreadingHTTPServer):
+    request_queue_size = 128  # the default backlog of 5 resets bursts of new connections
+    daemon_threads = True
+
+
+def serve(delay: float, port) -> None:
+    StubHIP.delay = delay
+    server = StubServer(("127.0.0.1", 0), StubHIP)
+    port.value = server.server_port
+    server.serve_forever()
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    hips = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    delay = (float(sys.argv[3]) if len(sys.argv) > 3 else 5) / 1e3
+    port = multiprocessing.Value("i", 0)
+    stub = multiprocessing.Process(target=serve, args=(delay, port), daemon=True)
+    stub.start()
+    while not port.value:
+        time.sleep(0.01)
+    try:
+        asyncio.run(run(requests, hips, f"http://127.0.0.1:{port.value}"))
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""End-to-end load test of the ABDM flow.
+
+Each flow runs: auth session -> bridge register -> discover -> link init/confirm ->
+consent init/notify/fetch -> data request/health-info/notify. Latency percentiles
+and throughput are reported per route and per flow.
+
+Run from the repository root, in-process (no network):
+    python -m benchmarks.load_test --flows 500 --concurrency 50
+or against a running server (started with the OTP the flows send):
+    LINK_OTP_SECRET=load-test LINK_FIXED_OTP=123456 uvicorn app.main:app --port 8000 &
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --json results.json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import platform
+import subprocess
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+BASE_HEADERS = {"TIMESTAMP": "2025-01-01T00:00:00Z", "X-CM-ID": "sbx"}
+LINK_OTP = "123456"
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs) -> httpx.Response:
+        headers = {**BASE_HEADERS, "REQUEST-ID": str(uuid.uuid4()), **kwargs.pop("headers", {})}
+        start = time.perf_counter()
+        response = await client.request(method, url, headers=headers, **kwargs)
+        self.latencies[label].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+
+async def run_flow(client: httpx.AsyncClient, rec: Recorder, i: int, payload: str) -> None:
+    start = time.perf_counter()
+    hip_id = f"hip-{i % 20}"
+    session = await rec.call(client, "POST /auth/session", "POST", "/api/auth/session", json={
+        "clientId": f"client-{i % 20}", "clientSecret": "secret", "grantType": "client_credentials"})
+    auth = {"Authorization": f"Bearer {session.json()['accessToken']}"}
+
+    await rec.call(client, "POST /bridge/register", "POST", "/api/bridge/register", headers=auth, json={
+        "bridgeId": hip_id, "entityType": "HIP", "name": f"HIP {i % 20}"})
+    discovered = await rec.call(client, "POST /link/discover", "POST", "/api/link/discover", headers=auth, json={
+        "mobile": f"98{i:08d}", "name": "Load Test"})
+    patient_id = discovered.json().get("patientId", f"pat-{i}")
+    txn_id = f"link-{uuid.uuid4()}"
+    await rec.call(client, "POST /link/init", "POST", "/api/link/init", headers=auth, json={
+        "patientId": patient_id, "txnId": txn_id, "hipId": hip_id})
+    await rec.call(client, "POST /link/confirm", "POST", "/api/link/confirm", headers=auth, json={
+        "patientId": patient_id, "txnId": txn_id, "otp": LINK_OTP})
+
+    consent = await rec.call(client, "POST /consent/init", "POST", "/api/consent/init", headers=auth, json={
+        "patientId": patient_id, "hipId": hip_id, "purpose": {"code": "CAREMGT", "text": "Care management"}})
+    consent_id = consent.json()["consentRequestId"]
+    await rec.call(client, "POST /consent/notify", "POST", "/api/consent/notify", json={
+        "consentRequestId": consent_id, "status": "GRANTED"})
+    await rec.call(client, "POST /consent/fetch", "POST", "/api/consent/fetch", headers=auth, json={
+        "consentRequestId": consent_id})
+
+    await rec.call(client, "POST /data/request-info", "POST", "/api/data/request-info", headers=auth, json={
+        "patientId": patient_id, "hipId": hip_id, "careContextId": f"cc-{i}", "dataTypes": ["DiagnosticReport"]})
+    data_txn = f"data-{uuid.uuid4()}"
+    await rec.call(client, "POST /data/health-info", "POST", "/api/data/health-info", headers=auth, json={
+        "txnId": data_txn, "patientId": patient_id, "hipId": hip_id, "careContextId": f"cc-{i}",
+        "healthInfo": {"encryptedData": payload, "keyMaterial": "key"},
+        "metadata": {"type": "DiagnosticReport", "createdAt": "2025-01-01T00:00:00Z"}})
+    await rec.call(client, "POST /data/notify", "POST", "/api/data/notify", json={
+        "txnId": data_txn, "status": "TRANSFERRED", "hipId": hip_id})
+    rec.latencies["flow"].append(time.perf_counter() - start)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(rec: Recorder, elapsed: float) -> Dict[str, Dict]:
+    summary = {}
+    for label, values in rec.latencies.items():
+        values = sorted(values)
+        summary[label] = {
+            "count": len(values),
+            "errors": rec.errors.get(label, 0),
+            "throughput": len(values) / elapsed,
+            "p50_ms": percentile(values, 50) * 1e3,
+            "p95_ms": percentile(values, 95) * 1e3,
+            "p99_ms": percentile(values, 99) * 1e3,
+        }
+    return summary
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main_async(args) -> Dict:
+    payload = base64.b64encode(os.urandom(args.payload_kb * 768)).decode()  # ~payload_kb KiB of base64
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+        lifespan = None
+    else:
+        os.environ.setdefault("LINK_FIXED_OTP", LINK_OTP)
+        os.environ.setdefault("LINK_OTP_SECRET", "load-test")
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://in-process", timeout=60)
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+
+    rec = Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(i: int):
+        async with semaphore:
+            await run_flow(client, rec, i, payload)
+
+    try:
+        async with client:
+            if args.warmup:
+                await asyncio.gather(*(bounded(i) for i in range(args.warmup)))
+                rec = Recorder()
+            start = time.perf_counter()
+            await asyncio.gather(*(bounded(i) for i in range(args.flows)))
+            elapsed = time.perf_counter() - start
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    return {
+        "commit": git_commit(),
+        "target": args.url or "in-process",
+        "python": platform.python_version(),
+        "flows": args.flows,
+        "concurrency": args.concurrency,
+        "payload_kb": args.payload_kb,
+        "elapsed_s": elapsed,
+        "routes": summarize(rec, elapsed),
+    }
+
+
+def print_report(result: Dict) -> None:
+    print(f"{result['flows']} flows @ concurrency {result['concurrency']} against {result['target']} "
+          f"(commit {result['commit']}) in {result['elapsed_s']:.2f}s")
+    print(f"{'route':<26}{'count':>8}{'err':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for label, stats in sorted(result["routes"].items(), key=lambda item: item[0] == "flow"):
+        print(f"{label:<26}{stats['count']:>8}{stats['errors']:>6}{stats['throughput']:>10.1f}"
+              f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+
+
+def print_comparison(result: Dict, baseline: Dict) -> None:
+    print(f"\nvs. baseline commit {baseline.get('commit', 'unknown')} (p95 / throughput change):")
+    for label, stats in sorted(result["routes"].items(), key=lambda item: item[0] == "flow"):
+        base = baseline.get("routes", {}).get(label)
+        if not base:
+            continue
+        p95 = (stats["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100
+        throughput = (stats["throughput"] - base["throughput"]) / base["throughput"] * 100
+        print(f"{label:<26}{p95:>+9.1f}%{throughput:>+10.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running gateway; omit to drive the app in-process")
+    parser.add_argument("--flows", type=int, default=200, help="number of end-to-end flows")
+    parser.add_argument("--concurrency", type=int, default=20, help="flows in flight at once")
+    parser.add_argument("--payload-kb", type=int, default=16, help="size of encryptedData per health-info push")
+    parser.add_argument("--warmup", type=int, default=10, help="flows to run (and discard) before measuring")
+    parser.add_argument("--json", dest="json_path", help="also write the results as JSON to this path")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+    print_report(result)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(result, json.load(f))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
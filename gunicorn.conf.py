@@ -0,0 +1,11 @@
+# gunicorn -c gunicorn.conf.py app.main:app   (needs gunicorn and uvicorn-worker)
+from app.core.config import get_settings
+from app.server import check_workers
+
+settings = get_settings()
+check_workers(settings)
+
+bind = f"{settings.app_host}:{settings.app_port}"
+workers = settings.workers
+worker_class = "uvicorn_worker.UvicornWorker"
+loglevel = settings.log_level.lower()